@@ -0,0 +1,108 @@
+"""
+API HTTP/JSON de solo lectura sobre la caché de últimos valores.
+Solo usa la librería estándar.
+
+Rutas:
+    GET /latest          -> últimos valores de todos los feeds
+    GET /latest/<feed>   -> último valor de un feed
+
+Las respuestas incluyen ETag; si el cliente envía If-None-Match con
+el mismo valor (comparación débil, lista separada por comas o "*") se
+responde 304 sin cuerpo.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _opaque(tag):
+    """Quita el prefijo W/ de un ETag (comparación débil)."""
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(header, etag):
+    """
+    True si la cabecera If-None-Match coincide con etag.
+
+    Args:
+        header (str): Valor de If-None-Match ('"a", W/"b"' o '*')
+        etag (str): ETag actual del recurso, con comillas
+    """
+    if not header:
+        return False
+    current = _opaque(etag)
+    for token in header.split(","):
+        token = token.strip()
+        if token == "*" or (token and _opaque(token) == current):
+            return True
+    return False
+
+
+class LatestValueHandler(BaseHTTPRequestHandler):
+    """Handler HTTP que lee de self.server.source (ver LatestValueCache)."""
+
+    # Keep-alive para que los dashboards reutilicen la conexión
+    protocol_version = "HTTP/1.1"
+    # Sin Nagle: cabeceras y cuerpo se escriben por separado
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+
+        if path == "/latest":
+            feed = None
+        elif path.startswith("/latest/"):
+            feed = path[len("/latest/"):]
+        else:
+            self._send_empty(404)
+            return
+
+        snap = self.server.source.snapshot(feed)
+        if snap is None:
+            self._send_empty(404)
+            return
+
+        etag, body = snap
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send_empty(304, etag)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, code, etag=None):
+        self.send_response(code)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # Sin log por request: los polls son constantes
+        pass
+
+
+def start_api(source, host="127.0.0.1", port=8080):
+    """
+    Inicia el servidor HTTP en un hilo daemon.
+
+    Args:
+        source: Objeto con snapshot(feed) -> (etag, body) o None
+        host (str): Interfaz de escucha
+        port (int): Puerto (0 = puerto libre)
+
+    Returns:
+        ThreadingHTTPServer: Servidor iniciado (usar .shutdown() para detener)
+    """
+    server = ThreadingHTTPServer((host, port), LatestValueHandler)
+    server.daemon_threads = True
+    server.source = source
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"API de lectura en http://{host}:{server.server_address[1]}/latest")
+    return server
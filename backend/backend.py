@@ -1,9 +1,14 @@
 import json
-import sqlite3
 import time
 from datetime import datetime
 import paho.mqtt.client as mqtt
 
+from api import start_api
+from cache import LatestValueCache
+from ingest import IngestWriter
+from retention import DEFAULT_POLICY, RetentionWorker
+from schema import open_database
+
 # -------------------------------
 # CONFIGURACIÓN
 # -------------------------------
@@ -14,41 +19,47 @@ AIO_USER = cfg["adafruit_username"]
 AIO_KEY = cfg["adafruit_key"]
 
 DB_PATH = "iot_data.db"
+# Perfil de PRAGMAs (ver schema.PROFILES): balanced, bulk, low_memory, default
+DB_PROFILE = "balanced"
 
 FEEDS = cfg["feeds"]
 
+MQTT_SERVER = cfg.get("mqtt_server", "io.adafruit.com")
+MQTT_PORT = cfg.get("mqtt_port", 1883)
+
+# Ingesta por lotes: filas por transacción y espera máxima en memoria (s)
+INGEST_BATCH = 1000
+INGEST_MAX_DELAY = 1.0
+
+# API HTTP de lectura (últimos valores)
+API_HOST = "127.0.0.1"
+API_PORT = 8080
+
+# Retención por tabla en segundos (None = indefinido) y cada cuánto aplicarla
+RETENTION_POLICY = DEFAULT_POLICY
+RETENTION_INTERVAL = 600
+# Archivo --state de export.py: la retención no borra filas sin exportar
+# (None = sin exportación, se aplica solo la política)
+EXPORT_STATE = None
+
 
 # -------------------------------
 # BASE DE DATOS SQLITE
 # -------------------------------
-conn = sqlite3.connect(DB_PATH)
-cur = conn.cursor()
-
-def insert_sensor(sensor, value):
-    cur.execute("""
-        INSERT INTO sensor_readings (timestamp, temperature, humidity, distance)
-        VALUES (?, ?, ?, ?)
-    """, (
-        time.time(),
-        value if sensor == FEEDS["temperature"] else None,
-        value if sensor == FEEDS["humidity"] else None,
-        value if sensor == FEEDS["distance"] else None,
-    ))
-    conn.commit()
-
-def insert_actuator(actuator, action):
-    cur.execute("""
-        INSERT INTO actuator_events (timestamp, actuator_name, action)
-        VALUES (?, ?, ?)
-    """, (time.time(), actuator, action))
-    conn.commit()
-
-def insert_log(event_type, detail):
-    cur.execute("""
-        INSERT INTO mqtt_logs (timestamp, event_type, details)
-        VALUES (?, ?, ?)
-    """, (time.time(), event_type, detail))
-    conn.commit()
+conn = open_database(DB_PATH, DB_PROFILE)
+
+
+# -------------------------------
+# CACHÉ DE ÚLTIMOS VALORES
+# -------------------------------
+latest = LatestValueCache()
+latest.load_from_db(conn, FEEDS)
+
+
+# -------------------------------
+# INGESTA POR LOTES
+# -------------------------------
+writer = IngestWriter(conn, FEEDS, INGEST_BATCH, INGEST_MAX_DELAY, cache=latest)
 
 
 # -------------------------------
@@ -60,19 +71,37 @@ def on_connect(client, userdata, flags, rc):
 
 def on_message(client, userdata, msg):
     topic = msg.topic
-    payload = msg.payload.decode()
+    feed = topic.split("/")[-1]
+    now = time.time()
+
+    if feed == FEEDS.get("telemetry"):
+        # Trama binaria: se decodifica por lotes en writer.flush()
+        print("MSG:", topic, f"<{len(msg.payload)} bytes>")
+        writer.add_log("recv", f"{topic}:{msg.payload.hex()}", now)
+        writer.add_message(feed, msg.payload, now)
+        return
+
+    # Un payload inválido se registra y se descarta: una excepción aquí
+    # terminaría el hilo de red de paho
+    try:
+        payload = msg.payload.decode()
+    except UnicodeDecodeError:
+        print("MSG inválido:", topic, msg.payload)
+        writer.add_log("invalid", f"{topic}:{msg.payload.hex()}", now)
+        return
 
     print("MSG:", topic, payload)
 
-    insert_log("recv", f"{topic}:{payload}")
+    writer.add_log("recv", f"{topic}:{payload}", now)
 
-    feed = topic.split("/")[-1]
-
-    if feed in (FEEDS["temperature"], FEEDS["humidity"], FEEDS["distance"]):
-        insert_sensor(feed, float(payload))
-
-    elif feed in (FEEDS["led_cmd"], FEEDS["buzzer_cmd"]):
-        insert_actuator(feed, payload)
+    try:
+        value = writer.add_message(feed, payload, now)
+    except ValueError:
+        print("MSG inválido:", topic, payload)
+        writer.add_log("invalid", f"{topic}:{payload}", now)
+        return
+    if value is not None:
+        latest.update(feed, value, now)
 
 
 # -------------------------------
@@ -83,8 +112,22 @@ client.username_pw_set(AIO_USER, AIO_KEY)
 client.on_connect = on_connect
 client.on_message = on_message
 
-client.connect("io.adafruit.com", 1883, 60)
+client.connect(MQTT_SERVER, MQTT_PORT, 60)
+
+start_api(latest, API_HOST, API_PORT)
+RetentionWorker(DB_PATH, RETENTION_POLICY, RETENTION_INTERVAL, profile=DB_PROFILE,
+                export_state=EXPORT_STATE).start()
 
 print("Backend IoT iniciado. Escuchando mensajes MQTT...")
 
-client.loop_forever()
+# Red MQTT en su hilo; este hilo escribe los lotes en SQLite
+client.loop_start()
+try:
+    writer.run_forever()
+except KeyboardInterrupt:
+    print("Deteniendo backend...")
+finally:
+    client.loop_stop()
+    writer.flush()
+    conn.close()
+
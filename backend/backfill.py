@@ -0,0 +1,348 @@
+"""
+Backfill y replay del tráfico MQTT histórico.
+
+ingest: carga exportaciones de Adafruit IO (CSV o JSON de "Download
+data" / API) o trazas propias (JSONL grabadas con record) usando la misma
+ruta de inserción por lotes que backend.py (IngestWriter). Las filas ya
+presentes se ignoran (índices únicos por feed, timestamp y seq), así que
+se puede repetir sobre el mismo archivo. Las exportaciones de Adafruit IO
+tienen timestamps en segundos: registros consecutivos del mismo feed y
+segundo se numeran en seq (0, 1, ...) y se conservan todos. Un registro
+que ya llegó en vivo (mismo dispositivo, feed y valor a menos de
+MATCH_WINDOW segundos de la hora de recepción) también se ignora.
+
+record: graba en JSONL los mensajes de un broker.
+replay: reenvía una traza a un broker local a N veces la velocidad real
+(pruebas de carga).
+
+Uso:
+    python backend/backfill.py ingest temperatura.csv --feed temperatura
+    python backend/backfill.py ingest traza.jsonl --since 2024-05-01T00:00
+    python backend/backfill.py record traza.jsonl --host localhost
+    python backend/backfill.py replay traza.jsonl --host localhost --speed 10
+"""
+
+import argparse
+import base64
+import csv
+import json
+import os
+import time
+from datetime import datetime
+
+from ingest import IngestWriter
+from schema import open_database
+
+# Tolerancia entre created_at de Adafruit IO (segundos enteros) y la hora
+# de recepción en vivo del mismo mensaje
+MATCH_WINDOW = 1.0
+
+_EPOCH = datetime(1970, 1, 1)
+_fromisoformat = datetime.fromisoformat
+
+
+def parse_time(text):
+    """Epoch en segundos desde epoch numérico o fecha ISO / "... UTC" de Adafruit IO."""
+    if isinstance(text, (int, float)):
+        return float(text)
+    if len(text) == 23 and text[19:] == " UTC":
+        # Formato de las exportaciones: "YYYY-MM-DD HH:MM:SS UTC"
+        return (_fromisoformat(text[:19]) - _EPOCH).total_seconds()
+    text = text.strip()
+    if len(text) < 10 or text[4] != "-":
+        return float(text)
+    if text.endswith(" UTC"):
+        text = text[:-4]
+    elif text.endswith("Z"):
+        text = text[:-1]
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is None:
+        # Sin zona = UTC (más rápido que replace(tzinfo=...).timestamp())
+        return (dt - _EPOCH).total_seconds()
+    return dt.timestamp()
+
+
+def _record_time(row):
+    epoch = row.get("created_epoch")
+    return float(epoch) if epoch not in (None, "") else parse_time(row["created_at"])
+
+
+def _feed_name(key, feed):
+    key = key or feed
+    if not key:
+        raise ValueError("El archivo no trae feed_key: indicar --feed")
+    # Feeds dentro de un grupo: "grupo.feed"
+    return key.rsplit(".", 1)[-1]
+
+
+def _row_feed(row, feed):
+    return _feed_name(row.get("feed_key"), feed)
+
+
+def read_adafruit_csv(path, feed=None):
+    """Filas (feed, payload, timestamp) de un CSV de Adafruit IO."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        value = header.index("value")
+        epoch = header.index("created_epoch") if "created_epoch" in header else None
+        created = header.index("created_at")
+        if "feed_key" in header:
+            key = header.index("feed_key")
+            for row in reader:
+                ts = float(row[epoch]) if epoch is not None else parse_time(row[created])
+                yield _feed_name(row[key], feed), row[value], ts
+        else:
+            name = _feed_name(None, feed)
+            for row in reader:
+                ts = float(row[epoch]) if epoch is not None else parse_time(row[created])
+                yield name, row[value], ts
+
+
+def read_adafruit_json(path, feed=None):
+    """Filas de un JSON de Adafruit IO: lista de datos o {"data": [...]}."""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("data", [])
+    for row in data:
+        yield _row_feed(row, feed), str(row["value"]), _record_time(row)
+
+
+def _trace_payload(record):
+    if "payload_b64" in record:
+        return base64.b64decode(record["payload_b64"])
+    return record["payload"]
+
+
+def read_trace(path):
+    """Registros de una traza JSONL: {"ts", "topic", "payload" | "payload_b64"}."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_trace_rows(path, feed=None):
+    for record in read_trace(path):
+        yield record["topic"].split("/")[-1], _trace_payload(record), float(record["ts"])
+
+
+def read_records(path, feed=None):
+    """Elige el lector según la extensión del archivo."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return read_adafruit_csv(path, feed)
+    if ext == ".jsonl":
+        return read_trace_rows(path, feed)
+    if ext == ".json":
+        return read_adafruit_json(path, feed)
+    raise ValueError(f"Formato no soportado: {path}")
+
+
+def ingest_records(writer, records, since=None, until=None):
+    """
+    Encola registros (feed, payload, timestamp) en el writer en lotes de
+    writer.batch_size (un lock y una transacción por lote). Retorna
+    (leídos, descartados por valor inválido).
+
+    seq numera los registros consecutivos con el mismo feed y timestamp
+    (las exportaciones vienen ordenadas por fecha); como depende solo del
+    archivo, repetir la carga produce las mismas claves.
+    """
+    read = 0
+    skipped = 0
+    batch = []
+    append = batch.append
+    batch_size = writer.batch_size
+    prev_feed = prev_ts = None
+    seq = 0
+    for feed, payload, timestamp in records:
+        if (since is not None and timestamp < since) or (until is not None and timestamp >= until):
+            continue
+        if timestamp == prev_ts and feed == prev_feed:
+            seq += 1
+        else:
+            prev_feed, prev_ts, seq = feed, timestamp, 0
+        append((feed, payload, timestamp, seq))
+        if len(batch) >= batch_size:
+            read += len(batch)
+            skipped += writer.add_batch(batch)
+            batch.clear()
+            writer.flush()
+    read += len(batch)
+    skipped += writer.add_batch(batch)
+    writer.flush()
+    return read, skipped
+
+
+def run_backfill(db_path, paths, feeds, feed=None, since=None, until=None,
+                 batch_size=50000, profile="bulk", match_window=MATCH_WINDOW):
+    """
+    Carga los archivos en la base. Retorna un resumen con filas insertadas,
+    ignoradas (ya existían, también las recibidas en vivo) y descartadas,
+    y el throughput.
+    """
+    conn = open_database(db_path, profile)
+    writer = IngestWriter(conn, feeds, batch_size=batch_size, match_window=match_window)
+    read = skipped = 0
+    t0 = time.perf_counter()
+    try:
+        for path in paths:
+            n, bad = ingest_records(writer, read_records(path, feed), since, until)
+            read += n
+            skipped += bad
+            print(f"{path}: {n} registros")
+    finally:
+        conn.close()
+    seconds = time.perf_counter() - t0
+    return {
+        "records": read,
+        "inserted": writer.rows_written,
+        "ignored": writer.rows_ignored,
+        "skipped": skipped,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(read / seconds) if seconds > 0 else None,
+    }
+
+
+# --- Grabación y replay (requieren paho-mqtt) ---
+def _mqtt_client(host, port, user=None, key=None):
+    import paho.mqtt.client as mqtt
+
+    client = mqtt.Client()
+    if user:
+        client.username_pw_set(user, key)
+    client.connect(host, port, 60)
+    return client
+
+
+def record_trace(path, host, port, topic, user=None, key=None, duration=None):
+    """Graba los mensajes de topic en JSONL hasta Ctrl+C o duration segundos."""
+    count = 0
+    with open(path, "a") as out:
+        def on_message(client, userdata, msg):
+            nonlocal count
+            entry = {"ts": time.time(), "topic": msg.topic}
+            try:
+                entry["payload"] = msg.payload.decode()
+            except UnicodeDecodeError:
+                entry["payload_b64"] = base64.b64encode(msg.payload).decode()
+            out.write(json.dumps(entry) + "\n")
+            count += 1
+
+        client = _mqtt_client(host, port, user, key)
+        client.on_message = on_message
+        client.subscribe(topic)
+        client.loop_start()
+        try:
+            end = None if duration is None else time.time() + duration
+            while end is None or time.time() < end:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.loop_stop()
+            client.disconnect()
+    return count
+
+
+def replay(records, publish, speed=1.0, user=None):
+    """
+    Publica los registros de una traza respetando los intervalos originales
+    divididos por speed (speed <= 0: tan rápido como sea posible).
+
+    Args:
+        records: Registros de read_trace (ordenados por ts)
+        publish: Función publish(topic, payload)
+        speed (float): Factor de aceleración
+        user (str): Reemplaza el usuario del topic (usuario/feeds/...)
+
+    Returns:
+        dict: Mensajes publicados, duración y atraso máximo respecto al horario
+    """
+    start = time.perf_counter()
+    first_ts = None
+    max_lag = 0.0
+    count = 0
+    for entry in records:
+        topic = entry["topic"]
+        if user:
+            topic = user + topic[topic.index("/"):]
+        if speed > 0:
+            if first_ts is None:
+                first_ts = entry["ts"]
+            due = start + (entry["ts"] - first_ts) / speed
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            else:
+                max_lag = max(max_lag, -wait)
+        publish(topic, _trace_payload(entry))
+        count += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "published": count,
+        "seconds": round(elapsed, 3),
+        "msgs_per_s": round(count / elapsed) if elapsed > 0 else None,
+        "max_lag_ms": round(max_lag * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill y replay del tráfico MQTT histórico")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Cargar exportaciones o trazas en SQLite")
+    p_ingest.add_argument("files", nargs="+", help=".csv / .json de Adafruit IO o .jsonl propio")
+    p_ingest.add_argument("--db", default="iot_data.db")
+    p_ingest.add_argument("--config", default="config_device.json")
+    p_ingest.add_argument("--feed", help="Feed de los archivos sin feed_key")
+    p_ingest.add_argument("--since", help="Solo registros desde esta fecha (ISO o epoch)")
+    p_ingest.add_argument("--until", help="Solo registros anteriores a esta fecha")
+    p_ingest.add_argument("--batch", type=int, default=50000, help="Filas por transacción")
+    p_ingest.add_argument("--profile", default="bulk", help="Perfil de schema.PROFILES")
+
+    for name, help_text in (("record", "Grabar mensajes en JSONL"),
+                            ("replay", "Reenviar una traza a un broker")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("trace")
+        p.add_argument("--host", default="localhost")
+        p.add_argument("--port", type=int, default=1883)
+        p.add_argument("--user")
+        p.add_argument("--key")
+        if name == "record":
+            p.add_argument("--topic", default="#")
+            p.add_argument("--duration", type=float)
+        else:
+            p.add_argument("--speed", type=float, default=1.0,
+                           help="Factor de velocidad (0 = sin esperas)")
+            p.add_argument("--as-user", help="Reemplazar el usuario de los topics")
+
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        with open(args.config) as f:
+            feeds = json.load(f)["feeds"]
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+        report = run_backfill(args.db, args.files, feeds, args.feed, since, until,
+                              args.batch, args.profile)
+        print(json.dumps(report, indent=2))
+    elif args.command == "record":
+        count = record_trace(args.trace, args.host, args.port, args.topic,
+                       args.user, args.key, args.duration)
+        print(f"{count} mensajes grabados en {args.trace}")
+    else:
+        client = _mqtt_client(args.host, args.port, args.user, args.key)
+        client.loop_start()
+        try:
+            report = replay(read_trace(args.trace), client.publish, args.speed, args.as_user)
+        finally:
+            client.loop_stop()
+            client.disconnect()
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
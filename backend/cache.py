@@ -0,0 +1,122 @@
+"""
+Caché en memoria del último valor recibido por cada feed.
+Se actualiza desde on_message y permite responder consultas de
+dashboards sin tocar SQLite.
+"""
+
+import json
+import secrets
+import threading
+import time
+
+
+# Columna de sensor_readings que guarda cada feed de sensor
+SENSOR_COLUMNS = ("temperature", "humidity", "distance")
+ACTUATOR_KEYS = ("led_cmd", "buzzer_cmd")
+
+
+class LatestValueCache:
+    """Último valor y timestamp por feed, con ETag por versión."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._versions = {}
+        self._version = 0
+        # Las versiones vuelven a 1 al reiniciar; el prefijo aleatorio evita
+        # que un cliente reciba 304 con el ETag de otro proceso
+        self._epoch = secrets.token_hex(4)
+        # Respuestas serializadas: clave -> (versión, etag, body)
+        self._rendered = {}
+
+    def update(self, feed, value, timestamp=None):
+        """Registra el último valor de un feed."""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            current = self._values.get(feed)
+            # Ignorar valores más antiguos que el que ya tenemos
+            if current is not None and timestamp < current["timestamp"]:
+                return
+            self._version += 1
+            self._values[feed] = {"value": value, "timestamp": timestamp}
+            self._versions[feed] = self._version
+
+    def get(self, feed):
+        """Retorna {"value", "timestamp"} del feed o None."""
+        with self._lock:
+            entry = self._values.get(feed)
+            return dict(entry) if entry else None
+
+    def snapshot(self, feed=None):
+        """
+        Retorna (etag, body_bytes) para un feed o para todos (feed=None).
+        Retorna None si el feed no existe. El body se serializa una sola
+        vez por versión, así que los polls repetidos no generan trabajo.
+        """
+        with self._lock:
+            if feed is None:
+                version = self._version
+                key = "*"
+            else:
+                version = self._versions.get(feed)
+                if version is None:
+                    return None
+                key = feed
+
+            cached = self._rendered.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1], cached[2]
+
+            if feed is None:
+                data = self._values
+            else:
+                data = self._values[feed]
+            body = json.dumps(data, separators=(",", ":")).encode()
+            etag = f'"{key}-{self._epoch}-{version}"'
+            self._rendered[key] = (version, etag, body)
+            return etag, body
+
+    def load_from_db(self, conn, feeds):
+        """Inicializa la caché con los últimos valores guardados en SQLite."""
+        for feed, entry in query_latest(conn, feeds).items():
+            self.update(feed, entry["value"], entry["timestamp"])
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
+
+
+def query_latest(conn, feeds):
+    """
+    Consulta el último valor de cada feed directamente en SQLite.
+
+    Args:
+        conn: Conexión sqlite3
+        feeds (dict): Mapa de feeds de config_device.json
+
+    Returns:
+        dict: feed -> {"value", "timestamp"}
+    """
+    latest = {}
+    cur = conn.cursor()
+
+    for column in SENSOR_COLUMNS:
+        row = cur.execute(f"""
+            SELECT timestamp, {column} FROM sensor_readings
+            WHERE {column} IS NOT NULL
+            ORDER BY timestamp DESC LIMIT 1
+        """).fetchone()
+        if row:
+            latest[feeds[column]] = {"value": row[1], "timestamp": row[0]}
+
+    for key in ACTUATOR_KEYS:
+        row = cur.execute("""
+            SELECT timestamp, action FROM actuator_events
+            WHERE actuator_name = ?
+            ORDER BY timestamp DESC LIMIT 1
+        """, (feeds[key],)).fetchone()
+        if row:
+            latest[feeds[key]] = {"value": row[1], "timestamp": row[0]}
+
+    return latest
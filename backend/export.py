@@ -0,0 +1,248 @@
+"""
+Exportación columnar del histórico para análisis.
+
+Lee sensor_readings, actuator_events y system_alerts en bloques
+ordenados por id (clave primaria) y escribe archivos particionados por
+día:
+
+    <out>/<tabla>/date=YYYY-MM-DD/part-<id inicial>.parquet   (con pyarrow)
+    <out>/<tabla>/date=YYYY-MM-DD/part-<id inicial>.csv.gz    (sin pyarrow)
+
+La memoria usada es constante (un bloque a la vez). Con --state se
+guarda la marca de agua (último id) por tabla, de modo que cada
+ejecución exporta solo las filas nuevas, incluidas las históricas que
+cargue un backfill. retention.py puede leer el mismo archivo para no
+borrar filas que aún no se exportaron (ver RetentionWorker).
+
+Uso:
+    python backend/export.py --db iot_data.db --out export --state export/state.json
+"""
+
+import argparse
+import bisect
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+EXPORT_TABLES = ("sensor_readings", "actuator_events", "system_alerts")
+
+# Archivos abiertos a la vez por tabla: un backfill de meses mezcla muchos
+# días en cada bloque
+MAX_OPEN_WRITERS = 8
+
+_ARROW_TYPES = {"INTEGER": "int64", "REAL": "float64", "TEXT": "string"}
+
+
+class CsvGzWriter:
+    """Escribe un archivo CSV comprimido con gzip."""
+
+    extension = ".csv.gz"
+
+    def __init__(self, path, columns, types):
+        self._file = gzip.open(path, "wt", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Escribe un archivo Parquet (zstd) en row groups de un bloque."""
+
+    extension = ".parquet"
+
+    def __init__(self, path, columns, types):
+        self._schema = pa.schema([
+            (name, getattr(pa, _ARROW_TYPES.get(t, "string"))())
+            for name, t in zip(columns, types)
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows):
+        arrays = list(zip(*rows))
+        table = pa.Table.from_arrays(
+            [pa.array(col, type=field.type) for col, field in zip(arrays, self._schema)],
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _table_columns(conn, table):
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return [row[1] for row in info], [row[2].upper() for row in info]
+
+
+def export_table(conn, table, out_dir, since=0, until=None, chunk_size=50000,
+                 writer_cls=None, max_open=MAX_OPEN_WRITERS):
+    """
+    Exporta las filas de una tabla con id mayor que la marca `since`.
+
+    La marca es el id (AUTOINCREMENT: crece con cada inserción y no se
+    reutiliza), no el timestamp: las filas históricas que un backfill
+    inserta después de una exportación tienen ids nuevos y salen en la
+    siguiente, en archivos nuevos de su partición de fecha.
+
+    Args:
+        conn: Conexión sqlite3 (de solo lectura)
+        table (str): Tabla a exportar
+        out_dir (str): Directorio raíz de salida
+        since (int): Último id exportado; 0 = todo
+        until (float): Se detiene en la primera fila (en orden de id) con
+            timestamp >= until, que queda para la próxima ejecución
+        chunk_size (int): Filas por bloque leído
+        writer_cls: CsvGzWriter o ParquetWriter
+        max_open (int): Archivos abiertos a la vez; al superarlo se cierra
+            el día usado hace más tiempo y, si vuelve a aparecer, se abre
+            otro part-<id> en su partición
+
+    Returns:
+        tuple: (filas exportadas, nueva marca de agua)
+    """
+    if writer_cls is None:
+        writer_cls = ParquetWriter if pa is not None else CsvGzWriter
+
+    columns, types = _table_columns(conn, table)
+    ts_idx = columns.index("timestamp")
+    id_idx = columns.index("id")
+    select = ", ".join(columns)
+
+    last_id = since
+    if until is None:
+        until = float("inf")
+
+    # Archivo abierto por día, en orden de uso (un bloque puede mezclar
+    # días si hay filas de backfill)
+    writers = OrderedDict()
+    exported = 0
+
+    try:
+        while True:
+            rows = conn.execute(f"""
+                SELECT {select} FROM {table} WHERE id > ? ORDER BY id LIMIT ?
+            """, (last_id, chunk_size)).fetchall()
+            if not rows:
+                break
+
+            stop = next((i for i, row in enumerate(rows) if row[ts_idx] >= until), None)
+            if stop is not None:
+                rows = rows[:stop]
+            if rows:
+                last_id = rows[-1][id_idx]
+                exported += len(rows)
+
+                # Cortar el bloque en tramos del mismo día
+                rows.sort(key=lambda row: row[ts_idx])
+                timestamps = [row[ts_idx] for row in rows]
+                start = 0
+                while start < len(rows):
+                    day = _day(timestamps[start])
+                    day_end = (timestamps[start] // 86400 + 1) * 86400
+                    end = bisect.bisect_left(timestamps, day_end, start)
+
+                    writer = writers.get(day)
+                    if writer is not None:
+                        writers.move_to_end(day)
+                    else:
+                        if len(writers) >= max_open:
+                            writers.popitem(last=False)[1].close()
+                        part_dir = os.path.join(out_dir, table, f"date={day}")
+                        os.makedirs(part_dir, exist_ok=True)
+                        first_id = min(row[id_idx] for row in rows[start:end])
+                        name = f"part-{first_id:012d}{writer_cls.extension}"
+                        writer = writers[day] = writer_cls(os.path.join(part_dir, name),
+                                                           columns, types)
+                    writer.write(rows[start:end])
+                    start = end
+
+            if stop is not None:
+                break
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return exported, last_id
+
+
+def load_state(path):
+    """Marca de agua (último id exportado) por tabla."""
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(path, state):
+    """Guarda la marca de agua de forma atómica."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def run_export(db_path, out_dir, tables=EXPORT_TABLES, state_path=None, chunk_size=50000,
+               lag=0, fmt="auto"):
+    """Exporta las tablas indicadas y actualiza la marca de agua."""
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError("pyarrow no está instalado; usar --format csv")
+    writer_cls = CsvGzWriter if (fmt == "csv" or pa is None) else ParquetWriter
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    state = load_state(state_path)
+    until = time.time() - lag if lag else None
+    report = {}
+
+    try:
+        for table in tables:
+            t0 = time.perf_counter()
+            count, mark = export_table(conn, table, out_dir, state.get(table, 0),
+                                       until, chunk_size, writer_cls)
+            seconds = time.perf_counter() - t0
+            state[table] = mark
+            if state_path:
+                save_state(state_path, state)
+            report[table] = {"rows": count, "seconds": round(seconds, 3)}
+            print(f"📦 {table}: {count} filas exportadas en {seconds:.2f}s")
+    finally:
+        conn.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación columnar del histórico SQLite")
+    parser.add_argument("--db", default="iot_data.db")
+    parser.add_argument("--out", default="export")
+    parser.add_argument("--tables", nargs="+", default=list(EXPORT_TABLES))
+    parser.add_argument("--state", help="Archivo JSON con la marca de agua (export incremental)")
+    parser.add_argument("--chunk", type=int, default=50000, help="Filas por bloque")
+    parser.add_argument("--lag", type=float, default=0,
+                        help="No exportar filas de los últimos N segundos")
+    parser.add_argument("--format", choices=("auto", "parquet", "csv"), default="auto")
+    args = parser.parse_args()
+
+    run_export(args.db, args.out, args.tables, args.state, args.chunk, args.lag, args.format)
+
+
+if __name__ == "__main__":
+    main()
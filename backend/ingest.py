@@ -0,0 +1,394 @@
+"""
+Escritura por lotes de los mensajes MQTT recibidos en SQLite.
+
+on_message (hilo de red de paho) solo agrega filas a buffers en memoria;
+flush() las inserta con executemany en una única transacción desde el
+hilo dueño de la conexión. Los INSERT ignoran filas ya existentes
+(índices únicos por feed, timestamp y seq), así un backfill puede
+repetirse. seq separa mensajes distintos del mismo timestamp: las tramas
+binarias traen su número de secuencia; los mensajes de texto en vivo
+usan el momento de recepción con precisión completa y seq 0.
+
+Una exportación de Adafruit IO trae created_at en segundos enteros, que
+no coincide con el momento de recepción en vivo del mismo mensaje. Con
+match_window > 0 (backfill) flush() descarta además las filas de texto
+que ya estaban guardadas con el mismo dispositivo, feed y valor a menos
+de match_window segundos.
+
+Con summary_s > 0 el dispositivo publica solo un resumen JSON por ventana
+en el feed summary ({"ts", "s", métrica: [min, max, media, último, n]}).
+El último valor de cada métrica se guarda como una fila de sensor_readings
+con feed 'summary' y el resto de la ventana se suma a sensor_rollups en
+la misma transacción, solo si la fila es nueva: un resumen repetido no
+cuenta dos veces.
+"""
+
+import bisect
+import json
+import math
+import threading
+import time
+
+from retention import ROLLUP_BUCKET, ROLLUP_INSERT
+from telemetry import MAX_CLOCK_SKEW, decode_frames
+
+SENSOR_KEYS = ("temperature", "humidity", "distance")
+ACTUATOR_KEYS = ("led_cmd", "buzzer_cmd")
+
+_INSERT_SENSOR = """
+    INSERT OR IGNORE INTO sensor_readings
+        (timestamp, temperature, humidity, distance, device_id, feed, seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_TELEMETRY = """
+    INSERT OR IGNORE INTO sensor_readings
+        (timestamp, temperature, humidity, distance, device_id, seq, feed)
+    VALUES (?, ?, ?, ?, ?, ?, 'telemetry')
+"""
+_INSERT_SUMMARY = """
+    INSERT OR IGNORE INTO sensor_readings
+        (timestamp, temperature, humidity, distance, device_id, seq, feed)
+    VALUES (?, ?, ?, ?, ?, 0, 'summary')
+"""
+_INSERT_ACTUATOR = """
+    INSERT OR IGNORE INTO actuator_events (timestamp, actuator_name, action, seq)
+    VALUES (?, ?, ?, ?)
+"""
+_INSERT_LOG = """
+    INSERT INTO mqtt_logs (timestamp, event_type, details)
+    VALUES (?, ?, ?)
+"""
+# Backfill: filas recién insertadas (id > marca) y filas anteriores del
+# mismo intervalo con las que se comparan. Después de id y timestamp, el
+# resto de columnas es el grupo: dispositivo, feed y valor
+_MATCH_TABLES = {
+    # tabla: (columnas, columna del feed, filtro de filas nuevas)
+    "sensor_readings": ("id, timestamp, device_id, feed, temperature, humidity, distance",
+                        "feed", "AND feed NOT IN ('telemetry', 'summary')"),
+    "actuator_events": ("id, timestamp, actuator_name, action", "actuator_name", ""),
+}
+
+
+def _max_id(conn, table):
+    return conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+
+
+def _drop_received(conn, table, first_id, stored_id, window):
+    """
+    Borra las filas insertadas con id > first_id que ya estaban guardadas
+    (id <= stored_id, anteriores al backfill) con otro timestamp: mismo
+    grupo (dispositivo, feed y valor) a menos de window segundos. Cada fila
+    guardada cubre a lo sumo una nueva, así que dos mensajes iguales del
+    mismo segundo necesitan dos filas guardadas. Las repetidas con la
+    clave exacta ya las ignoró el INSERT, así que repetir un backfill no
+    llega a comparar nada.
+
+    Returns:
+        int: Filas borradas
+    """
+    columns, name, new_filter = _MATCH_TABLES[table]
+    # Intervalo y feeds de lo nuevo en SQL: sin filas anteriores con las que
+    # compararlas (el caso normal) no se lee nada en Python
+    lo, hi = conn.execute(f"""
+        SELECT MIN(timestamp), MAX(timestamp) FROM {table} WHERE id > ? {new_filter}
+    """, (first_id,)).fetchone()
+    if lo is None:
+        return 0
+    names = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT {name} FROM {table} WHERE id > ? {new_filter}", (first_id,))]
+    stored = conn.execute(f"""
+        SELECT {columns} FROM {table}
+        WHERE timestamp BETWEEN ? AND ? AND id <= ?
+          AND {name} IN ({", ".join("?" * len(names))})
+        ORDER BY timestamp
+    """, (lo - window, hi + window, stored_id, *names)).fetchall()
+    if not stored:
+        return 0
+    new = conn.execute(f"SELECT {columns} FROM {table} WHERE id > ? {new_filter}",
+                       (first_id,)).fetchall()
+
+    # Timestamps guardados disponibles por grupo (ordenados)
+    pool = {}
+    for row in stored:
+        pool.setdefault(row[2:], []).append(row[1])
+
+    matched = []
+    for row in sorted(new, key=lambda r: r[1]):
+        candidates = pool.get(row[2:])
+        if not candidates:
+            continue
+        ts = row[1]
+        i = bisect.bisect_left(candidates, ts)
+        # El más cercano de los dos vecinos
+        if i == len(candidates) or (i > 0 and ts - candidates[i - 1] <= candidates[i] - ts):
+            i -= 1
+        if abs(candidates[i] - ts) <= window:
+            del candidates[i]
+            matched.append((row[0],))
+    if matched:
+        conn.executemany(f"DELETE FROM {table} WHERE id = ?", matched)
+    return len(matched)
+
+
+def _parse_summary(text, received, device_id):
+    """
+    Interpreta un resumen por ventana del dispositivo. Como en las tramas
+    binarias, ts se usa solo si está a menos de MAX_CLOCK_SKEW de la hora
+    de recepción.
+
+    Returns:
+        tuple: (fila de sensor_readings con los últimos valores,
+                fila para ROLLUP_INSERT)
+
+    Raises:
+        ValueError: JSON inválido o con otra forma
+    """
+    summary = json.loads(text)
+    if not isinstance(summary, dict):
+        raise ValueError("el resumen debe ser un objeto")
+    try:
+        ts = float(summary.get("ts", received))
+        timestamp = ts if abs(ts - received) <= MAX_CLOCK_SKEW else received
+        reading = [timestamp, None, None, None, device_id]
+        stats = []
+        samples = 0
+        for i, key in enumerate(SENSOR_KEYS):
+            values = summary.get(key)
+            if values is None:
+                stats += (None, None, None, 0)
+                continue
+            low, high, mean, last, n = (float(v) for v in values)
+            reading[i + 1] = last
+            stats += (low, high, mean * n, int(n))
+            samples += int(n)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"resumen inválido: {e}") from None
+    if not samples:
+        raise ValueError("resumen sin muestras")
+    bucket = math.floor(timestamp / ROLLUP_BUCKET) * ROLLUP_BUCKET
+    return reading, [device_id, bucket, samples, *stats]
+
+
+class IngestWriter:
+    """Buffers de inserción con flush por tamaño o por tiempo."""
+
+    def __init__(self, conn, feeds, batch_size=1000, max_delay=1.0, cache=None,
+                 match_window=0.0):
+        """
+        Args:
+            conn: Conexión sqlite3 (usada solo desde el hilo que llama flush)
+            feeds (dict): Mapa de feeds de config_device.json
+            batch_size (int): Filas pendientes que disparan un flush anticipado
+            max_delay (float): Segundos máximos que una fila espera en memoria
+            cache: LatestValueCache opcional, actualizada con la telemetría
+            match_window (float): Tolerancia en segundos para reconocer una
+                fila de texto ya guardada con otro timestamp (0 = solo la
+                clave exacta)
+        """
+        self.conn = conn
+        self.feeds = feeds
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.cache = cache
+        self.match_window = match_window
+        # Último id por tabla antes del primer flush: las filas que inserta
+        # este writer no cuentan como ya recibidas
+        self._stored_ids = {}
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        # nombre de feed → (columna, clave guardada en sensor_readings.feed)
+        self._sensor_feeds = {feeds[key]: (i, key) for i, key in enumerate(SENSOR_KEYS)}
+        self._actuator_feeds = {feeds[key] for key in ACTUATOR_KEYS}
+        self._telemetry_feed = feeds.get("telemetry")
+        self._summary_feed = feeds.get("summary")
+        self._reset()
+        self.rows_written = 0
+        self.rows_ignored = 0
+
+    def _reset(self):
+        self._sensors = []
+        self._actuators = []
+        self._logs = []
+        self._frames = []
+        self._frame_times = []
+        self._summaries = []
+        self._pending = 0
+
+    def _added(self):
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.ready.set()
+
+    # --- Encolado (cualquier hilo) ---
+    def add_message(self, feed, payload, timestamp=None, device_id=0, seq=0):
+        """
+        Encola un mensaje según su feed. Retorna el valor interpretado
+        (float para sensores, str para actuadores, None para telemetría y
+        resúmenes). Un valor de sensor o un resumen inválido lanza
+        ValueError.
+        device_id y seq se guardan en los mensajes de texto; las tramas
+        binarias traen los suyos.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        if feed == self._telemetry_feed:
+            with self._lock:
+                self._frames.append(bytes(payload))
+                self._frame_times.append(timestamp)
+                self._added()
+            return None
+
+        text = payload.decode() if isinstance(payload, (bytes, bytearray)) else payload
+        if feed == self._summary_feed:
+            summary = _parse_summary(text, timestamp, device_id)
+            with self._lock:
+                self._summaries.append(summary)
+                self._added()
+            return None
+
+        sensor = self._sensor_feeds.get(feed)
+        if sensor is not None:
+            column, key = sensor
+            value = float(text)
+            row = [timestamp, None, None, None, device_id, key, seq]
+            row[column + 1] = value
+            with self._lock:
+                self._sensors.append(row)
+                self._added()
+            return value
+
+        if feed in self._actuator_feeds:
+            with self._lock:
+                self._actuators.append((timestamp, feed, text, seq))
+                self._added()
+            return text
+
+        return None
+
+    def add_batch(self, messages, device_id=0):
+        """
+        Encola muchos mensajes (feed, payload, timestamp, seq) tomando el
+        lock una sola vez (backfill). Mismas reglas que add_message; los
+        valores de sensor y los resúmenes inválidos se descartan.
+
+        Returns:
+            int: Mensajes descartados
+        """
+        sensor_feeds = self._sensor_feeds
+        actuator_feeds = self._actuator_feeds
+        telemetry_feed = self._telemetry_feed
+        summary_feed = self._summary_feed
+        sensors, actuators, frames, frame_times, summaries = [], [], [], [], []
+        skipped = 0
+        for feed, payload, timestamp, seq in messages:
+            sensor = sensor_feeds.get(feed)
+            if sensor is not None:
+                try:
+                    value = float(payload)
+                except ValueError:
+                    skipped += 1
+                    continue
+                row = [timestamp, None, None, None, device_id, sensor[1], seq]
+                row[sensor[0] + 1] = value
+                sensors.append(row)
+            elif feed == telemetry_feed:
+                frames.append(bytes(payload))
+                frame_times.append(timestamp)
+            elif feed in actuator_feeds:
+                if isinstance(payload, (bytes, bytearray)):
+                    payload = payload.decode()
+                actuators.append((timestamp, feed, payload, seq))
+            elif feed == summary_feed:
+                if isinstance(payload, (bytes, bytearray)):
+                    payload = payload.decode()
+                try:
+                    summaries.append(_parse_summary(payload, timestamp, device_id))
+                except ValueError:
+                    skipped += 1
+
+        with self._lock:
+            self._sensors.extend(sensors)
+            self._actuators.extend(actuators)
+            self._frames.extend(frames)
+            self._frame_times.extend(frame_times)
+            self._summaries.extend(summaries)
+            self._pending += len(sensors) + len(actuators) + len(frames) + len(summaries)
+            if self._pending >= self.batch_size:
+                self.ready.set()
+        return skipped
+
+    def add_log(self, event_type, detail, timestamp=None):
+        with self._lock:
+            self._logs.append((time.time() if timestamp is None else timestamp,
+                               event_type, detail))
+            self._added()
+
+    # --- Escritura (hilo dueño de la conexión) ---
+    def flush(self):
+        """Inserta todo lo pendiente en una transacción. Retorna filas insertadas."""
+        with self._lock:
+            sensors, actuators, logs = self._sensors, self._actuators, self._logs
+            frames, frame_times = self._frames, self._frame_times
+            summaries = self._summaries
+            self._reset()
+            self.ready.clear()
+
+        decoded = decode_frames(frames, frame_times) if frames else []
+        if decoded and self.cache is not None:
+            self._update_cache(decoded)
+        if summaries and self.cache is not None:
+            self._update_cache([reading for reading, _ in summaries])
+
+        queued = len(sensors) + len(decoded) + len(summaries) + len(actuators) + len(logs)
+        if not queued:
+            return 0
+
+        # Backfill: se compara solo lo que insertó este flush (id > marca)
+        match = []
+        if self.match_window:
+            match = [table for table, rows in (("sensor_readings", sensors),
+                                               ("actuator_events", actuators)) if rows]
+
+        before = self.conn.total_changes
+        with self.conn:
+            marks = {table: _max_id(self.conn, table) for table in match}
+            for table, mark in marks.items():
+                self._stored_ids.setdefault(table, mark)
+            if sensors:
+                self.conn.executemany(_INSERT_SENSOR, sensors)
+            if decoded:
+                self.conn.executemany(_INSERT_TELEMETRY, decoded)
+            if actuators:
+                self.conn.executemany(_INSERT_ACTUATOR, actuators)
+            if logs:
+                self.conn.executemany(_INSERT_LOG, logs)
+            # Resumen: su agregado solo si la fila es nueva (un resumen
+            # repetido se ignora entero). Pocos por ventana: uno a uno
+            rollups = 0
+            for reading, rollup in summaries:
+                if self.conn.execute(_INSERT_SUMMARY, reading).rowcount:
+                    self.conn.execute(ROLLUP_INSERT, rollup)
+                    rollups += 1
+            # Filas realmente insertadas (las duplicadas se ignoran)
+            written = self.conn.total_changes - before - rollups
+            for table, first_id in marks.items():
+                written -= _drop_received(self.conn, table, first_id,
+                                          self._stored_ids[table], self.match_window)
+
+        self.rows_written += written
+        self.rows_ignored += queued - written
+        return written
+
+    def _update_cache(self, rows):
+        for row in rows:
+            for i, key in enumerate(SENSOR_KEYS):
+                if row[i + 1] is not None:
+                    self.cache.update(self.feeds[key], row[i + 1], row[0])
+
+    def run_forever(self, stop_event=None):
+        """Hace flush cada max_delay segundos o antes si se llena el lote."""
+        while stop_event is None or not stop_event.is_set():
+            self.ready.wait(self.max_delay)
+            self.flush()
+        self.flush()
@@ -0,0 +1,309 @@
+"""
+Retención de datos para la base SQLite del backend.
+
+Borra filas antiguas por tabla en lotes pequeños (una transacción por
+lote) para no bloquear la ingesta, agrega las lecturas crudas en
+sensor_rollups antes de borrarlas y ejecuta incremental_vacuum para
+devolver espacio al sistema de archivos.
+
+Con la marca de agua de export.py (export_state) las filas que aún no se
+exportaron no se agregan ni se borran: por ejemplo las históricas que
+acaba de cargar un backfill, más antiguas que el período de retención.
+"""
+
+import argparse
+import json
+import math
+import sqlite3
+import threading
+import time
+
+from export import EXPORT_TABLES, load_state
+from schema import open_database
+
+# Segundos que se conserva cada tabla (None = indefinidamente)
+DEFAULT_POLICY = {
+    "sensor_readings": 7 * 86400,
+    "mqtt_logs": 86400,
+    "sensor_rollups": None,
+    "actuator_events": None,
+    "system_alerts": None,
+}
+
+ROLLUP_BUCKET = 3600
+METRICS = ("temperature", "humidity", "distance")
+
+# Sin marca de exportación: ningún id queda retenido. En las consultas,
+# "+id" evita que SQLite use el rango de id en lugar del índice de
+# timestamp (la condición de id casi nunca filtra)
+NO_HOLD = 2 ** 63 - 1
+
+
+def _merge(col, fn):
+    # MIN/MAX escalares de SQLite retornan NULL si algún argumento es NULL
+    return (f"{col} = {fn}(COALESCE({col}, excluded.{col}), "
+            f"COALESCE(excluded.{col}, {col}))")
+
+
+_ROLLUP_COLUMNS = ", ".join(f"{m}_min, {m}_max, {m}_sum, {m}_count" for m in METRICS)
+_ROLLUP_AGGREGATES = ", ".join(f"MIN({m}), MAX({m}), SUM({m}), COUNT({m})" for m in METRICS)
+_ROLLUP_MERGES = ", ".join(
+    ", ".join((
+        _merge(f"{m}_min", "MIN"),
+        _merge(f"{m}_max", "MAX"),
+        f"{m}_sum = COALESCE({m}_sum, 0) + COALESCE(excluded.{m}_sum, 0)",
+        f"{m}_count = {m}_count + excluded.{m}_count",
+    ))
+    for m in METRICS
+)
+
+# Las filas 'summary' (último valor de un resumen del dispositivo) se
+# borran sin agregar: su ventana ya se sumó con ROLLUP_INSERT al ingerirla
+_ROLLUP_SQL = f"""
+    INSERT INTO sensor_rollups (device_id, timestamp, samples, {_ROLLUP_COLUMNS})
+    SELECT device_id, ?, COUNT(*), {_ROLLUP_AGGREGATES}
+    FROM sensor_readings WHERE timestamp < ? AND +id <= ? AND feed != 'summary'
+    GROUP BY device_id
+    ON CONFLICT(device_id, timestamp) DO UPDATE SET samples = samples + excluded.samples, {_ROLLUP_MERGES}
+"""
+
+# Un agregado ya calculado (device_id, bucket, samples y min, max, sum,
+# count por métrica), p. ej. un resumen por ventana (ingest.py)
+ROLLUP_INSERT = f"""
+    INSERT INTO sensor_rollups (device_id, timestamp, samples, {_ROLLUP_COLUMNS})
+    VALUES (?, ?, ?, {", ".join("?" * 4 * len(METRICS))})
+    ON CONFLICT(device_id, timestamp) DO UPDATE SET samples = samples + excluded.samples, {_ROLLUP_MERGES}
+"""
+
+
+def db_size(conn):
+    """Bytes ocupados por el archivo (page_count * page_size)."""
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return pages * page_size
+
+
+def incremental_vacuum_enabled(conn):
+    """True si la base tiene auto_vacuum=INCREMENTAL."""
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def enable_incremental_vacuum(conn):
+    """
+    Activa auto_vacuum=INCREMENTAL en una base existente. Requiere un
+    VACUUM completo que reescribe el archivo con un lock exclusivo: solo
+    para mantenimiento con la ingesta detenida (--vacuum).
+
+    Returns:
+        bool: True si se hizo el VACUUM, False si ya estaba activo
+    """
+    if incremental_vacuum_enabled(conn):
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def _purge_table(conn, table, cutoff, batch_size, pause, max_id=NO_HOLD):
+    """
+    Borra filas con timestamp < cutoff e id <= max_id en lotes. Retorna
+    filas borradas.
+    """
+    deleted = 0
+    while True:
+        cur = conn.execute(f"""
+            DELETE FROM {table} WHERE id IN (
+                SELECT id FROM {table} WHERE timestamp < ? AND +id <= ?
+                ORDER BY timestamp LIMIT ?
+            )
+        """, (cutoff, max_id, batch_size))
+        conn.commit()
+        deleted += cur.rowcount
+        if cur.rowcount < batch_size:
+            return deleted
+        time.sleep(pause)
+
+
+def _rollup_readings(conn, cutoff, batch_size, pause, max_id=NO_HOLD):
+    """
+    Agrega sensor_readings anteriores a cutoff (e id <= max_id) en buckets
+    horarios por dispositivo y las borra. Cada lote se agrega y se borra en la misma transacción, así un
+    corte a mitad de camino no duplica ni pierde muestras.
+    """
+    deleted = 0
+    while True:
+        row = conn.execute("""
+            SELECT timestamp FROM sensor_readings WHERE +id <= ?
+            ORDER BY timestamp LIMIT 1
+        """, (max_id,)).fetchone()
+        oldest = None if row is None else row[0]
+        if oldest is None or oldest >= cutoff:
+            return deleted
+
+        bucket = math.floor(oldest / ROLLUP_BUCKET) * ROLLUP_BUCKET
+        batch_end = min(bucket + ROLLUP_BUCKET, cutoff)
+        row = conn.execute("""
+            SELECT timestamp FROM sensor_readings WHERE +id <= ?
+            ORDER BY timestamp LIMIT 1 OFFSET ?
+        """, (max_id, batch_size)).fetchone()
+        if row is not None:
+            batch_end = min(batch_end, row[0])
+        if batch_end <= oldest:
+            # Más de batch_size filas con el mismo timestamp
+            batch_end = math.nextafter(oldest, math.inf)
+
+        with conn:
+            conn.execute(_ROLLUP_SQL, (bucket, batch_end, max_id))
+            cur = conn.execute("""
+                DELETE FROM sensor_readings WHERE timestamp < ? AND +id <= ?
+            """, (batch_end, max_id))
+        deleted += cur.rowcount
+        time.sleep(pause)
+
+
+def apply_retention(conn, policy=None, now=None, batch_size=2000, pause=0.01,
+                    vacuum_pages=2000, hold=None):
+    """
+    Aplica la política de retención una vez.
+
+    Args:
+        conn: Conexión sqlite3 (propia del hilo que la ejecuta)
+        policy (dict): tabla -> segundos de retención (None = indefinido)
+        now (float): Momento de referencia (por defecto time.time())
+        batch_size (int): Filas por transacción
+        pause (float): Pausa entre lotes para ceder el lock a la ingesta
+        vacuum_pages (int): Páginas a liberar por incremental_vacuum
+        hold (dict): tabla -> último id exportado; las filas posteriores
+            se conservan (ver export.load_state). Tablas ausentes: sin límite
+
+    Returns:
+        dict: Reporte con filas borradas, throughput y bytes recuperados
+    """
+    policy = DEFAULT_POLICY if policy is None else policy
+    now = time.time() if now is None else now
+    size_before = db_size(conn)
+    t0 = time.perf_counter()
+
+    deleted = {}
+    for table, max_age in policy.items():
+        if max_age is None:
+            continue
+        cutoff = now - max_age
+        max_id = NO_HOLD if hold is None else hold.get(table, NO_HOLD)
+        if table == "sensor_readings":
+            deleted[table] = _rollup_readings(conn, cutoff, batch_size, pause, max_id)
+        else:
+            deleted[table] = _purge_table(conn, table, cutoff, batch_size, pause, max_id)
+
+    delete_seconds = time.perf_counter() - t0
+
+    # Liberar páginas libres de a poco hasta vaciar la freelist
+    if incremental_vacuum_enabled(conn):
+        while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+            conn.execute(f"PRAGMA incremental_vacuum({vacuum_pages})").fetchall()
+            time.sleep(pause)
+
+    total = sum(deleted.values())
+    return {
+        "deleted": deleted,
+        "deleted_total": total,
+        "delete_seconds": round(delete_seconds, 3),
+        "rows_per_second": round(total / delete_seconds, 1) if delete_seconds > 0 else 0.0,
+        "reclaimed_bytes": size_before - db_size(conn),
+    }
+
+
+def export_hold(state_path, tables=EXPORT_TABLES):
+    """
+    Límite de id por tabla exportada según el archivo de estado de
+    export.py. Una tabla sin marca queda retenida entera (id <= 0).
+    """
+    state = load_state(state_path)
+    return {table: state.get(table, 0) for table in tables}
+
+
+class RetentionWorker(threading.Thread):
+    """
+    Hilo daemon que aplica la retención periódicamente. Con export_state
+    (archivo --state de export.py) relee la marca de agua en cada pasada y
+    no borra filas que aún no se exportaron; las tablas que nunca se
+    exportaron quedan retenidas por completo.
+    """
+
+    def __init__(self, db_path, policy=None, interval=600, batch_size=2000, pause=0.01,
+                 profile="balanced", export_state=None):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.profile = profile
+        self.export_state = export_state
+        self.policy = DEFAULT_POLICY if policy is None else policy
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.last_report = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        conn = open_database(self.db_path, self.profile)
+        try:
+            if not incremental_vacuum_enabled(conn):
+                # Un VACUUM aquí bloquearía la ingesta durante toda la reescritura
+                print("Retención: auto_vacuum no es INCREMENTAL, el espacio borrado no se "
+                      "devuelve al disco. Con el backend detenido ejecutar: "
+                      f"python backend/retention.py --db {self.db_path} --vacuum")
+
+            while not self._stop_event.is_set():
+                try:
+                    report = apply_retention(conn, self.policy,
+                                             batch_size=self.batch_size, pause=self.pause,
+                                             hold=self.hold())
+                    self.last_report = report
+                    if report["deleted_total"]:
+                        print(f"Retención: {report['deleted']} "
+                              f"({report['rows_per_second']} filas/s), "
+                              f"{report['reclaimed_bytes']} bytes recuperados")
+                except sqlite3.Error as e:
+                    print("Error en retención:", e)
+                self._stop_event.wait(self.interval)
+        finally:
+            conn.close()
+
+    def hold(self):
+        """Último id exportado por tabla, o None sin export_state."""
+        if self.export_state is None:
+            return None
+        return export_hold(self.export_state)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retención y mantenimiento de la base SQLite")
+    parser.add_argument("--db", default="iot_data.db", help="Archivo SQLite")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Activar auto_vacuum=INCREMENTAL con un VACUUM completo "
+                             "(detener antes el backend)")
+    parser.add_argument("--once", action="store_true",
+                        help="Aplicar la política de retención una vez")
+    parser.add_argument("--export-state",
+                        help="Estado de export.py: no borrar filas aún no exportadas")
+    args = parser.parse_args()
+
+    conn = open_database(args.db)
+    try:
+        if args.vacuum:
+            before = db_size(conn)
+            if enable_incremental_vacuum(conn):
+                print(f"auto_vacuum=INCREMENTAL activado ({before} -> {db_size(conn)} bytes)")
+            else:
+                print("auto_vacuum=INCREMENTAL ya estaba activo")
+        if args.once:
+            hold = export_hold(args.export_state) if args.export_state else None
+            print(json.dumps(apply_retention(conn, hold=hold), indent=2))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Apertura de la base SQLite del backend: perfil de rendimiento y
+migraciones de esquema versionadas (PRAGMA user_version).
+"""
+
+import os
+import sqlite3
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "resources")
+
+# Perfiles de PRAGMAs. cache_size negativo = KiB.
+PROFILES = {
+    # Valores por defecto de SQLite (referencia para benchmarks)
+    "default": {},
+    # Servicio normal: WAL permite leer (API, exportación) mientras se escribe
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # Cargas masivas (backfill): sin fsync, más caché
+    "bulk": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # Equipos con poca RAM
+    "low_memory": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "FILE",
+    },
+}
+
+
+def _add_device_id(conn):
+    """Identificador de dispositivo (tramas binarias) en lecturas y agregados."""
+    conn.execute("ALTER TABLE sensor_readings ADD COLUMN device_id INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE sensor_rollups ADD COLUMN device_id INTEGER NOT NULL DEFAULT 0")
+    conn.execute("DROP INDEX IF EXISTS idx_rollup_timestamp")
+    conn.execute("""
+        CREATE UNIQUE INDEX idx_rollup_device_timestamp
+        ON sensor_rollups(device_id, timestamp)
+    """)
+
+
+def _add_device_index(conn):
+    """Lecturas por dispositivo en orden temporal (analytics, sharding)."""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sensor_device_timestamp
+        ON sensor_readings(device_id, timestamp)
+    """)
+
+
+def _number_duplicates(conn, table, key):
+    """
+    Numera en seq (0, 1, 2...) las filas que comparten la clave `key`, en
+    orden de id. Retorna cuántas filas recibieron seq > 0.
+    """
+    conn.execute("CREATE TEMP TABLE _dedupe_seq (id INTEGER PRIMARY KEY, seq INTEGER)")
+    conn.execute(f"""
+        INSERT INTO _dedupe_seq
+        SELECT id, seq FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY id) - 1 AS seq
+            FROM {table}
+        ) WHERE seq > 0
+    """)
+    numbered = conn.execute("SELECT COUNT(*) FROM _dedupe_seq").fetchone()[0]
+    if numbered:
+        conn.execute(f"""
+            UPDATE {table} SET seq = (SELECT seq FROM _dedupe_seq WHERE _dedupe_seq.id = {table}.id)
+            WHERE id IN (SELECT id FROM _dedupe_seq)
+        """)
+    conn.execute("DROP TABLE _dedupe_seq")
+    return numbered
+
+
+def _add_feed_dedupe(conn):
+    """
+    Columnas feed (clave de config: temperature, humidity, distance,
+    telemetry) y seq, e índices únicos para que el backfill no duplique
+    filas.
+
+    seq distingue mensajes distintos con el mismo timestamp: el número de
+    secuencia de las tramas binarias (timestamps en segundos enteros) o el
+    orden dentro del archivo en un backfill. Las filas existentes que
+    comparten clave no se borran: se numeran y se informa cuántas son.
+    """
+    conn.execute("ALTER TABLE sensor_readings ADD COLUMN feed TEXT NOT NULL DEFAULT ''")
+    conn.execute("ALTER TABLE sensor_readings ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE actuator_events ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+    # Filas existentes: una métrica = mensaje de texto; varias = trama binaria
+    conn.execute("""
+        UPDATE sensor_readings SET feed = CASE
+            WHEN humidity IS NULL AND distance IS NULL THEN 'temperature'
+            WHEN temperature IS NULL AND distance IS NULL THEN 'humidity'
+            WHEN temperature IS NULL AND humidity IS NULL THEN 'distance'
+            ELSE 'telemetry'
+        END
+    """)
+    for table, key in (("sensor_readings", "device_id, timestamp, feed"),
+                       ("actuator_events", "actuator_name, timestamp")):
+        numbered = _number_duplicates(conn, table, key)
+        if numbered:
+            print(f"  {table}: {numbered} filas comparten ({key}) con otra; "
+                  "se conservan con seq > 0")
+    # (device_id, timestamp, feed, seq) también sirve para rangos por
+    # dispositivo: reemplaza a idx_sensor_device_timestamp
+    conn.execute("""
+        CREATE UNIQUE INDEX idx_sensor_dedupe
+        ON sensor_readings(device_id, timestamp, feed, seq)
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_sensor_device_timestamp")
+    conn.execute("""
+        CREATE UNIQUE INDEX idx_actuator_dedupe
+        ON actuator_events(actuator_name, timestamp, seq)
+    """)
+
+
+# (versión, descripción, script SQL en resources/ o función(conn))
+MIGRATIONS = [
+    (1, "esquema base", "scripts.sql"),
+    (2, "device_id en sensor_readings y sensor_rollups", _add_device_id),
+    (3, "índice por dispositivo y timestamp", _add_device_index),
+    (4, "feed e índices únicos para deduplicar", _add_feed_dedupe),
+]
+
+
+def apply_profile(conn, profile="balanced"):
+    """Aplica un perfil de PRAGMAs (nombre de PROFILES o dict)."""
+    pragmas = PROFILES[profile] if isinstance(profile, str) else profile
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}").fetchall()
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Aplica las migraciones pendientes. Es idempotente: cada migración se
+    ejecuta una sola vez y actualiza user_version en la misma transacción.
+
+    Returns:
+        int: Versión final del esquema
+    """
+    current = schema_version(conn)
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        print(f"Migración de esquema {version}: {description}")
+        conn.execute("BEGIN")
+        try:
+            if callable(step):
+                step(conn)
+            else:
+                with open(os.path.join(RESOURCES_DIR, step)) as f:
+                    for statement in f.read().split(";"):
+                        if statement.strip():
+                            conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        current = version
+    return current
+
+
+def open_database(path, profile="balanced"):
+    """
+    Abre (o crea) la base, aplica el perfil y las migraciones pendientes.
+
+    Args:
+        path (str): Ruta del archivo SQLite
+        profile: Nombre de perfil en PROFILES o dict de PRAGMAs
+
+    Returns:
+        sqlite3.Connection
+    """
+    # Autocommit a nivel de driver para controlar BEGIN/COMMIT en migrate()
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        # Base nueva: auto_vacuum solo se puede fijar antes de crear tablas
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    apply_profile(conn, profile)
+    migrate(conn)
+    conn.isolation_level = ""
+    return conn
@@ -0,0 +1,300 @@
+"""
+Ingesta particionada en varios procesos para flotas grandes.
+
+backend.py usa un proceso, un cliente paho y una conexión SQLite: la
+ingesta queda limitada a un núcleo y un escritor. En modo particionado
+cada dispositivo se asigna a un shard con crc32(device_id) % N; cada
+shard es un proceso con su propio cliente MQTT, suscripto solo a los
+topics de sus dispositivos, y su propio archivo SQLite
+(iot_data.shard<k>.db). ShardedQuery consulta todos los shards en
+paralelo y combina los resultados.
+
+Flota (fleet.json): usuario MQTT de cada dispositivo -> device_id.
+Cada Pico publica en <usuario>/feeds/<feed> (adafruit_username de su
+config_device.json, broker propio).
+
+Uso:
+    python backend/sharding.py run --shards 4 --fleet fleet.json
+    python backend/sharding.py query --shards 4 --hours 1
+"""
+
+import argparse
+import heapq
+import json
+import multiprocessing as mp
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from cache import SENSOR_COLUMNS
+from ingest import IngestWriter
+from retention import DEFAULT_POLICY, RetentionWorker
+from schema import open_database
+
+
+def shard_for(device_id, shards):
+    """Shard de un dispositivo (estable entre procesos y reinicios)."""
+    return zlib.crc32(str(device_id).encode()) % shards
+
+
+def shard_paths(db_path, shards):
+    """iot_data.db -> [iot_data.shard0.db, iot_data.shard1.db, ...]"""
+    base, ext = os.path.splitext(db_path)
+    return [f"{base}.shard{k}{ext}" for k in range(shards)]
+
+
+def load_fleet(path):
+    """Lee fleet.json: {"usuario_mqtt": device_id, ...}."""
+    with open(path) as f:
+        return {user: int(device_id) for user, device_id in json.load(f).items()}
+
+
+class ShardWorker:
+    """Ingesta de un shard: sus dispositivos, su IngestWriter y su base."""
+
+    def __init__(self, shard, shards, db_path, fleet, feeds, profile="balanced",
+                 batch_size=1000, max_delay=1.0):
+        """
+        Args:
+            shard (int): Índice de este shard
+            shards (int): Cantidad total de shards
+            db_path (str): Archivo SQLite del shard
+            fleet (dict): usuario MQTT -> device_id (toda la flota)
+            feeds (dict): Mapa de feeds de config_device.json
+        """
+        self.shard = shard
+        self.db_path = db_path
+        self.profile = profile
+        self.devices = {user: device_id for user, device_id in fleet.items()
+                        if shard_for(device_id, shards) == shard}
+        self.conn = open_database(db_path, profile)
+        self.writer = IngestWriter(self.conn, feeds, batch_size, max_delay)
+        self.unknown = 0
+
+    def topics(self):
+        """Subconjunto de topics de este shard."""
+        return [f"{user}/feeds/#" for user in self.devices]
+
+    def handle(self, topic, payload, now=None):
+        """Encola un mensaje de <usuario>/feeds/<feed>."""
+        user, _, rest = topic.partition("/")
+        device_id = self.devices.get(user)
+        if device_id is None:
+            self.unknown += 1
+            return None
+        feed = rest.rsplit("/", 1)[-1]
+        try:
+            return self.writer.add_message(feed, payload, now or time.time(), device_id)
+        except ValueError:
+            return None
+
+    def run_mqtt(self, host, port, user=None, key=None, stop_event=None):
+        """Escucha el broker y escribe lotes hasta que se active stop_event."""
+        import paho.mqtt.client as mqtt
+
+        def on_connect(client, userdata, flags, rc):
+            print(f"Shard {self.shard}: conectado ({rc}), {len(self.devices)} dispositivos")
+            if self.devices:
+                client.subscribe([(topic, 0) for topic in self.topics()])
+
+        def on_message(client, userdata, msg):
+            self.handle(msg.topic, msg.payload)
+
+        client = mqtt.Client(client_id=f"backend-shard{self.shard}")
+        if user:
+            client.username_pw_set(user, key)
+        client.on_connect = on_connect
+        client.on_message = on_message
+        client.connect(host, port, 60)
+
+        RetentionWorker(self.db_path, DEFAULT_POLICY, profile=self.profile).start()
+        # Red MQTT en su hilo; este hilo escribe los lotes en SQLite
+        client.loop_start()
+        try:
+            self.writer.run_forever(stop_event)
+        finally:
+            client.loop_stop()
+            self.writer.flush()
+            self.conn.close()
+
+
+def _worker_main(shard, shards, db_path, fleet, feeds, broker, stop_event):
+    worker = ShardWorker(shard, shards, db_path, fleet, feeds)
+    try:
+        worker.run_mqtt(*broker, stop_event=stop_event)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_sharded(db_path, shards, fleet, feeds, host, port, user=None, key=None):
+    """Lanza un proceso por shard y espera (Ctrl+C detiene todos)."""
+    stop_event = mp.Event()
+    processes = [
+        mp.Process(target=_worker_main, name=f"shard{k}",
+                   args=(k, shards, path, fleet, feeds, (host, port, user, key), stop_event))
+        for k, path in enumerate(shard_paths(db_path, shards))
+    ]
+    for p in processes:
+        p.start()
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        print("Deteniendo shards...")
+        stop_event.set()
+        for p in processes:
+            p.join()
+
+
+class ShardedQuery:
+    """Consultas de solo lectura repartidas entre shards y combinadas."""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._conns = []
+        for path in self.paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            self._conns.append(conn)
+        # Una conexión por shard, usada por un hilo a la vez
+        self._locks = [threading.Lock() for _ in self.paths]
+        self._pool = ThreadPoolExecutor(max_workers=len(self.paths))
+
+    def _run(self, shard, fn):
+        with self._locks[shard]:
+            return fn(self._conns[shard])
+
+    def _fan_out(self, fn, shards=None):
+        """Ejecuta fn(conn) en los shards en paralelo; resultados en orden de shard."""
+        if shards is None:
+            shards = range(len(self.paths))
+        futures = [self._pool.submit(self._run, k, fn) for k in shards]
+        return [f.result() for f in futures]
+
+    def count(self, since=0, until=float("inf")):
+        """Lecturas por shard en [since, until)."""
+        sql = "SELECT COUNT(*) FROM sensor_readings WHERE timestamp >= ? AND timestamp < ?"
+        return self._fan_out(lambda conn: conn.execute(sql, (since, until)).fetchone()[0])
+
+    def readings(self, since, until, device_id=None, limit=None):
+        """
+        Lecturas en [since, until) ordenadas por timestamp. Con device_id
+        solo se consulta su shard.
+
+        Returns:
+            list[tuple]: (timestamp, temperature, humidity, distance, device_id)
+        """
+        sql = """
+            SELECT timestamp, temperature, humidity, distance, device_id
+            FROM sensor_readings WHERE timestamp >= ? AND timestamp < ?
+        """
+        params = [since, until]
+        shards = None
+        if device_id is not None:
+            sql += " AND device_id = ?"
+            params.append(device_id)
+            shards = [shard_for(device_id, len(self.paths))]
+        sql += " ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        parts = self._fan_out(lambda conn: conn.execute(sql, params).fetchall(), shards)
+        merged = heapq.merge(*parts, key=lambda row: row[0])
+        return list(islice(merged, limit))
+
+    def latest(self, feeds, device_id=None):
+        """
+        Último valor de cada feed de sensor por dispositivo. Con device_id
+        solo se consulta su shard. Los eventos de actuadores no guardan
+        dispositivo (actuator_events), así que no se incluyen.
+
+        Returns:
+            dict: device_id -> {feed: {"value", "timestamp"}}
+        """
+        def shard_latest(conn):
+            if device_id is None:
+                devices = [row[0] for row in
+                           conn.execute("SELECT DISTINCT device_id FROM sensor_readings")]
+            else:
+                devices = [device_id]
+            result = {}
+            for device in devices:
+                entries = {}
+                for column in SENSOR_COLUMNS:
+                    # (device_id, timestamp) es prefijo de idx_sensor_dedupe
+                    row = conn.execute(f"""
+                        SELECT timestamp, {column} FROM sensor_readings
+                        WHERE device_id = ? AND {column} IS NOT NULL
+                        ORDER BY timestamp DESC LIMIT 1
+                    """, (device,)).fetchone()
+                    if row:
+                        entries[feeds[column]] = {"value": row[1], "timestamp": row[0]}
+                if entries:
+                    result[device] = entries
+            return result
+
+        shards = None if device_id is None else [shard_for(device_id, len(self.paths))]
+        latest = {}
+        for part in self._fan_out(shard_latest, shards):
+            latest.update(part)
+        return latest
+
+    def devices(self):
+        """device_id -> shard según los datos guardados."""
+        sql = "SELECT DISTINCT device_id FROM sensor_readings"
+        parts = self._fan_out(lambda conn: [row[0] for row in conn.execute(sql)])
+        return {device_id: k for k, ids in enumerate(parts) for device_id in ids}
+
+    def close(self):
+        self._pool.shutdown()
+        for conn in self._conns:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingesta particionada en varios procesos")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("run", "Lanzar un proceso de ingesta por shard"),
+                            ("query", "Resumen de los shards")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--db", default="iot_data.db", help="Base; los shards agregan .shard<k>")
+        p.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+        p.add_argument("--config", default="config_device.json")
+        if name == "run":
+            p.add_argument("--fleet", required=True, help="JSON usuario MQTT -> device_id")
+        else:
+            p.add_argument("--hours", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        cfg = json.load(f)
+
+    if args.command == "run":
+        run_sharded(args.db, args.shards, load_fleet(args.fleet), cfg["feeds"],
+                    cfg.get("mqtt_server", "localhost"), cfg.get("mqtt_port", 1883),
+                    cfg["adafruit_username"], cfg["adafruit_key"])
+        return
+
+    query = ShardedQuery(shard_paths(args.db, args.shards))
+    try:
+        now = time.time()
+        counts = query.count(now - args.hours * 3600, now)
+        print(json.dumps({
+            "readings_per_shard": counts,
+            "readings_total": sum(counts),
+            "devices": len(query.devices()),
+            "latest": query.latest(cfg["feeds"]),
+        }, indent=2))
+    finally:
+        query.close()
+
+
+if __name__ == "__main__":
+    main()
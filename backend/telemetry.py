@@ -0,0 +1,91 @@
+"""
+Decodificación de tramas binarias de telemetría (ver TelemetryEncoder
+en core/mqtt_client.py).
+
+Las tramas tienen tamaño fijo, así que un lote se decodifica de una vez:
+con NumPy como un arreglo estructurado y sin NumPy con struct.iter_unpack.
+"""
+
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FRAME_FMT = "!BBHHIhhh"
+FRAME_SIZE = struct.calcsize(FRAME_FMT)
+FRAME_MAGIC = 0x54
+SCALES = (100.0, 100.0, 10.0)
+
+# El RTC del Pico arranca sin sincronizar (en 2021 o 2024 según el
+# firmware): el timestamp del dispositivo solo se acepta si está a menos
+# de MAX_CLOCK_SKEW segundos de la hora de recepción
+MAX_CLOCK_SKEW = 86400
+
+if np is not None:
+    FRAME_DTYPE = np.dtype([
+        ("magic", "u1"),
+        ("mask", "u1"),
+        ("device_id", ">u2"),
+        ("seq", ">u2"),
+        ("timestamp", ">u4"),
+        ("values", ">i2", (3,)),
+    ])
+
+
+def _valid(payloads, received):
+    """Filtra tramas con tamaño y magic correctos."""
+    frames, times = [], []
+    for payload, ts in zip(payloads, received):
+        if len(payload) == FRAME_SIZE and payload[0] == FRAME_MAGIC:
+            frames.append(payload)
+            times.append(ts)
+    return frames, times
+
+
+def decode_frames(payloads, received):
+    """
+    Decodifica un lote de tramas.
+
+    Args:
+        payloads (list[bytes]): Tramas recibidas
+        received (list[float]): Momento de recepción de cada trama
+
+    Returns:
+        list[tuple]: (timestamp, temperature, humidity, distance, device_id,
+        seq) listas para INSERT en sensor_readings. seq distingue tramas del
+        mismo segundo. Las tramas inválidas se descartan.
+    """
+    frames, times = _valid(payloads, received)
+    if not frames:
+        return []
+    if np is None:
+        return _decode_python(frames, times)
+
+    arr = np.frombuffer(b"".join(frames), dtype=FRAME_DTYPE)
+    device_ts = arr["timestamp"].astype(np.float64)
+    received = np.asarray(times, dtype=np.float64)
+    timestamps = np.where(np.abs(device_ts - received) <= MAX_CLOCK_SKEW, device_ts, received)
+
+    values = (arr["values"] / np.asarray(SCALES)).astype(object)
+    present = (arr["mask"][:, None] >> np.arange(3, dtype=np.uint8)) & 1
+    values[present == 0] = None
+
+    return list(zip(timestamps.tolist(), *values.T.tolist(), arr["device_id"].tolist(),
+                    arr["seq"].tolist()))
+
+
+def _decode_python(frames, times):
+    rows = []
+    unpacked = struct.iter_unpack(FRAME_FMT, b"".join(frames))
+    for (_, mask, device_id, seq, ts, t, h, d), received in zip(unpacked, times):
+        rows.append((
+            float(ts) if abs(ts - received) <= MAX_CLOCK_SKEW else received,
+            t / SCALES[0] if mask & 1 else None,
+            h / SCALES[1] if mask & 2 else None,
+            d / SCALES[2] if mask & 4 else None,
+            device_id,
+            seq,
+        ))
+    return rows
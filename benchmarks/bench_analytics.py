@@ -0,0 +1,197 @@
+"""
+Detección de anomalías sobre SQLite: NumPy vectorizado vs. bucle en
+Python puro.
+
+1) Extremo a extremo (cifra principal): run_analytics lee sensor_readings
+   en bloques, arma la línea base con los history_days días previos a la
+   ventana y detecta sobre e2e_days días. La alternativa en Python puro
+   lee las mismas filas de SQLite y aplica los mismos detectores con un
+   bucle por muestra; speedup compara ambos caminos completos.
+2) Solo el núcleo: arreglos NumPy ya en memoria (sin SQLite), un mes por
+   dispositivo. Sirve para ver cuánto del tiempo extremo a extremo es
+   lectura de SQLite; no es el rendimiento del análisis real.
+
+El objetivo de analizar un mes de datos cada 5 s de 100 dispositivos
+(TARGET_READINGS, ~52M lecturas) en segundos no se cumple: end_to_end
+reporta target_seconds, el tiempo proyectado a esa escala con la tasa
+medida. Para medirlo directamente (varios GB en disco):
+    python benchmarks/bench_analytics.py --e2e-devices 100 --e2e-days 30
+
+Uso:
+    python benchmarks/bench_analytics.py [--devices N] [--days N] [--e2e-devices N]
+"""
+
+import argparse
+import collections
+import contextlib
+import io
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import create_db, print_results, rate
+
+from analytics import DetectorParams, SeriesDetector, run_analytics
+
+STEP = 5.0
+TARGET_READINGS = int(100 * 30 * 86400 / STEP)
+
+
+def _series(samples, seed, start):
+    """Temperatura con ciclo diario, ruido y algunos picos."""
+    rng = np.random.default_rng(seed)
+    ts = start + np.arange(samples) * STEP
+    values = 24 + 3 * np.sin(2 * np.pi * ts / 86400) + rng.normal(0, 0.05, samples)
+    spikes = rng.integers(0, samples, samples // 20000 + 1)
+    values[spikes] += 8
+    return ts, values
+
+
+def _numpy_device(base_ts, base_values, ts, values, params, chunk):
+    det = SeriesDetector("temperature", params)
+    for i in range(0, len(base_ts), chunk):
+        det.accumulate(base_ts[i:i + chunk], base_values[i:i + chunk])
+    events = 0
+    for i in range(0, len(ts), chunk):
+        events += len(det.detect(ts[i:i + chunk], values[i:i + chunk]))
+    return events
+
+
+def _python_device(base, rows, params):
+    """Mismos detectores con listas, deque y un bucle por muestra."""
+    counts, sums, sumsq = [0] * 24, [0.0] * 24, [0.0] * 24
+    for t, v in base:
+        h = int(t // 3600) % 24
+        counts[h] += 1
+        sums[h] += v
+        sumsq[h] += v * v
+    means = [sums[h] / max(counts[h], 1) for h in range(24)]
+    stds = [math.sqrt(max(sumsq[h] / max(counts[h], 1) - means[h] ** 2, 0)) for h in range(24)]
+
+    window = collections.deque(maxlen=params.window)
+    max_rate = params.max_rate["temperature"]
+    flags = [False, False, False]
+    prev_t = prev_v = None
+    events = 0
+    for t, v in rows:
+        z_flag = False
+        if len(window) == params.window:
+            mean = sum(window) / len(window)
+            std = math.sqrt(max(sum(x * x for x in window) / len(window) - mean * mean, 0))
+            z_flag = std > 1e-9 and abs(v - mean) / std > params.z_threshold
+        window.append(v)
+
+        h = int(t // 3600) % 24
+        s_flag = (counts[h] >= params.seasonal_min_samples
+                  and abs(v - means[h]) > params.seasonal_k * max(stds[h], 1e-9))
+
+        r_flag = False
+        if prev_t is not None and t > prev_t:
+            r_flag = abs((v - prev_v) / (t - prev_t)) > max_rate
+        prev_t, prev_v = t, v
+
+        for i, flag in enumerate((z_flag, s_flag, r_flag)):
+            if flag and not flags[i]:
+                events += 1
+            flags[i] = flag
+    return events
+
+
+def _python_e2e(conn, devices, since, until, params):
+    """Lee de SQLite y detecta con _python_device. Retorna (eventos, segundos)."""
+    sql = """
+        SELECT timestamp, temperature FROM sensor_readings
+        WHERE device_id = ? AND timestamp >= ? AND timestamp < ?
+        ORDER BY timestamp, id
+    """
+    history = since - params.baseline_days * 86400
+    events = 0
+    t0 = time.perf_counter()
+    for device in range(devices):
+        base = conn.execute(sql, (device, history, since)).fetchall()
+        rows = conn.execute(sql, (device, since, until)).fetchall()
+        events += _python_device(base, rows, params)
+    return events, time.perf_counter() - t0
+
+
+def _end_to_end(devices, days, history_days, params, chunk):
+    samples = int((history_days + days) * 86400 / STEP)
+    until = time.time()
+    start = until - (history_days + days) * 86400
+    since = until - days * 86400
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            conn = create_db(os.path.join(tmp, "bench.db"))
+        for device in range(devices):
+            d_ts, d_values = _series(samples, device, start)
+            conn.executemany("""
+                INSERT INTO sensor_readings (timestamp, temperature, device_id)
+                VALUES (?, ?, ?)
+            """, zip(d_ts.tolist(), d_values.tolist(), [device] * samples))
+        conn.commit()
+        analysed = conn.execute("SELECT COUNT(*) FROM sensor_readings WHERE timestamp >= ?",
+                                (since,)).fetchone()[0]
+
+        report = run_analytics(conn, since, until, params, chunk)
+        py_events, py_seconds = _python_e2e(conn, devices, since, until, params)
+        conn.close()
+
+    return {
+        "devices": devices,
+        "days": days,
+        "history_days": history_days,
+        "readings": analysed,
+        "readings_with_history": devices * samples,
+        "seconds": report["seconds"],
+        "readings_per_s": rate(analysed, report["seconds"]),
+        "target_seconds": round(TARGET_READINGS * report["seconds"] / analysed),
+        "python_readings_per_s": rate(analysed, py_seconds),
+        "speedup": round(py_seconds / report["seconds"], 1),
+        "alerts": report["alerts"],
+        "events_match": py_events == report["alerts"],
+    }
+
+
+def _kernel(devices, days, history_days, params, chunk):
+    """Detectores sobre arreglos en memoria, un dispositivo a la vez."""
+    base_samples = int(history_days * 86400 / STEP)
+    samples = int(days * 86400 / STEP)
+    start = time.time() - (history_days + days) * 86400
+    seconds = 0.0
+    for device in range(devices):
+        ts, values = _series(base_samples + samples, device, start)
+        t0 = time.perf_counter()
+        _numpy_device(ts[:base_samples], values[:base_samples],
+                      ts[base_samples:], values[base_samples:], params, chunk)
+        seconds += time.perf_counter() - t0
+    return {
+        "devices": devices,
+        "days": days,
+        "readings": devices * samples,
+        "seconds": round(seconds, 2),
+        "readings_per_s": rate(devices * samples, seconds),
+    }
+
+
+def run(devices=100, days=30, e2e_devices=10, e2e_days=2, history_days=7, chunk=200000):
+    params = DetectorParams(baseline_days=history_days)
+    return {
+        "end_to_end": _end_to_end(e2e_devices, e2e_days, history_days, params, chunk),
+        "kernel_in_memory": _kernel(devices, days, history_days, params, chunk),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100, help="Dispositivos (núcleo)")
+    parser.add_argument("--days", type=float, default=30, help="Días por dispositivo (núcleo)")
+    parser.add_argument("--e2e-devices", type=int, default=10)
+    parser.add_argument("--e2e-days", type=float, default=2, help="Días analizados con SQLite")
+    parser.add_argument("--history-days", type=float, default=7,
+                        help="Días previos usados como línea base")
+    args = parser.parse_args()
+    print_results("analytics", run(args.devices, args.days, args.e2e_devices,
+                                   args.e2e_days, args.history_days))
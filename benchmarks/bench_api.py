@@ -0,0 +1,99 @@
+"""
+Prueba de carga del API de últimos valores: caché en memoria vs.
+consulta directa a SQLite en cada request.
+
+Uso:
+    python benchmarks/bench_api.py [--rows N] [--requests N] [--clients N]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from common import create_db, fill_sensor_readings, load_feeds, print_results, rate
+
+from api import start_api
+from cache import LatestValueCache, query_latest
+
+
+class DatabaseSource:
+    """Fuente sin caché: consulta SQLite en cada request."""
+
+    def __init__(self, db_path, feeds):
+        self.db_path = db_path
+        self.feeds = feeds
+
+    def snapshot(self, feed=None):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            data = query_latest(conn, self.feeds)
+        finally:
+            conn.close()
+        if feed is not None:
+            data = data.get(feed)
+            if data is None:
+                return None
+        body = json.dumps(data, separators=(",", ":")).encode()
+        return f'"{hash(body)}"', body
+
+
+def _load(port, requests, clients, conditional):
+    """Lanza `clients` hilos con keep-alive; retorna requests/s."""
+    per_client = requests // clients
+
+    def worker():
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        etag = None
+        for _ in range(per_client):
+            headers = {"If-None-Match": etag} if (conditional and etag) else {}
+            conn.request("GET", "/latest", headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            etag = resp.getheader("ETag")
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return rate(per_client * clients, time.perf_counter() - t0)
+
+
+def run(rows=200000, requests=4000, clients=4):
+    feeds = load_feeds()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        conn = create_db(db_path)
+        fill_sensor_readings(conn, rows)
+
+        cache = LatestValueCache()
+        cache.load_from_db(conn, feeds)
+        conn.close()
+
+        results = {"rows": rows, "requests": requests, "clients": clients}
+        for name, source in (("cached", cache), ("uncached", DatabaseSource(db_path, feeds))):
+            server = start_api(source, port=0)
+            port = server.server_address[1]
+            try:
+                results[f"{name}_per_s"] = _load(port, requests, clients, False)
+                results[f"{name}_conditional_per_s"] = _load(port, requests, clients, True)
+            finally:
+                server.shutdown()
+                server.server_close()
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--clients", type=int, default=4)
+    args = parser.parse_args()
+    print_results("api", run(args.rows, args.requests, args.clients))
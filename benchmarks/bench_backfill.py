@@ -0,0 +1,115 @@
+"""
+Backfill: throughput de carga de exportaciones de Adafruit IO y trazas
+JSONL, deduplicación al repetir la carga y precisión del replay.
+
+Genera un CSV por feed de sensor (formato "Download data" de Adafruit IO)
+y una traza JSONL con comandos y tramas binarias, los carga dos veces con
+run_backfill (la segunda solo ignora duplicados) y reproduce una traza
+corta a --speed con un publish ficticio.
+
+Uso:
+    python benchmarks/bench_backfill.py [--rows N] [--speed X]
+"""
+
+import argparse
+import base64
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import host_sim
+from common import load_feeds, print_results
+
+host_sim.install()
+
+from mqtt_client import TelemetryEncoder  # noqa: E402
+
+import backfill  # noqa: E402
+
+USER = "usuario"
+
+
+def _write_csv(path, feed, rows, start, step, seed):
+    rnd = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "value", "feed_id", "created_at", "lat", "lon", "ele"])
+        for i in range(rows):
+            ts = datetime.fromtimestamp(start + i * step, timezone.utc)
+            writer.writerow([f"0F{i:010d}", round(rnd.uniform(10, 90), 2), 1,
+                             ts.strftime("%Y-%m-%d %H:%M:%S UTC"), "", "", ""])
+
+
+def _write_trace(path, feeds, rows, start, step):
+    encoder = TelemetryEncoder(7)
+    with open(path, "w") as f:
+        for i in range(rows):
+            ts = start + i * step
+            if i % 10 == 0:
+                entry = {"ts": ts, "topic": f"{USER}/feeds/{feeds['led_cmd']}",
+                         "payload": "ON" if i % 20 else "OFF"}
+            else:
+                frame = bytes(encoder.encode(0, 20 + i % 10, 45.5, 120.0))
+                entry = {"ts": ts, "topic": f"{USER}/feeds/{feeds['telemetry']}",
+                         "payload_b64": base64.b64encode(frame).decode()}
+            f.write(json.dumps(entry) + "\n")
+
+
+def _replay(path, speed):
+    published = []
+    report = backfill.replay(backfill.read_trace(path),
+                             lambda topic, payload: published.append(topic),
+                             speed, user="local")
+    report["topic_example"] = published[0] if published else None
+    return report
+
+
+def run(rows=300000, speed=100.0):
+    feeds = load_feeds()
+    start = time.time() - 30 * 86400
+    results = {"rows_per_feed": rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, key in enumerate(("temperature", "humidity", "distance")):
+            path = os.path.join(tmp, f"{feeds[key]}.csv")
+            _write_csv(path, None, rows, start, 10.0, seed=i)
+            paths.append((path, feeds[key]))
+        trace = os.path.join(tmp, "traza.jsonl")
+        _write_trace(trace, feeds, rows, start, 10.0)
+
+        db = os.path.join(tmp, "backfill.db")
+        for label in ("first", "repeat"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                reports = [backfill.run_backfill(db, [path], feeds, feed)
+                           for path, feed in paths]
+                reports.append(backfill.run_backfill(db, [trace], feeds))
+            seconds = sum(r["seconds"] for r in reports)
+            records = sum(r["records"] for r in reports)
+            results[label] = {
+                "records": records,
+                "inserted": sum(r["inserted"] for r in reports),
+                "ignored": sum(r["ignored"] for r in reports),
+                "csv_rows_per_s": round(sum(r["records"] for r in reports[:3])
+                                        / sum(r["seconds"] for r in reports[:3])),
+                "trace_rows_per_s": reports[3]["rows_per_s"],
+                "rows_per_s": round(records / seconds),
+            }
+
+        short = os.path.join(tmp, "corta.jsonl")
+        _write_trace(short, feeds, 200, start, 0.5)
+        results["replay"] = _replay(short, speed)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300000, help="Filas por archivo")
+    parser.add_argument("--speed", type=float, default=100.0, help="Velocidad del replay")
+    args = parser.parse_args()
+    print_results("backfill", run(args.rows, args.speed))
@@ -0,0 +1,81 @@
+"""
+Línea de tiempo del arranque de main.py en el simulador de host.
+
+Ejecuta main() dos veces: arranque en frío (sin wifi_cache.json, con
+escaneo y DHCP) y arranque en caliente (BSSID e IP en caché). Se detiene
+tras la primera publicación y reporta los hitos de BootTimeline.
+
+Uso:
+    python benchmarks/bench_boot.py [--assoc S] [--fast-assoc S]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import host_sim
+from common import ROOT, print_results
+
+host_sim.install()
+
+import main as device_main  # noqa: E402
+
+
+def _boot_once():
+    """Corre main() hasta la primera publicación. Retorna los hitos."""
+    real_sleep = time.sleep
+
+    def sleep(seconds):
+        boot = device_main.boot
+        if boot is not None and boot.elapsed("first_publish") is not None:
+            raise KeyboardInterrupt
+        real_sleep(seconds)
+
+    time.sleep = sleep
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            device_main.main()
+    finally:
+        time.sleep = real_sleep
+    return device_main.boot.as_dict()
+
+
+def run(assoc=3.0, fast_assoc=0.8):
+    host_sim.WLAN.assoc_s = assoc
+    host_sim.WLAN.fast_assoc_s = fast_assoc
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(os.path.join(ROOT, "config_device.json"), tmp)
+        os.chdir(tmp)
+        try:
+            host_sim.WLAN.reset()
+            cold = _boot_once()
+            cache_saved = os.path.exists("wifi_cache.json")
+            host_sim.WLAN.reset()
+            warm = _boot_once()
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "assoc_s": assoc,
+        "fast_assoc_s": fast_assoc,
+        "cold_ms": cold,
+        "warm_ms": warm,
+        "wifi_cache_saved": cache_saved,
+        "cold_time_to_first_publish_ms": cold["first_publish"],
+        "warm_time_to_first_publish_ms": warm["first_publish"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assoc", type=float, default=3.0,
+                        help="Asociación simulada sin caché (s)")
+    parser.add_argument("--fast-assoc", type=float, default=0.8,
+                        help="Asociación simulada con caché (s)")
+    args = parser.parse_args()
+    print_results("boot", run(args.assoc, args.fast_assoc))
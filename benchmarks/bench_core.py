@@ -0,0 +1,211 @@
+"""
+Costo de las operaciones básicas del dispositivo y de la ingesta del
+backend en el simulador de host.
+
+- SimpleMQTT: codificación (publish) y decodificación (check_msg) de
+  paquetes PUBLISH sobre un socket simulado.
+- IoTDatabase: inserción, get_database_stats y get_average_readings
+  tras 10k / 100k / 1M lecturas.
+- main.check_alerts por lectura (sin alertas y con alertas de
+  temperatura/humedad).
+- Despacho de comandos de main.py: _internal_callback con los handlers
+  de main (on_led_cmd, on_buzzer_cmd) y apply_commands cada 10 mensajes.
+- backend.py: mensajes/s de on_message (add_log + add_message) con
+  flush por lotes a SQLite.
+
+Uso:
+    python benchmarks/bench_core.py [--records 10000,100000,1000000] [--messages N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+import host_sim
+from common import create_db, load_feeds, print_results, rate
+
+host_sim.install()
+
+import main as device_main  # noqa: E402
+from actuators import Buzzer, Led  # noqa: E402
+from database import IoTDatabase  # noqa: E402
+from mqtt_client import MQTTClientWrapper, SimpleMQTT, parse_onoff  # noqa: E402
+
+from ingest import IngestWriter  # noqa: E402
+
+USER = "usuario"
+
+
+def _us(seconds, count):
+    return round(seconds / count * 1e6, 3)
+
+
+def _publish_packet(topic, payload):
+    """PUBLISH QoS 0 tal como lo envía el broker."""
+    remaining = 2 + len(topic) + len(payload)
+    header = bytearray([0x30])
+    while remaining > 0x7F:
+        header.append((remaining & 0x7F) | 0x80)
+        remaining >>= 7
+    header.append(remaining)
+    return bytes(header) + len(topic).to_bytes(2, "big") + topic + payload
+
+
+def _mqtt(messages, feeds):
+    client = host_sim.connected_client(SimpleMQTT, "bench", "broker")
+    topic = f"{USER}/feeds/{feeds['temperature']}".encode()
+    payloads = [str(round(20 + i % 100 / 10, 1)).encode() for i in range(messages)]
+
+    t0 = time.perf_counter()
+    for payload in payloads:
+        client.publish(topic, payload)
+    encode_s = time.perf_counter() - t0
+    bytes_per_msg = client.sock.written / messages
+
+    received = [0]
+    client.set_callback(lambda t, m: received.__setitem__(0, received[0] + 1))
+    client.sock.inbox = bytearray(b"".join(_publish_packet(topic, p) for p in payloads))
+    t0 = time.perf_counter()
+    while client.check_msg() is not None:
+        pass
+    decode_s = time.perf_counter() - t0
+
+    return {
+        "encode_msgs_per_s": rate(messages, encode_s),
+        "decode_msgs_per_s": rate(received[0], decode_s),
+        "bytes_per_publish": round(bytes_per_msg, 1),
+    }
+
+
+def _database(records):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = IoTDatabase()
+    t0 = time.perf_counter()
+    for i in range(records):
+        db.insert_sensor_reading(20.0 + (i % 100) / 10, 45.5, 120.25)
+    insert_s = time.perf_counter() - t0
+
+    calls = 1000
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        db.get_database_stats()
+    stats_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        db.get_average_readings(1)
+    avg_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(records):
+        db.add_sample(temperature=20.0 + (i % 100) / 10, humidity=45.5)
+    sample_s = time.perf_counter() - t0
+
+    return {
+        "insert_us": _us(insert_s, records),
+        "stats_us": _us(stats_s, calls),
+        "average_us": _us(avg_s, calls),
+        "add_sample_us": _us(sample_s, records),
+        "stored": len(db.sensor_readings),
+    }
+
+
+def _device_globals():
+    """Estado global de main.py como lo deja main() sin MQTT."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        device_main.db = IoTDatabase()
+    device_main.mqtt = None
+    device_main.led = Led(2)
+    device_main.buzzer = Buzzer(3)
+    device_main.actuators.clear()
+    device_main.actuators["LED"] = (device_main.led, None)
+    device_main.actuators["Buzzer"] = (device_main.buzzer, None)
+    device_main.apply_thresholds({"temp_high": 30, "hum_low": 30, "dist_close": 10})
+
+
+def _alerts(readings):
+    _device_globals()
+    rnd = random.Random(1)
+    normal = [(round(rnd.uniform(20, 28), 1), round(rnd.uniform(40, 60), 1))
+              for _ in range(readings)]
+    alert = [(round(rnd.uniform(31, 35), 1), round(rnd.uniform(20, 29), 1))
+             for _ in range(readings)]
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, data in (("normal", normal), ("alert", alert)):
+            t0 = time.perf_counter()
+            for temp, hum in data:
+                device_main.check_alerts(temp, hum, None)
+            results[f"check_alerts_{name}_us"] = _us(time.perf_counter() - t0, readings)
+    return results
+
+
+def _dispatch(messages, feeds):
+    _device_globals()
+    with contextlib.redirect_stdout(io.StringIO()):
+        wrapper = MQTTClientWrapper("bench", USER, "aio_key_bench", device_main.on_mqtt_message)
+    wrapper.add_handler(feeds["led_cmd"], device_main.on_led_cmd, parse_onoff)
+    wrapper.add_handler(feeds["buzzer_cmd"], device_main.on_buzzer_cmd, parse_onoff)
+    rnd = random.Random(2)
+    topics = [wrapper.feed_topic(feeds[key]) for key in ("led_cmd", "buzzer_cmd")]
+    data = [(rnd.choice(topics), rnd.choice((b"ON", b"OFF"))) for _ in range(messages)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        for i, (topic, msg) in enumerate(data):
+            wrapper._internal_callback(topic, msg)
+            if i % 10 == 9:
+                device_main.apply_commands()
+        device_main.apply_commands()
+        seconds = time.perf_counter() - t0
+    return {
+        "msgs_per_s": rate(messages, seconds),
+        "coalesced": device_main.commands.coalesced,
+    }
+
+
+def _backend_insert(messages, feeds, batch=1000):
+    names = [feeds[key] for key in ("temperature", "humidity", "distance")]
+    data = [(names[i % 3], f"{20 + (i % 100) / 10:.1f}") for i in range(messages)]
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            conn = create_db(os.path.join(tmp, "bench.db"))
+        writer = IngestWriter(conn, feeds, batch_size=batch)
+        start = time.time()
+        t0 = time.perf_counter()
+        for i, (feed, payload) in enumerate(data):
+            # Igual que on_message en backend.py
+            now = start + i * 0.001
+            writer.add_log("recv", f"{USER}/feeds/{feed}:{payload}", now)
+            writer.add_message(feed, payload, now)
+            if writer.ready.is_set():
+                writer.flush()
+        writer.flush()
+        seconds = time.perf_counter() - t0
+        conn.close()
+    return {"msgs_per_s": rate(messages, seconds), "rows_written": writer.rows_written}
+
+
+def run(records=(10000, 100000, 1000000), messages=100000):
+    feeds = load_feeds()
+    return {
+        "simple_mqtt": _mqtt(messages, feeds),
+        "iot_database": {str(n): _database(n) for n in records},
+        "alerts": _alerts(min(messages, 20000)),
+        "dispatch": _dispatch(messages, feeds),
+        "backend_insert": _backend_insert(messages, feeds),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", default="10000,100000,1000000",
+                        help="Lecturas insertadas en IoTDatabase")
+    parser.add_argument("--messages", type=int, default=100000, help="Mensajes por caso")
+    args = parser.parse_args()
+    records = tuple(int(n) for n in args.records.split(","))
+    print_results("core", run(records, args.messages))
@@ -0,0 +1,89 @@
+"""
+Despacho de comandos MQTT: cadena de endswith() vs. tabla de handlers.
+
+Compara MQTTClientWrapper._internal_callback con el callback anterior
+(decodificar topic y payload y recorrer topic.endswith(...) por feed)
+y con la tabla topic-bytes → (handler, parser) registrada con
+add_handler, para distinta cantidad de feeds de comando.
+
+Uso:
+    python benchmarks/bench_dispatch.py [--messages N] [--feeds 2,10,50]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import host_sim
+from common import print_results, rate
+
+host_sim.install()
+
+from mqtt_client import MQTTClientWrapper, parse_onoff  # noqa: E402
+
+USER = "usuario"
+
+
+def _wrapper(on_message_cb=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return MQTTClientWrapper("bench", USER, "aio_key_bench", on_message_cb)
+
+
+def _messages(names, count, seed=1):
+    rnd = random.Random(seed)
+    return [(f"{USER}/feeds/{rnd.choice(names)}".encode(), rnd.choice((b"ON", b"OFF")))
+            for _ in range(count)]
+
+
+def _legacy(names, state):
+    """Callback como el on_mqtt_message original: un endswith por feed."""
+    suffixes = ["/" + name for name in names]
+
+    def on_message(topic, msg):
+        for i, suffix in enumerate(suffixes):
+            if topic.endswith(suffix):
+                state[i] = msg.upper() == "ON"
+                break
+
+    return on_message
+
+
+def _time(callback, messages):
+    t0 = time.perf_counter()
+    for topic, msg in messages:
+        callback(topic, msg)
+    return time.perf_counter() - t0
+
+
+def run(messages=200000, feed_counts=(2, 10, 50)):
+    results = {"messages": messages}
+    for count in feed_counts:
+        names = [f"relay-{i}-cmd" for i in range(count)]
+        data = _messages(names, messages)
+
+        state = [False] * count
+        legacy = _wrapper(_legacy(names, state))
+        legacy_s = _time(legacy._internal_callback, data)
+
+        table = _wrapper()
+        for i, name in enumerate(names):
+            table.add_handler(name, lambda on, i=i: state.__setitem__(i, on), parse_onoff)
+        table_s = _time(table._internal_callback, data)
+
+        results[f"{count}_feeds"] = {
+            "endswith_msgs_per_s": rate(messages, legacy_s),
+            "table_msgs_per_s": rate(messages, table_s),
+            "speedup": round(legacy_s / table_s, 2),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200000, help="Mensajes por caso")
+    parser.add_argument("--feeds", default="2,10,50", help="Cantidades de feeds")
+    args = parser.parse_args()
+    counts = tuple(int(n) for n in args.feeds.split(","))
+    print_results("dispatch", run(args.messages, counts))
@@ -0,0 +1,89 @@
+"""
+HC-SR04: medición bloqueante (time_pulse_us) vs. no bloqueante (IRQ).
+
+En el simulador de host el eco dura el tiempo de vuelo real. El bucle
+intenta medir a --hz y en cada iteración atiende "MQTT" (una llamada
+barata). Reporta lecturas por segundo, tiempo con la CPU bloqueada en el
+sensor por lectura, la mayor pausa entre atenciones MQTT y el error medio
+de la distancia medida.
+
+Uso:
+    python benchmarks/bench_distance.py [--seconds S] [--hz N] [--distance CM]
+"""
+
+import argparse
+import time
+
+import host_sim
+from common import print_results
+
+host_sim.install()
+
+from sensors import HCSR04Sensor  # noqa: E402
+
+PIN_TRIG = host_sim.HCSR04Echo.trig
+PIN_ECHO = host_sim.HCSR04Echo.echo
+
+
+def _loop(sensor, irq, seconds, hz):
+    period_us = int(1_000_000 / hz)
+    readings = []
+    blocked = 0.0
+    mqtt_calls = 0
+    max_gap = 0.0
+    next_us = time.ticks_us()
+    end = time.perf_counter() + seconds
+    last_mqtt = time.perf_counter()
+
+    while time.perf_counter() < end:
+        # "MQTT": solo mide cada cuánto se atiende
+        now = time.perf_counter()
+        max_gap = max(max_gap, now - last_mqtt)
+        last_mqtt = now
+        mqtt_calls += 1
+
+        t0 = time.perf_counter()
+        done = False
+        if time.ticks_diff(time.ticks_us(), next_us) >= 0 and not sensor.busy:
+            next_us = time.ticks_add(next_us, period_us)
+            if irq:
+                sensor.start()
+            else:
+                sensor.read_cm()
+                done = True
+        if sensor.poll():
+            done = True
+        blocked += time.perf_counter() - t0
+        if done:
+            readings.append(sensor.last_cm)
+
+        time.sleep_ms(1)
+
+    valid = [r for r in readings if r is not None]
+    return {
+        "readings_per_s": len(readings) / seconds,
+        "blocked_ms_per_reading": blocked * 1000 / max(1, len(readings)),
+        "mqtt_calls_per_s": mqtt_calls / seconds,
+        "max_mqtt_gap_ms": max_gap * 1000,
+        "mean_cm": sum(valid) / len(valid) if valid else None,
+        "timeouts": len(readings) - len(valid),
+    }
+
+
+def run(seconds=3.0, hz=20, distance=200.0):
+    host_sim.HCSR04Echo.distance_cm = distance
+    results = {"hz": hz, "distance_cm": distance}
+    for mode in ("blocking", "irq"):
+        sensor = HCSR04Sensor(PIN_TRIG, PIN_ECHO)
+        results[mode] = _loop(sensor, mode == "irq", seconds, hz)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duración por modo")
+    parser.add_argument("--hz", type=int, default=20, help="Frecuencia de medición")
+    parser.add_argument("--distance", type=float, default=200.0,
+                        help="Distancia simulada (cm)")
+    args = parser.parse_args()
+    print_results("distance", run(args.seconds, args.hz, args.distance))
@@ -0,0 +1,134 @@
+"""
+Memoria del dispositivo en el simulador de host.
+
+Compara la memoria retenida por IoTDatabase (tablas circulares de filas
+preasignadas) con la versión anterior (lista de dicts que crece sin
+límite) y las asignaciones por lectura del DHT22. Luego simula presión
+de memoria (Heap.free) y reporta cómo MemoryManager reduce los buffers.
+
+Uso:
+    python benchmarks/bench_memory.py [--readings N]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import host_sim
+from common import print_results
+
+host_sim.install()
+
+from database import IoTDatabase  # noqa: E402
+from memory import MEM_CRITICAL, MEM_OK, MemoryManager, LEVEL_NAMES  # noqa: E402
+from sensors import DHT22Sensor  # noqa: E402
+
+
+class _ListDatabase:
+    """IoTDatabase anterior: un dict por registro en una lista sin límite."""
+
+    def __init__(self):
+        self.sensor_readings = []
+        self._id_counter = 1
+
+    def insert_sensor_reading(self, temperature=None, humidity=None, distance=None):
+        record = {
+            "id": self._id_counter,
+            "timestamp": time.time(),
+            "temperature": temperature,
+            "humidity": humidity,
+            "distance": distance,
+        }
+        self.sensor_readings.append(record)
+        self._id_counter += 1
+        return record["id"]
+
+
+def _retained(factory, readings):
+    """Bytes retenidos tras insertar readings lecturas."""
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = factory()
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(readings):
+        db.insert_sensor_reading(20.0 + (i % 100) / 10, 40.5, 50.25)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current - base
+
+
+def _insert_transient(calls=1000):
+    """
+    Bytes temporales por insert_sensor_reading (pico durante la llamada
+    menos lo que queda asignado): tuplas de argumentos, iteradores, etc.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = IoTDatabase()
+    values = [(20.0 + i % 100 / 10, 40.5, 50.25) for i in range(calls)]
+    transient = 0
+    tracemalloc.start()
+    for temperature, humidity, distance in values:
+        tracemalloc.reset_peak()
+        db.insert_sensor_reading(temperature, humidity, distance)
+        current, peak = tracemalloc.get_traced_memory()
+        transient += peak - current
+    tracemalloc.stop()
+    return round(transient / calls, 1)
+
+
+def _read_alloc(sensor, calls=1000):
+    """Bytes asignados por llamada a DHT22Sensor.read (pico de tracemalloc)."""
+    sensor.read()
+    tracemalloc.start()
+    kept = []
+    for _ in range(calls):
+        kept.append(sensor.read())
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / calls, len({id(v) for v in kept})
+
+
+def _pressure():
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = IoTDatabase()
+    levels = []
+
+    def on_pressure(level, previous):
+        db.debug_logging = level == MEM_OK
+        if level > previous:
+            db.shrink(0.25 if level == MEM_CRITICAL else 0.5)
+        levels.append((LEVEL_NAMES[level], db.sensor_readings.capacity, db.debug_logging))
+
+    host_sim.Heap.free = 150 * 1024
+    mem = MemoryManager(on_pressure=on_pressure)
+    for free_kb in (100, 40, 30, 20, 12, 36, 45):
+        host_sim.Heap.free = free_kb * 1024
+        mem.check()
+    stats = mem.stats()
+    host_sim.Heap.free = 150 * 1024
+    return {"transitions": levels, "low_water": stats["low_water"],
+            "threshold": mem.threshold}
+
+
+def run(readings=100000):
+    list_bytes = _retained(_ListDatabase, readings)
+    ring_bytes = _retained(IoTDatabase, readings)
+    per_read, distinct = _read_alloc(DHT22Sensor(15))
+    return {
+        "readings": readings,
+        "list_db_retained_bytes": list_bytes,
+        "ring_db_retained_bytes": ring_bytes,
+        "insert_transient_bytes_per_call": _insert_transient(),
+        "dht_read_bytes_per_call": round(per_read, 1),
+        "dht_read_distinct_dicts": distinct,
+        "pressure": _pressure(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readings", type=int, default=100000, help="Lecturas insertadas")
+    args = parser.parse_args()
+    print_results("memory", run(args.readings))
@@ -0,0 +1,54 @@
+"""
+Benchmark de retención: throughput de borrado por lotes, agregados
+horarios y bytes recuperados con incremental_vacuum.
+
+Uso:
+    python benchmarks/bench_retention.py [--rows N] [--batch N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import create_db, fill_sensor_readings, print_results
+
+from retention import DEFAULT_POLICY, apply_retention
+
+
+def run(rows=300000, batch_size=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = create_db(os.path.join(tmp, "bench.db"))
+
+        # 14 días de datos: la mitad queda fuera de la ventana de 7 días
+        now = time.time()
+        step = 14 * 86400 / rows
+        fill_sensor_readings(conn, rows, start=now - 14 * 86400, step=step)
+        conn.executemany(
+            "INSERT INTO mqtt_logs (timestamp, event_type, details) VALUES (?, 'recv', ?)",
+            ((now - 2 * 86400 + i * (2 * 86400 / rows), "feed:0") for i in range(rows)),
+        )
+        conn.commit()
+
+        report = apply_retention(conn, DEFAULT_POLICY, now=now,
+                                 batch_size=batch_size, pause=0)
+        rollups = conn.execute("SELECT COUNT(*), SUM(samples) FROM sensor_rollups").fetchone()
+        conn.close()
+
+    return {
+        "rows": rows,
+        "batch_size": batch_size,
+        "deleted_total": report["deleted_total"],
+        "rows_per_second": report["rows_per_second"],
+        "reclaimed_bytes": report["reclaimed_bytes"],
+        "rollup_buckets": rollups[0],
+        "rollup_samples": rollups[1],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--batch", type=int, default=2000)
+    args = parser.parse_args()
+    print_results("retention", run(args.rows, args.batch))
@@ -0,0 +1,163 @@
+"""
+Muestreo adaptativo vs. muestreo fijo sobre una traza sintética.
+
+Simula (en tiempo virtual) DHT22 y HC-SR04 durante varias horas: el
+ambiente cambia lentamente con algunos saltos bruscos y cada cierto tiempo
+una persona pasa frente al sensor de distancia durante ~1 s. Compara el
+número de muestras (costo de energía) y los pasos detectados con
+AdaptiveSampler, con un muestreo fijo cada 5 s y con uno fijo al intervalo
+mínimo de cada sensor.
+
+Uso:
+    python benchmarks/bench_sampling.py [--hours H] [--walks N]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+
+import host_sim
+from common import ROOT, print_results
+
+host_sim.install()
+
+from scheduler import AdaptiveSampler  # noqa: E402
+
+TEMP_HIGH = 30
+HUM_LOW = 30
+DIST_CLOSE = 10
+
+
+class _Clock:
+    """Reloj virtual en ms para ticks_ms."""
+
+    def __init__(self):
+        self.ms = 0
+
+    def __call__(self):
+        return self.ms
+
+
+def _trace(hours, walks, seed=1):
+    """Funciones temp(t), hum(t), dist(t) con t en ms, y los pasos simulados."""
+    rnd = random.Random(seed)
+    total_ms = int(hours * 3600 * 1000)
+    steps = sorted(rnd.uniform(0, total_ms) for _ in range(max(1, int(hours))))
+    walk_times = sorted(rnd.uniform(0, total_ms - 2000) for _ in range(walks))
+    walk_len = 1000
+
+    def temp(t):
+        value = 24 + 2 * math.sin(t / 3_600_000)
+        value += sum(3 for s in steps if s <= t < s + 600_000)
+        return round(value + rnd.uniform(-0.2, 0.2), 1)
+
+    def hum(t):
+        return round(45 + 5 * math.cos(t / 5_400_000) + rnd.uniform(-0.5, 0.5), 1)
+
+    def dist(t):
+        for w in walk_times:
+            if w <= t < w + walk_len:
+                return round(5 + rnd.uniform(-1, 1), 2)
+        return round(200 + rnd.uniform(-1, 1), 2)
+
+    return total_ms, temp, hum, dist, [(w, w + walk_len) for w in walk_times]
+
+
+def _near(margins, temp=None, hum=None, dist=None):
+    if temp is not None and temp > TEMP_HIGH - margins.get("temperature", 0):
+        return True
+    if hum is not None and hum < HUM_LOW + margins.get("humidity", 0):
+        return True
+    if dist is not None and dist < DIST_CLOSE + margins.get("distance", 0):
+        return True
+    return False
+
+
+def _detected(sample_times, walks):
+    """Pasos con al menos una muestra dentro de su ventana."""
+    found = 0
+    i = 0
+    for start, end in walks:
+        while i < len(sample_times) and sample_times[i] < start:
+            i += 1
+        if i < len(sample_times) and sample_times[i] < end:
+            found += 1
+    return found
+
+
+def _run_adaptive(clock, total_ms, temp, hum, dist, cfg):
+    dht_cfg = cfg["dht"]
+    dist_cfg = cfg["distance"]
+    clock.ms = 0
+    dht_s = AdaptiveSampler.from_config("DHT22", dht_cfg)
+    dist_s = AdaptiveSampler.from_config("HC-SR04", dist_cfg)
+    dist_times = []
+    t0 = time.perf_counter()
+    while clock.ms < total_ms:
+        now = clock.ms
+        if dht_s.due(now):
+            t, h = temp(now), hum(now)
+            dht_s.update(now, (t, h), _near(dht_cfg.get("near_margin", {}), temp=t, hum=h))
+        if dist_s.due(now):
+            d = dist(now)
+            dist_times.append(now)
+            dist_s.update(now, (d,), _near(dist_cfg.get("near_margin", {}), dist=d))
+        clock.ms += min(dht_s.ms_until_due(clock.ms), dist_s.ms_until_due(clock.ms)) or 1
+    elapsed = time.perf_counter() - t0
+    return dht_s.samples, dist_s.samples, dist_times, elapsed
+
+
+def _fixed_times(total_ms, interval_ms):
+    return list(range(0, total_ms, int(interval_ms)))
+
+
+def run(hours=6.0, walks=60, baseline_s=5):
+    with open(os.path.join(ROOT, "config_device.json")) as f:
+        cfg = json.load(f)["sampling"]
+
+    clock = _Clock()
+    real_ticks = time.ticks_ms
+    time.ticks_ms = clock
+    try:
+        total_ms, temp, hum, dist, walk_windows = _trace(hours, walks)
+        dht_n, dist_n, dist_times, elapsed = _run_adaptive(clock, total_ms, temp, hum, dist, cfg)
+    finally:
+        time.ticks_ms = real_ticks
+
+    fixed = _fixed_times(total_ms, baseline_s * 1000)
+    dht_min = len(_fixed_times(total_ms, cfg["dht"]["min_s"] * 1000))
+    dist_min_times = _fixed_times(total_ms, cfg["distance"]["min_s"] * 1000)
+
+    return {
+        "hours": hours,
+        "walks": len(walk_windows),
+        "adaptive": {
+            "dht_samples": dht_n,
+            "distance_samples": dist_n,
+            "walks_detected": _detected(dist_times, walk_windows),
+            "sim_s": elapsed,
+        },
+        "fixed_baseline": {
+            "interval_s": baseline_s,
+            "dht_samples": len(fixed),
+            "distance_samples": len(fixed),
+            "walks_detected": _detected(fixed, walk_windows),
+        },
+        "fixed_min_interval": {
+            "dht_samples": dht_min,
+            "distance_samples": len(dist_min_times),
+            "walks_detected": _detected(dist_min_times, walk_windows),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=6.0, help="Duración simulada")
+    parser.add_argument("--walks", type=int, default=60, help="Pasos frente al sensor")
+    parser.add_argument("--baseline", type=float, default=5, help="Intervalo fijo (s)")
+    args = parser.parse_args()
+    print_results("sampling", run(args.hours, args.walks, args.baseline))
@@ -0,0 +1,124 @@
+"""
+Ingesta particionada: throughput con 1 a N procesos (un shard SQLite
+cada uno) y consulta combinada con ShardedQuery.
+
+Cada proceso genera los mensajes de texto de sus dispositivos
+(<usuario>/feeds/<feed>) y los pasa por ShardWorker.handle, la misma
+ruta que on_message, con flush por lotes. El tiempo se mide en el
+proceso padre desde que todos los shards arrancan hasta que terminan.
+
+El escalado con núcleos solo se puede medir con cpu_count > 1; con un
+núcleo las cifras muestran el costo de repartir la ingesta, no una
+mejora. Por eso no se reporta un speedup.
+
+Uso:
+    python benchmarks/bench_sharding.py [--devices N] [--messages N] [--max-shards N]
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from common import load_feeds, print_results, rate
+
+from sharding import ShardedQuery, ShardWorker, shard_paths
+
+SENSOR_KEYS = ("temperature", "humidity", "distance")
+
+
+def _fleet(devices):
+    return {f"pico-{i:03d}": i for i in range(1, devices + 1)}
+
+
+def _ingest(shard, shards, path, fleet, feeds, per_device, start, barrier):
+    with contextlib.redirect_stdout(io.StringIO()):
+        worker = ShardWorker(shard, shards, path, fleet, feeds, batch_size=5000)
+    names = [feeds[key] for key in SENSOR_KEYS]
+    messages = [
+        (f"{user}/feeds/{names[i % 3]}", f"{20 + (i % 50) / 10:.1f}", start + i)
+        for user in worker.devices
+        for i in range(per_device)
+    ]
+    barrier.wait()
+    writer = worker.writer
+    for topic, payload, ts in messages:
+        worker.handle(topic, payload, ts)
+        if writer.ready.is_set():
+            writer.flush()
+    writer.flush()
+    worker.conn.close()
+
+
+def _run_shards(tmp, shards, fleet, feeds, per_device, start):
+    paths = shard_paths(os.path.join(tmp, f"n{shards}.db"), shards)
+    barrier = mp.Barrier(shards + 1)
+    processes = [
+        mp.Process(target=_ingest,
+                   args=(k, shards, path, fleet, feeds, per_device, start, barrier))
+        for k, path in enumerate(paths)
+    ]
+    for p in processes:
+        p.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for p in processes:
+        p.join()
+    return paths, time.perf_counter() - t0
+
+
+def _query(paths, start, end):
+    query = ShardedQuery(paths)
+    try:
+        t0 = time.perf_counter()
+        rows = query.readings(start, end)
+        seconds = time.perf_counter() - t0
+        ordered = all(rows[i][0] <= rows[i + 1][0] for i in range(len(rows) - 1))
+        one = query.readings(start, end, device_id=7)
+        return {
+            "shards": len(paths),
+            "rows": len(rows),
+            "per_shard": query.count(start, end),
+            "ordered": ordered,
+            "merge_rows_per_s": rate(len(rows), seconds),
+            "device_7_rows": len(one),
+            "latest_devices": len(query.latest(load_feeds())),
+        }
+    finally:
+        query.close()
+
+
+def run(devices=64, messages=200000, max_shards=None):
+    feeds = load_feeds()
+    fleet = _fleet(devices)
+    per_device = messages // devices
+    start = time.time() - per_device - 60
+    max_shards = max_shards or max(2, os.cpu_count() or 1)
+    counts = sorted({n for n in (1, 2, 4, 8, max_shards) if n <= max_shards})
+
+    results = {"cpu_count": os.cpu_count(), "devices": devices,
+               "messages": per_device * devices, "ingest": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        last = None
+        for shards in counts:
+            paths, seconds = _run_shards(tmp, shards, fleet, feeds, per_device, start)
+            results["ingest"].append({
+                "shards": shards,
+                "seconds": round(seconds, 3),
+                "msgs_per_s": rate(per_device * devices, seconds),
+            })
+            last = paths
+        results["query"] = _query(last, start, start + per_device)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=64, help="Dispositivos de la flota")
+    parser.add_argument("--messages", type=int, default=200000, help="Mensajes totales")
+    parser.add_argument("--max-shards", type=int, help="Shards máximos (default: núcleos)")
+    args = parser.parse_args()
+    print_results("sharding", run(args.devices, args.messages, args.max_shards))
@@ -0,0 +1,97 @@
+"""
+Compara perfiles de PRAGMAs (schema.PROFILES) en ingesta y consultas
+sobre un dataset generado.
+
+Ingesta "per_row": un commit por mensaje, como backend.py.
+Ingesta "batched": executemany en transacciones de 1000 filas.
+Consultas: último valor por feed y promedios de la última hora.
+
+Uso:
+    python benchmarks/bench_sqlite_profiles.py [--rows N] [--per-row N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import create_db, fill_sensor_readings, load_feeds, print_results, rate
+
+from cache import query_latest
+from schema import PROFILES
+
+
+_INSERT = """
+    INSERT INTO sensor_readings (timestamp, temperature, humidity, distance)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+def _row(ts, i):
+    # Una métrica por fila, rotando entre los tres feeds
+    values = [None, None, None]
+    values[i % 3] = 20.0 + i % 10
+    return (ts, *values)
+
+
+def _ingest_per_row(conn, count):
+    t0 = time.perf_counter()
+    for i in range(count):
+        conn.execute(_INSERT, _row(time.time(), i))
+        conn.commit()
+    return rate(count, time.perf_counter() - t0)
+
+
+def _ingest_batched(conn, count, batch=1000):
+    now = time.time()
+    t0 = time.perf_counter()
+    for start in range(0, count, batch):
+        conn.executemany(_INSERT, [_row(now + i, i) for i in range(start, min(start + batch, count))])
+        conn.commit()
+    return rate(count, time.perf_counter() - t0)
+
+
+def _queries(conn, feeds, count):
+    t0 = time.perf_counter()
+    for _ in range(count):
+        query_latest(conn, feeds)
+    latest_qps = rate(count, time.perf_counter() - t0)
+
+    since = time.time() - 3600
+    t0 = time.perf_counter()
+    for _ in range(count):
+        conn.execute("""
+            SELECT AVG(temperature), AVG(humidity), AVG(distance)
+            FROM sensor_readings WHERE timestamp >= ?
+        """, (since,)).fetchone()
+    range_qps = rate(count, time.perf_counter() - t0)
+    return latest_qps, range_qps
+
+
+def run(rows=500000, per_row=2000, queries=500):
+    feeds = load_feeds()
+    results = {"rows": rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in PROFILES:
+            conn = create_db(os.path.join(tmp, f"{name}.db"), name)
+            fill_sensor_readings(conn, rows)
+            per_row_rate = _ingest_per_row(conn, per_row)
+            batched_rate = _ingest_batched(conn, rows // 5)
+            latest_qps, range_qps = _queries(conn, feeds, queries)
+            conn.close()
+            results[name] = {
+                "ingest_per_row_per_s": per_row_rate,
+                "ingest_batched_per_s": batched_rate,
+                "latest_queries_per_s": latest_qps,
+                "last_hour_avg_queries_per_s": range_qps,
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--per-row", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    print_results("sqlite_profiles", run(args.rows, args.per_row, args.queries))
@@ -0,0 +1,144 @@
+"""
+Resúmenes por ventana vs. publicación de cada lectura.
+
+Simula (en tiempo virtual) el muestreo local rápido del DHT22 (cada 2 s)
+y del HC-SR04 (cada 50 ms) con picos de temperatura cortos y personas que
+pasan frente al sensor. Compara el tráfico MQTT (mensajes y bytes de los
+paquetes PUBLISH) y los picos visibles entre la publicación actual (última
+lectura de cada sensor cada publish_s) y un resumen min/max/media/último
+por ventana calculado con IoTDatabase.
+
+Uso:
+    python benchmarks/bench_summary.py [--hours H] [--summary-s S]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import random
+
+import host_sim
+from common import load_feeds, print_results
+
+host_sim.install()
+
+from database import IoTDatabase  # noqa: E402
+
+USER = "usuario"
+DHT_MS = 2000
+DIST_MS = 50
+SPIKE_MS = 3000      # picos de temperatura más cortos que publish_s
+WALK_MS = 1000
+SPIKE_DELTA = 6.0
+WALK_CM = 40.0
+
+
+def _publish_size(topic, payload):
+    """Bytes de un PUBLISH QoS 0: cabecera fija + largo + topic + payload."""
+    remaining = 2 + len(topic) + len(payload)
+    return 1 + (1 if remaining < 128 else 2) + remaining
+
+
+def _events(total_ms, count, length, rnd):
+    slots = total_ms // count
+    return [i * slots + rnd.randrange(0, slots - length) for i in range(count)]
+
+
+def _inside(events, length, t):
+    for start in events:
+        if start <= t < start + length:
+            return True
+    return False
+
+
+def run(hours=4.0, summary_s=60, publish_s=5, spikes=20, walks=40, seed=3):
+    feeds = load_feeds()
+    rnd = random.Random(seed)
+    total_ms = int(hours * 3600 * 1000)
+    spike_at = _events(total_ms, spikes, SPIKE_MS, rnd)
+    walk_at = _events(total_ms, walks, WALK_MS, rnd)
+
+    topics = {key: f"{USER}/feeds/{feeds[key]}"
+              for key in ("temperature", "humidity", "distance", "summary")}
+    clock = [0.0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = IoTDatabase()
+    db._ts = lambda: clock[0]
+    db.summary.reset(0.0)
+
+    raw = {"messages": 0, "bytes": 0, "spikes_seen": set(), "walks_seen": set()}
+    summ = {"messages": 0, "bytes": 0, "spikes_seen": set(), "walks_seen": set()}
+    temp = hum = dist = None
+    samples = 0
+    window_spikes = set()
+    window_walks = set()
+
+    for t in range(0, total_ms, DIST_MS):
+        clock[0] = t / 1000
+        spike = _inside(spike_at, SPIKE_MS, t)
+        walk = _inside(walk_at, WALK_MS, t)
+
+        if t % DHT_MS == 0:
+            temp = round(24 + 2 * math.sin(t / 3_600_000) + (SPIKE_DELTA if spike else 0)
+                         + rnd.uniform(-0.2, 0.2), 1)
+            hum = round(45 + rnd.uniform(-0.5, 0.5), 1)
+            db.add_sample(temperature=temp, humidity=hum)
+            samples += 1
+            if spike:
+                window_spikes.add(next(s for s in spike_at if s <= t < s + SPIKE_MS))
+        dist = round(WALK_CM if walk else 200 + rnd.uniform(-1, 1), 1)
+        db.add_sample(distance=dist)
+        samples += 1
+        if walk:
+            window_walks.add(next(w for w in walk_at if w <= t < w + WALK_MS))
+
+        # Publicación actual: última lectura de cada sensor cada publish_s
+        if t % (publish_s * 1000) == 0:
+            db.insert_sensor_reading(temp, hum, dist)
+            for key, value in (("temperature", temp), ("humidity", hum), ("distance", dist)):
+                raw["messages"] += 1
+                raw["bytes"] += _publish_size(topics[key], str(value))
+            # Visible solo si el valor publicado lo muestra
+            if temp >= 24 + SPIKE_DELTA - 2.5:
+                raw["spikes_seen"].add(max(s for s in spike_at if s <= t))
+            if dist <= WALK_CM + 5:
+                raw["walks_seen"].add(max(w for w in walk_at if w <= t))
+
+        # Resumen: un mensaje por ventana
+        if t and t % (summary_s * 1000) == 0:
+            summary = db.close_summary()
+            payload = json.dumps(summary, separators=(",", ":"))
+            summ["messages"] += 1
+            summ["bytes"] += _publish_size(topics["summary"], payload)
+            if summary["temperature"][1] >= 24 + SPIKE_DELTA - 2.5:
+                summ["spikes_seen"] |= window_spikes
+            if summary["distance"][0] <= WALK_CM + 5:
+                summ["walks_seen"] |= window_walks
+            window_spikes = set()
+            window_walks = set()
+
+    for result in (raw, summ):
+        result["spikes_seen"] = len(result["spikes_seen"])
+        result["walks_seen"] = len(result["walks_seen"])
+    return {
+        "hours": hours,
+        "local_samples": samples,
+        "spikes": spikes,
+        "walks": walks,
+        "raw_every_publish_s": raw,
+        "summary_every_summary_s": summ,
+        "message_reduction": round(raw["messages"] / summ["messages"], 1),
+        "byte_reduction": round(raw["bytes"] / summ["bytes"], 1),
+        "example": payload,
+        "average_last_hour": db.get_average_readings(1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=4.0, help="Horas simuladas")
+    parser.add_argument("--summary-s", type=int, default=60, help="Ventana del resumen (s)")
+    args = parser.parse_args()
+    print_results("summary", run(args.hours, args.summary_s))
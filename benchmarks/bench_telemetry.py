@@ -0,0 +1,103 @@
+"""
+Formato de telemetría: texto (un mensaje por valor) vs. trama binaria.
+
+Mide bytes por lectura en el cable (paquete PUBLISH completo), costo de
+codificación en SimpleMQTT y throughput de decodificación en el backend
+(float(payload) por mensaje vs. decode_frames por lotes).
+
+Uso:
+    python benchmarks/bench_telemetry.py [--readings N] [--batch N]
+"""
+
+import argparse
+import random
+import time
+
+import host_sim
+from common import load_feeds, print_results, rate
+
+host_sim.install()
+
+from mqtt_client import SimpleMQTT, TelemetryEncoder  # noqa: E402
+
+import telemetry  # noqa: E402
+
+
+def _readings(count, seed=1):
+    rnd = random.Random(seed)
+    return [(round(rnd.uniform(15, 35), 1), round(rnd.uniform(20, 80), 1),
+             round(rnd.uniform(2, 400), 2)) for _ in range(count)]
+
+
+def _encode_text(client, topics, readings):
+    t0 = time.perf_counter()
+    for reading in readings:
+        for topic, value in zip(topics, reading):
+            client.publish(topic, str(value).encode())
+    return time.perf_counter() - t0
+
+
+def _encode_binary(client, topic, readings):
+    encoder = TelemetryEncoder(1)
+    now = int(time.time())
+    t0 = time.perf_counter()
+    for t, h, d in readings:
+        client.publish(topic, encoder.encode(now, t, h, d))
+    return time.perf_counter() - t0
+
+
+def run(readings=50000, batch=1000):
+    feeds = load_feeds()
+    user = "usuario"
+    topics = [f"{user}/feeds/{feeds[k]}".encode() for k in ("temperature", "humidity", "distance")]
+    telemetry_topic = f"{user}/feeds/{feeds.get('telemetry', 'telemetria')}".encode()
+    data = _readings(readings)
+
+    text_client = host_sim.connected_client(SimpleMQTT, b"bench", "localhost")
+    text_seconds = _encode_text(text_client, topics, data)
+
+    bin_client = host_sim.connected_client(SimpleMQTT, b"bench", "localhost")
+    bin_seconds = _encode_binary(bin_client, telemetry_topic, data)
+
+    # Payloads tal como los recibe el backend
+    text_payloads = [str(v).encode() for reading in data for v in reading]
+    encoder = TelemetryEncoder(1)
+    now = int(time.time())
+    frames = [bytes(encoder.encode(now, *reading)) for reading in data]
+    received = [time.time()] * len(frames)
+
+    t0 = time.perf_counter()
+    for payload in text_payloads:
+        float(payload.decode())
+    text_decode = time.perf_counter() - t0
+
+    results = {
+        "readings": readings,
+        "text_bytes_per_reading": round(text_client.sock.written / readings, 1),
+        "binary_bytes_per_reading": round(bin_client.sock.written / readings, 1),
+        "text_encode_readings_per_s": rate(readings, text_seconds),
+        "binary_encode_readings_per_s": rate(readings, bin_seconds),
+        "text_decode_readings_per_s": rate(readings, text_decode),
+    }
+
+    for name, np in (("numpy", telemetry.np), ("python", None)):
+        if name == "numpy" and np is None:
+            continue
+        saved, telemetry.np = telemetry.np, np
+        try:
+            t0 = time.perf_counter()
+            for start in range(0, len(frames), batch):
+                telemetry.decode_frames(frames[start:start + batch], received[start:start + batch])
+            results[f"binary_decode_{name}_readings_per_s"] = rate(readings, time.perf_counter() - t0)
+        finally:
+            telemetry.np = saved
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readings", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    print_results("telemetry", run(args.readings, args.batch))
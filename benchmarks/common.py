@@ -0,0 +1,58 @@
+"""
+Utilidades compartidas por los benchmarks (CPython).
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+CORE_DIR = os.path.join(ROOT, "core")
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from schema import open_database
+
+
+def load_feeds():
+    """Feeds definidos en config_device.json."""
+    with open(os.path.join(ROOT, "config_device.json")) as f:
+        return json.load(f)["feeds"]
+
+
+def create_db(path, profile="balanced"):
+    """Crea una base SQLite vacía con el esquema migrado del backend."""
+    return open_database(path, profile)
+
+
+def fill_sensor_readings(conn, rows, start=None, step=5.0, seed=1):
+    """Inserta lecturas sintéticas (una métrica por fila, como backend.py)."""
+    rnd = random.Random(seed)
+    if start is None:
+        start = time.time() - rows * step
+    columns = ("temperature", "humidity", "distance")
+    data = []
+    for i in range(rows):
+        values = [None, None, None]
+        values[i % 3] = round(rnd.uniform(15, 35), 2)
+        data.append((start + i * step, *values))
+    conn.executemany("""
+        INSERT INTO sensor_readings (timestamp, temperature, humidity, distance)
+        VALUES (?, ?, ?, ?)
+    """, data)
+    conn.commit()
+    return columns
+
+
+def rate(count, seconds):
+    """Operaciones por segundo redondeadas."""
+    return round(count / seconds, 1) if seconds > 0 else float("inf")
+
+
+def print_results(name, results):
+    """Imprime resultados en JSON legible."""
+    print(json.dumps({name: results}, indent=2))
@@ -0,0 +1,319 @@
+"""
+Simulador de host: módulos de MicroPython sobre CPython.
+
+Registra en sys.modules versiones mínimas de usocket, ustruct, ujson,
+ubinascii, utime, machine (con IRQ de pines y eco del HC-SR04 simulado),
+dht y network, agrega a gc las funciones de memoria de MicroPython
+(heap simulado en Heap) y agrega core/ al path para
+importar los módulos del dispositivo tal como en el Pico (imports planos).
+
+    import host_sim
+    host_sim.install()
+    from mqtt_client import SimpleMQTT
+"""
+
+import binascii
+import gc
+import json
+import random
+import struct
+import sys
+import threading
+import time
+import types
+
+from common import CORE_DIR, ROOT
+
+# Referencia propia: los benchmarks pueden reemplazar time.sleep
+_real_sleep = time.sleep
+
+
+class FakeSocket:
+    """Socket que acumula lo escrito y lee de un buffer de entrada."""
+
+    def __init__(self, *args):
+        self.written = 0
+        self.inbox = bytearray()
+        self.keep = False
+        self.data = bytearray()
+
+    def connect(self, addr):
+        pass
+
+    def write(self, buf, n=None):
+        n = len(buf) if n is None else n
+        self.written += n
+        if self.keep:
+            self.data += bytes(buf[:n])
+        return n
+
+    def read(self, n):
+        if not self.inbox:
+            return None
+        chunk = bytes(self.inbox[:n])
+        del self.inbox[:n]
+        return chunk
+
+    def setblocking(self, flag):
+        pass
+
+    def close(self):
+        pass
+
+
+class BrokerSocket(FakeSocket):
+    """FakeSocket que responde CONNACK y SUBACK como un broker."""
+
+    def write(self, buf, n=None):
+        n = super().write(buf, n)
+        if n and buf[0] == 0x10:
+            self.inbox += b"\x20\x02\x00\x00"
+        elif n >= 4 and buf[0] == 0x82:
+            self.inbox += b"\x90\x03" + bytes(buf[2:4]) + b"\x00"
+        return n
+
+
+def _module(name, **attrs):
+    mod = types.ModuleType(name)
+    for key, value in attrs.items():
+        setattr(mod, key, value)
+    return mod
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    # Último Pin creado por número de GPIO (para el eco simulado)
+    _by_num = {}
+
+    def __init__(self, num, mode=IN, pull=None):
+        self.num = num
+        self.mode = mode
+        self._value = 0
+        self._handler = None
+        self._trigger = 0
+        self._hard = False
+        Pin._by_num[num] = self
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        old = self._value
+        self._value = 1 if v else 0
+        if old and not self._value and self.num == HCSR04Echo.trig:
+            HCSR04Echo.fire()
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._handler = handler
+        self._trigger = trigger
+        self._hard = hard
+
+    def _edge(self, level):
+        """Cambio de nivel externo: llama al handler como una IRQ."""
+        self._value = level
+        mask = self.IRQ_RISING if level else self.IRQ_FALLING
+        if self._handler is not None and self._trigger & mask:
+            self._handler(self)
+
+
+class HCSR04Echo:
+    """
+    HC-SR04 simulado. Al bajar el pin de disparo, un hilo sube el pin de
+    eco y lo baja tras el tiempo de vuelo (tiempos reales), llamando a la
+    IRQ registrada. distance_cm = None simula que no hay eco.
+    """
+
+    trig = 5
+    echo = 4
+    distance_cm = 50.0
+    delay_us = 500
+
+    @classmethod
+    def duration_us(cls):
+        if cls.distance_cm is None:
+            return None
+        return int(cls.distance_cm * 2 * 29.1)
+
+    @classmethod
+    def fire(cls):
+        pin = Pin._by_num.get(cls.echo)
+        duration = cls.duration_us()
+        if pin is None or pin._handler is None or duration is None:
+            return
+
+        def echo():
+            _real_sleep(cls.delay_us / 1e6)
+            pin._edge(1)
+            _real_sleep(duration / 1e6)
+            pin._edge(0)
+
+        threading.Thread(target=echo, daemon=True).start()
+
+
+def time_pulse_us(pin, level, timeout_us):
+    # Bloquea como en el Pico: espera el eco y su duración
+    duration = HCSR04Echo.duration_us()
+    if duration is None or duration > timeout_us:
+        _real_sleep(timeout_us / 1e6)
+        return -1
+    _real_sleep((HCSR04Echo.delay_us + duration) / 1e6)
+    return duration
+
+
+class DHT22:
+    def __init__(self, pin):
+        self.pin = pin
+
+    def measure(self):
+        pass
+
+    def temperature(self):
+        return 24.0
+
+    def humidity(self):
+        return 40.0
+
+
+class WLAN:
+    """
+    WLAN con tiempos de asociación simulados (en segundos reales).
+    Con BSSID y canal conocidos e IP estática se omiten escaneo y DHCP.
+    """
+
+    assoc_s = 3.0
+    fast_assoc_s = 0.8
+    _connected_at = None
+    _static = None
+    _ssid = None
+
+    def __init__(self, interface=0):
+        self._active = False
+
+    def active(self, flag=None):
+        if flag is None:
+            return self._active
+        self._active = flag
+        if not flag:
+            WLAN._connected_at = None
+            WLAN._static = None
+
+    def connect(self, ssid, password, bssid=None, channel=None):
+        fast = bssid is not None and channel is not None and WLAN._static is not None
+        WLAN._ssid = ssid
+        WLAN._connected_at = time.perf_counter() + (self.fast_assoc_s if fast else self.assoc_s)
+
+    def isconnected(self):
+        return WLAN._connected_at is not None and time.perf_counter() >= WLAN._connected_at
+
+    def disconnect(self):
+        WLAN._connected_at = None
+
+    def ifconfig(self, config=None):
+        if config == "dhcp":
+            WLAN._static = None
+            return None
+        if config is not None:
+            WLAN._static = tuple(config)
+            return None
+        return WLAN._static or ("10.0.0.2", "255.255.255.0", "10.0.0.1", "10.0.0.1")
+
+    def ipconfig(self, dhcp4=None):
+        if dhcp4:
+            WLAN._static = None
+
+    def scan(self):
+        _real_sleep(0.5)
+        return [((WLAN._ssid or "").encode(), b"\x02\x11\x22\x33\x44\x55", 6, -50, 3, False)]
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -50
+        return 3 if self.isconnected() else 1
+
+    @classmethod
+    def reset(cls):
+        cls._connected_at = None
+        cls._static = None
+        cls._ssid = None
+
+
+class Heap:
+    """Heap simulado para gc.mem_free()/mem_alloc() (ajustable en pruebas)."""
+
+    size = 192 * 1024
+    free = 150 * 1024
+    threshold = -1
+
+    @classmethod
+    def mem_free(cls):
+        return cls.free
+
+    @classmethod
+    def mem_alloc(cls):
+        return cls.size - cls.free
+
+    @classmethod
+    def set_threshold(cls, amount=None):
+        if amount is None:
+            return cls.threshold
+        cls.threshold = amount
+
+
+def _ticks_ms():
+    return int(time.perf_counter() * 1000)
+
+
+def _ticks_us():
+    return int(time.perf_counter() * 1000000)
+
+
+def install():
+    """Registra los módulos simulados (idempotente)."""
+    if "machine" in sys.modules:
+        return
+    # En el Pico main.py y los módulos de core/ están en la misma carpeta
+    for path in (ROOT, CORE_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    utime = _module(
+        "utime",
+        time=time.time,
+        sleep=time.sleep,
+        sleep_ms=lambda ms: time.sleep(ms / 1000),
+        sleep_us=lambda us: None,
+        ticks_ms=_ticks_ms,
+        ticks_us=_ticks_us,
+        ticks_diff=lambda a, b: a - b,
+        ticks_add=lambda a, b: a + b,
+    )
+    sys.modules.update({
+        "usocket": _module("usocket", socket=BrokerSocket,
+                           getaddrinfo=lambda host, port: [(0, 0, 0, "", (host, port))]),
+        "ustruct": struct,
+        "ujson": json,
+        "ubinascii": binascii,
+        "urandom": random,
+        "utime": utime,
+        "machine": _module("machine", Pin=Pin, time_pulse_us=time_pulse_us),
+        "dht": _module("dht", DHT22=DHT22),
+        "network": _module("network", WLAN=WLAN, STA_IF=0),
+    })
+    # En MicroPython time también expone ticks_*
+    for name in ("sleep_ms", "sleep_us", "ticks_ms", "ticks_us", "ticks_diff", "ticks_add"):
+        setattr(time, name, getattr(utime, name))
+    # Y gc las funciones de memoria de MicroPython
+    gc.mem_free = Heap.mem_free
+    gc.mem_alloc = Heap.mem_alloc
+    gc.threshold = Heap.set_threshold
+
+
+def connected_client(cls, *args, **kwargs):
+    """Crea un SimpleMQTT con un FakeSocket ya conectado."""
+    client = cls(*args, **kwargs)
+    client.sock = FakeSocket()
+    return client
@@ -0,0 +1,345 @@
+"""
+Ejecuta la suite de benchmarks, guarda los resultados en JSON y los
+compara con una línea base.
+
+Cada suite es el run() de un bench_*.py con parámetros reducidos. Las
+métricas comparables se eligen por nombre: las terminadas en _per_s deben
+subir y las terminadas en _us, _ms o seconds deben bajar. El resto es
+informativo: conteos, bytes, listas, los peores casos (max_*, dependen
+del planificador del sistema) y las relaciones entre dos caminos
+(speedup), que se reportan pero no se comparan.
+
+Con --repeat N cada suite se ejecuta N veces (3 por defecto), en rondas
+intercaladas con las demás, y se guarda la mediana de cada métrica junto
+con su dispersión (desviación absoluta mediana relativa a la mediana).
+Solo se comparan las métricas estables: las que tienen dispersión <=
+--max-spread en la línea base y en la corrida actual. Las demás se
+listan como inestables sin afectar el resultado.
+La línea base se graba con más repeticiones (--update-baseline usa 5 si
+no se indica --repeat).
+
+Una métrica empeora si se aleja de la línea base más que --tolerance
+(fracción); en ese caso sale con código 1. Cada suite registra además una
+calibración (un bucle fijo de Python puro medido antes y después de cada
+ejecución). Con --scale la línea base se escala por la relación entre
+calibraciones, útil para comparar contra otra máquina; no se aplica por
+defecto porque la calibración varía tanto como las métricas entre corridas
+y no sigue a las que dependen de SQLite o de un reloj simulado.
+
+Uso:
+    python benchmarks/run.py                          # todas las suites
+    python benchmarks/run.py --suites core,dispatch --repeat 1   # rápido
+    python benchmarks/run.py --update-baseline        # guardar línea base
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from common import ROOT
+
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUT = os.path.join(BENCH_DIR, "results.json")
+
+# nombre -> (módulo, parámetros de run())
+SUITES = {
+    "core": ("bench_core", {"records": (10000, 100000, 1000000), "messages": 100000}),
+    "dispatch": ("bench_dispatch", {"messages": 100000}),
+    "telemetry": ("bench_telemetry", {"readings": 20000}),
+    "memory": ("bench_memory", {"readings": 50000}),
+    "summary": ("bench_summary", {"hours": 2.0}),
+    "sampling": ("bench_sampling", {"hours": 2.0, "walks": 20}),
+    "distance": ("bench_distance", {"seconds": 1.0}),
+    "boot": ("bench_boot", {}),
+    "api": ("bench_api", {"rows": 50000, "requests": 2000}),
+    "sqlite_profiles": ("bench_sqlite_profiles", {"rows": 100000}),
+    "retention": ("bench_retention", {"rows": 100000}),
+    "backfill": ("bench_backfill", {"rows": 50000}),
+    "analytics": ("bench_analytics", {"devices": 10, "days": 7, "e2e_devices": 2, "e2e_days": 1}),
+    "sharding": ("bench_sharding", {"messages": 50000, "max_shards": 2}),
+}
+
+HIGHER_BETTER = ("_per_s",)
+LOWER_BETTER = ("_us", "_ms", "seconds")
+
+
+def direction(key):
+    """+1 si la métrica debe subir, -1 si debe bajar, 0 si no se compara."""
+    if key.startswith("max_"):
+        return 0
+    if key.endswith(HIGHER_BETTER):
+        return 1
+    if key.endswith(LOWER_BETTER):
+        return -1
+    return 0
+
+
+def flatten(results, prefix=""):
+    """{"a": {"b": 1}} -> {"a.b": 1} (solo valores numéricos)."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def calibrate(rounds=7, size=100000):
+    """Operaciones/s de un bucle fijo de Python puro (mediana de rounds)."""
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        acc = 0
+        data = {}
+        for i in range(size):
+            acc += i * 3 % 7
+            data[i & 1023] = acc
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return round(size / times[len(times) // 2], 1)
+
+
+def compare(results, baseline, tolerance, speed=1.0, stable=None):
+    """
+    Compara las métricas con dirección conocida. speed es la calibración
+    actual dividida por la de la línea base; stable, si se indica, es el
+    conjunto de métricas (aplanadas) que se pueden comparar.
+
+    Returns:
+        dict: regressions / improvements como listas de
+        {"metric", "baseline", "current", "change"}, el total comparado y
+        las métricas omitidas por inestables
+    """
+    current = flatten(results)
+    base = flatten(baseline)
+    regressions = []
+    improvements = []
+    unstable = []
+    compared = 0
+    for name, old in base.items():
+        sign = direction(name.rsplit(".", 1)[-1])
+        new = current.get(name)
+        if not sign or new is None or not old:
+            continue
+        if stable is not None and name not in stable:
+            unstable.append(name)
+            continue
+        compared += 1
+        expected = old * speed if sign > 0 else old / speed
+        # Cambio relativo positivo = mejor
+        change = sign * (new - expected) / abs(expected)
+        entry = {"metric": name, "baseline": old, "expected": round(expected, 3),
+                 "current": new, "change": round(change, 3)}
+        if change < -tolerance:
+            regressions.append(entry)
+        elif change > tolerance:
+            improvements.append(entry)
+    return {"compared": compared, "regressions": regressions, "improvements": improvements,
+            "unstable": unstable}
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def median_of(runs):
+    """
+    Combina varias ejecuciones de una suite: mediana de cada valor
+    numérico; lo demás (textos, listas) se toma de la primera.
+    """
+    merged = {}
+    for key, value in runs[0].items():
+        values = [run[key] for run in runs if key in run]
+        if isinstance(value, dict):
+            merged[key] = median_of([v for v in values if isinstance(v, dict)])
+        elif _number(value) and all(_number(v) for v in values):
+            mid = statistics.median(values)
+            merged[key] = round(mid, 3) if isinstance(mid, float) else mid
+        else:
+            merged[key] = value
+    return merged
+
+
+def spread_of(runs, prefix):
+    """
+    Dispersión relativa de cada métrica comparable, con nombres aplanados:
+    desviación absoluta mediana / mediana (una corrida atípica no la
+    altera). Vacío con una sola ejecución.
+    """
+    if len(runs) < 2:
+        return {}
+    flats = [flatten(run, prefix) for run in runs]
+    spread = {}
+    for name in flats[0]:
+        if not direction(name.rsplit(".", 1)[-1]):
+            continue
+        values = [flat[name] for flat in flats if name in flat]
+        mid = statistics.median(values)
+        if mid:
+            mad = statistics.median(abs(v - mid) for v in values)
+            spread[name] = round(mad / abs(mid), 3)
+    return spread
+
+
+def run_suites(names, repeat=1):
+    """
+    Ejecuta las suites en rondas (todas las suites una vez por ronda): las
+    repeticiones de una suite quedan repartidas en toda la corrida, así la
+    dispersión también refleja los cambios de carga de la máquina y no
+    solo el ruido de unos segundos. La salida de cada suite se descarta.
+
+    Returns:
+        tuple: (resultados (medianas), segundos por suite, calibración por
+        suite, dispersión por métrica)
+    """
+    runs = {name: [] for name in names}
+    timings = dict.fromkeys(names, 0.0)
+    calibration = {name: [] for name in names}
+    modules = {}
+    for round_ in range(repeat):
+        for name in names:
+            module_name, kwargs = SUITES[name]
+            print(f"-> {name} ({round_ + 1}/{repeat})...", file=sys.stderr, flush=True)
+            before = calibrate()
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if name not in modules:
+                    modules[name] = importlib.import_module(module_name)
+                runs[name].append(modules[name].run(**kwargs))
+            timings[name] += time.perf_counter() - t0
+            calibration[name] += [before, calibrate()]
+
+    results = {name: median_of(runs[name]) for name in names}
+    spread = {}
+    for name in names:
+        spread.update(spread_of(runs[name], name))
+    timings = {name: round(seconds, 2) for name, seconds in timings.items()}
+    calibration = {name: round(statistics.median(values), 1)
+                   for name, values in calibration.items()}
+    return results, timings, calibration, spread
+
+
+def _meta(timings, repeat, calibration, spread):
+    return {
+        "repeat": repeat,
+        "calibration_ops_per_s": calibration,
+        "spread": spread,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "suite_seconds": timings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suites", help="Suites separadas por coma (default: todas)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Línea base a comparar")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Cambio relativo tolerado (0.5 = 50%%)")
+    parser.add_argument("--repeat", type=int,
+                        help="Ejecuciones por suite, se guarda la mediana "
+                             "(default: 3; 5 con --update-baseline)")
+    parser.add_argument("--max-spread", type=float, default=0.1,
+                        help="Dispersión máxima entre repeticiones para comparar "
+                             "una métrica (0.1 = 10%%)")
+    parser.add_argument("--scale", action="store_true",
+                        help="Escalar la línea base por la calibración de la máquina")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--list", action="store_true", help="Listar las suites")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (module_name, kwargs) in SUITES.items():
+            print(f"{name:16} {module_name}.run({kwargs})")
+        return 0
+
+    names = args.suites.split(",") if args.suites else list(SUITES)
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        parser.error("suites desconocidas: " + ", ".join(unknown))
+
+    repeat = args.repeat or (5 if args.update_baseline else 3)
+    results, timings, calibration, spread = run_suites(names, repeat)
+    report = {"meta": _meta(timings, repeat, calibration, spread), "results": results}
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        base_calibration = stored["meta"].get("calibration_ops_per_s", {})
+        base_spread = stored["meta"].get("spread")
+        stable = None
+        if base_spread is not None:
+            # Sin dispersión actual (--repeat 1) decide la de la línea base
+            stable = {metric for metric, value in base_spread.items()
+                      if value <= args.max_spread
+                      and spread.get(metric, 0) <= args.max_spread}
+        comparison = {"compared": 0, "regressions": [], "improvements": [], "unstable": [],
+                      "speed": {}}
+        # Solo las suites ejecutadas ahora, cada una con su calibración
+        for name in names:
+            if name not in stored["results"]:
+                continue
+            base = base_calibration.get(name)
+            speed = calibration[name] / base if base else 1.0
+            scale = speed if args.scale else 1.0
+            part = compare({name: results[name]}, {name: stored["results"][name]},
+                           args.tolerance, scale, stable)
+            comparison["compared"] += part["compared"]
+            comparison["regressions"] += part["regressions"]
+            comparison["improvements"] += part["improvements"]
+            comparison["unstable"] += part["unstable"]
+            comparison["speed"][name] = round(speed, 3)
+        comparison["baseline"] = os.path.relpath(args.baseline, ROOT)
+        comparison["tolerance"] = args.tolerance
+        comparison["max_spread"] = args.max_spread
+        comparison["scaled"] = args.scale
+        report["comparison"] = comparison
+        regressions = comparison["regressions"]
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados: {args.out}", file=sys.stderr)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Línea base actualizada: {args.baseline}", file=sys.stderr)
+        return 0
+
+    comparison = report.get("comparison")
+    if comparison is None:
+        print("Sin línea base: usar --update-baseline para crearla", file=sys.stderr)
+        return 0
+
+    print("Velocidad de la máquina vs. línea base" +
+          (" (aplicada):" if comparison["scaled"] else " (informativa):"),
+          ", ".join(f"{name} x{speed}" for name, speed in comparison["speed"].items()),
+          file=sys.stderr)
+    print(f"Métricas comparadas: {comparison['compared']}, "
+          f"inestables (no comparadas): {len(comparison['unstable'])}, "
+          f"mejoras: {len(comparison['improvements'])}, "
+          f"regresiones: {len(regressions)}", file=sys.stderr)
+    for entry in regressions:
+        print(f"  REGRESION {entry['metric']}: esperado {entry['expected']}, obtenido {entry['current']} "
+              f"({entry['change']:+.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,77 @@
+import time
 from machine import Pin
 
-class Led:
-    """Actuador LED ON/OFF."""
+class OnOffActuator:
+    """Actuador ON/OFF que recuerda su estado y evita escribir el pin sin cambios."""
 
     def __init__(self, pin_num):
         self._pin = Pin(pin_num, Pin.OUT)
+        self.state = None
         self.off()
 
+    def set(self, on):
+        """Aplica el estado. Retorna True solo si cambió."""
+        on = bool(on)
+        if on == self.state:
+            return False
+        self._pin.value(1 if on else 0)
+        self.state = on
+        return True
+
     def on(self):
-        self._pin.value(1)
+        return self.set(True)
 
     def off(self):
-        self._pin.value(0)
+        return self.set(False)
+
+    def pulse(self, duration_s):
+        """
+        Enciende durante duration_s y apaga (bloqueante). Si ya estaba
+        encendido no hace nada. Retorna True si hubo pulso.
+        """
+        if self.state:
+            return False
+        self.set(True)
+        time.sleep(duration_s)
+        self.set(False)
+        return True
+
+    @property
+    def is_on(self):
+        return bool(self.state)
 
 
-class Buzzer:
+class Led(OnOffActuator):
+    """Actuador LED ON/OFF."""
+
+
+class Buzzer(OnOffActuator):
     """Actuador buzzer simple ON/OFF."""
 
-    def __init__(self, pin_num):
-        self._pin = Pin(pin_num, Pin.OUT)
-        self.off()
 
-    def on(self):
-        self._pin.value(1)
+class CommandCoalescer:
+    """
+    Conserva solo el último comando por actuador hasta drain().
+    Una ráfaga de comandos (p. ej. retenidos tras reconectar) se aplica
+    una sola vez por ciclo del bucle.
+    """
 
-    def off(self):
-        self._pin.value(0)
+    def __init__(self):
+        self._pending = {}
+        self.received = 0
+        self.coalesced = 0
+
+    def push(self, name, value):
+        if name in self._pending:
+            self.coalesced += 1
+        self._pending[name] = value
+        self.received += 1
+
+    def drain(self):
+        """Retorna {actuador: último valor} y vacía los pendientes."""
+        pending = self._pending
+        self._pending = {}
+        return pending
+
+    def __len__(self):
+        return len(self._pending)
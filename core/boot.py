@@ -0,0 +1,38 @@
+"""
+Línea de tiempo del arranque: marca cada etapa en ms desde el inicio.
+"""
+
+import time
+
+
+class BootTimeline:
+    """Registra hitos del arranque con time.ticks_ms()."""
+
+    def __init__(self):
+        self._start = time.ticks_ms()
+        self.marks = []
+
+    def mark(self, name):
+        """Registra un hito y retorna los ms transcurridos desde el inicio."""
+        elapsed = time.ticks_diff(time.ticks_ms(), self._start)
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    def elapsed(self, name):
+        for mark_name, ms in self.marks:
+            if mark_name == name:
+                return ms
+        return None
+
+    def as_dict(self):
+        return {name: ms for name, ms in self.marks}
+
+    def report(self):
+        print("\n" + "="*60)
+        print("⏱️  LÍNEA DE TIEMPO DEL ARRANQUE")
+        print("="*60)
+        prev = 0
+        for name, ms in self.marks:
+            print(f"   {name:<20} {ms:>6} ms  (+{ms - prev} ms)")
+            prev = ms
+        print("="*60 + "\n")
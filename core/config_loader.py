@@ -1,7 +1,249 @@
+import os
 import ujson
 
+REQUIRED_KEYS = ("wifi_ssid", "wifi_password", "adafruit_username",
+                 "adafruit_key", "mqtt_client_id", "feeds")
+REQUIRED_FEEDS = ("temperature", "humidity", "distance", "led_cmd", "buzzer_cmd")
+
+# Secciones que se pueden cambiar sin reiniciar (archivo o feed config_cmd)
+RELOADABLE = ("thresholds", "sampling")
+
+DEFAULT_THRESHOLDS = {"temp_high": 30, "hum_low": 30, "dist_close": 10}
+DEFAULT_SAMPLING = {
+    "publish_s": 5,
+    # > 0: publicar un resumen por ventana de summary_s en vez de cada lectura
+    "summary_s": 0,
+    "dht": {"min_s": 2, "max_s": 30, "change_per_s": 0.1},
+    "distance": {"min_s": 0.05, "max_s": 0.5, "change_per_s": 20},
+}
+
+
+class ConfigError(ValueError):
+    """Configuración con claves faltantes o valores inválidos."""
+
+
 def load_config(path="config_device.json"):
     """Carga configuración de WiFi y Adafruit IO desde un archivo JSON."""
     with open(path, "r") as f:
         data = ujson.loads(f.read())
     return data
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_thresholds(thresholds, errors):
+    for key in DEFAULT_THRESHOLDS:
+        if key in thresholds and not _is_number(thresholds[key]):
+            errors.append("thresholds." + key + " debe ser numérico")
+
+
+# Claves opcionales de cada sensor: (mínimo, máximo, incluye mínimo)
+SAMPLER_RANGES = {
+    "change_per_s": (0, None, True),
+    "deadband": (0, None, True),
+    "speedup": (0, 1, False),
+    "backoff": (1, None, True),
+}
+DISTANCE_MODES = ("irq", "blocking")
+
+
+def _check_range(name, value, low, high, inclusive, errors):
+    if not _is_number(value):
+        errors.append(name + " debe ser numérico")
+    elif (value < low if inclusive else value <= low) or (high is not None and value > high):
+        errors.append(name + " fuera de rango")
+
+
+def _check_sampler(name, section, errors):
+    if not isinstance(section, dict):
+        errors.append(name + " debe ser un objeto")
+        return
+    valid = True
+    for key in ("min_s", "max_s"):
+        if not _is_number(section.get(key)):
+            errors.append(name + "." + key + " debe ser numérico")
+            valid = False
+    if valid and not 0 < section["min_s"] <= section["max_s"]:
+        errors.append(name + ": se requiere 0 < min_s <= max_s")
+    if "change_per_s" not in section:
+        errors.append(name + ".change_per_s debe ser numérico")
+    for key, (low, high, inclusive) in SAMPLER_RANGES.items():
+        if key in section:
+            _check_range(name + "." + key, section[key], low, high, inclusive, errors)
+    margins = section.get("near_margin", {})
+    if not isinstance(margins, dict):
+        errors.append(name + ".near_margin debe ser un objeto")
+    else:
+        for metric, margin in margins.items():
+            _check_range(name + ".near_margin." + metric, margin, 0, None, True, errors)
+
+
+def _check_sampling(sampling, errors):
+    publish_s = sampling.get("publish_s", DEFAULT_SAMPLING["publish_s"])
+    if not _is_number(publish_s) or publish_s <= 0:
+        errors.append("sampling.publish_s debe ser > 0")
+    summary_s = sampling.get("summary_s", 0)
+    if not _is_number(summary_s) or summary_s < 0:
+        errors.append("sampling.summary_s debe ser >= 0")
+    for sensor in ("dht", "distance"):
+        _check_sampler("sampling." + sensor, sampling.get(sensor), errors)
+    distance = sampling.get("distance")
+    if isinstance(distance, dict) and distance.get("mode", "irq") not in DISTANCE_MODES:
+        errors.append("sampling.distance.mode debe ser 'irq' o 'blocking'")
+
+
+def _check_summary(sampling, feeds, errors):
+    summary_s = sampling.get("summary_s", 0)
+    if _is_number(summary_s) and summary_s > 0 and not feeds.get("summary"):
+        errors.append("sampling.summary_s requiere feeds.summary")
+
+
+def _merge(base, values):
+    """Copia de base actualizada con values (las subsecciones se combinan)."""
+    merged = dict(base)
+    for key, value in values.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _check_sections(data):
+    if not isinstance(data, dict):
+        raise ConfigError("Configuración inválida: se esperaba un objeto")
+    for key in RELOADABLE:
+        if key in data and not isinstance(data[key], dict):
+            raise ConfigError("Configuración inválida: " + key + " debe ser un objeto")
+
+
+class DeviceConfig:
+    """
+    Configuración validada del dispositivo.
+
+    Valida las claves requeridas al arrancar y precalcula el topic en bytes
+    de cada feed. thresholds y sampling se pueden recargar en caliente con
+    update() (feed config_cmd) o reload_if_changed() (mtime del archivo).
+    """
+
+    def __init__(self, data, path=None):
+        _check_sections(data)
+        errors = []
+        for key in REQUIRED_KEYS:
+            if key not in data:
+                errors.append("falta " + key)
+            elif key != "feeds" and not isinstance(data[key], str):
+                errors.append(key + " debe ser texto")
+        feeds = data.get("feeds", {})
+        if not isinstance(feeds, dict):
+            errors.append("feeds debe ser un objeto")
+            feeds = {}
+        for key in REQUIRED_FEEDS:
+            if not isinstance(feeds.get(key), str) or not feeds.get(key):
+                errors.append("falta feeds." + key)
+        port = data.get("mqtt_port", 1883)
+        if not isinstance(port, int) or not 0 < port < 65536:
+            errors.append("mqtt_port inválido")
+        device_id = data.get("device_id", 0)
+        # Va en un campo de 16 bits de la trama binaria
+        valid_id = isinstance(device_id, int) and not isinstance(device_id, bool)
+        if not valid_id or not 0 <= device_id <= 0xFFFF:
+            errors.append("device_id debe ser un entero entre 0 y 65535")
+        config_check_s = data.get("config_check_s", 5)
+        if not _is_number(config_check_s) or config_check_s < 0:
+            errors.append("config_check_s debe ser un número >= 0")
+        if data.get("telemetry_format", "text") not in ("text", "binary"):
+            errors.append("telemetry_format debe ser 'text' o 'binary'")
+        thresholds = _merge(DEFAULT_THRESHOLDS, data.get("thresholds", {}))
+        sampling = _merge(DEFAULT_SAMPLING, data.get("sampling", {}))
+        _check_thresholds(thresholds, errors)
+        _check_sampling(sampling, errors)
+        _check_summary(sampling, feeds, errors)
+        if errors:
+            raise ConfigError("Configuración inválida: " + "; ".join(errors))
+
+        self.path = path
+        self.wifi_ssid = data["wifi_ssid"]
+        self.wifi_password = data["wifi_password"]
+        self.username = data["adafruit_username"]
+        self.aio_key = data["adafruit_key"]
+        self.client_id = data["mqtt_client_id"]
+        self.mqtt_server = data.get("mqtt_server", "io.adafruit.com")
+        self.mqtt_port = port
+        self.device_id = device_id
+        self.telemetry_format = data.get("telemetry_format", "text")
+        self.config_check_s = config_check_s
+        self.feeds = dict(feeds)
+
+        # Topics completos en bytes, por nombre de feed
+        prefix = self.username + "/feeds/"
+        self.topics = {name: (prefix + name).encode() for name in self.feeds.values()}
+
+        self.thresholds = thresholds
+        self.sampling = sampling
+        self.version = 1
+        self._mtime = self._stat_mtime()
+
+    @classmethod
+    def load(cls, path="config_device.json"):
+        """Lee y valida el archivo. Lanza OSError o ConfigError."""
+        return cls(load_config(path), path)
+
+    def topic(self, key):
+        """Topic en bytes del feed con clave key (p. ej. "led_cmd")."""
+        return self.topics[self.feeds[key]]
+
+    def update(self, data):
+        """
+        Aplica las secciones recargables presentes en data (parciales:
+        se combinan con los valores actuales). Si el resultado es inválido
+        no cambia nada y lanza ConfigError.
+
+        Returns:
+            list: Secciones que cambiaron
+        """
+        _check_sections(data)
+        thresholds = _merge(self.thresholds, data.get("thresholds", {}))
+        sampling = _merge(self.sampling, data.get("sampling", {}))
+        errors = []
+        _check_thresholds(thresholds, errors)
+        _check_sampling(sampling, errors)
+        _check_summary(sampling, self.feeds, errors)
+        if errors:
+            raise ConfigError("Configuración inválida: " + "; ".join(errors))
+
+        changed = []
+        if thresholds != self.thresholds:
+            self.thresholds = thresholds
+            changed.append("thresholds")
+        if sampling != self.sampling:
+            self.sampling = sampling
+            changed.append("sampling")
+        if changed:
+            self.version += 1
+        return changed
+
+    def _stat_mtime(self):
+        if self.path is None:
+            return None
+        try:
+            return os.stat(self.path)[8]
+        except OSError:
+            return None
+
+    def reload_if_changed(self):
+        """
+        Relee el archivo si cambió su mtime y aplica las secciones recargables.
+        Los cambios en otras claves (WiFi, MQTT, feeds) requieren reiniciar.
+
+        Returns:
+            list: Secciones que cambiaron
+        """
+        mtime = self._stat_mtime()
+        if mtime is None or mtime == self._mtime:
+            return []
+        self._mtime = mtime
+        data = load_config(self.path)
+        return self.update({key: data[key] for key in RELOADABLE if key in data})
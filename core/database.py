@@ -1,81 +1,288 @@
 import time
 
+# Filas guardadas por tabla (las más antiguas se sobrescriben)
+DEFAULT_CAPACITY = {
+    "sensor_readings": 240,
+    "actuator_events": 64,
+    "system_alerts": 64,
+    "mqtt_logs": 64,
+    "sensor_summaries": 24,
+}
+MIN_CAPACITY = 16
+
+SUMMARY_METRICS = ("temperature", "humidity", "distance")
+# Orden de los valores de cada métrica en un resumen
+SUMMARY_FIELDS = ("min", "max", "mean", "last", "n")
+
+
+class RingTable:
+    """
+    Tabla circular de capacidad fija. Las filas son listas preasignadas
+    que se sobrescriben en el lugar: next_row() entrega la siguiente y el
+    llamador asigna sus campos, así insertar no crea dicts, listas ni
+    tuplas de argumentos.
+    """
+
+    def __init__(self, fields, capacity):
+        self.fields = fields
+        self.total = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        width = len(self.fields)
+        self.capacity = capacity
+        self._rows = [[None] * width for _ in range(capacity)]
+        self._next = 0
+        self._count = 0
+
+    def next_row(self):
+        """Fila preasignada a sobrescribir (la más antigua si está llena)."""
+        row = self._rows[self._next]
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.total += 1
+        return row
+
+    def __len__(self):
+        return self._count
+
+    def rows(self):
+        """Filas guardadas, de la más antigua a la más reciente."""
+        start = (self._next - self._count) % self.capacity
+        for i in range(self._count):
+            yield self._rows[(start + i) % self.capacity]
+
+    def latest(self, n=1):
+        """Últimas n filas como dicts (para depuración/consultas)."""
+        rows = list(self.rows())[-n:]
+        return [dict(zip(self.fields, row)) for row in rows]
+
+    def resize(self, capacity):
+        """Cambia la capacidad conservando las filas más recientes."""
+        capacity = max(MIN_CAPACITY, capacity)
+        if capacity == self.capacity:
+            return
+        keep = [list(row) for row in self.rows()][-capacity:]
+        self._alloc(capacity)
+        for row in keep:
+            self._rows[self._next][:] = row
+            self._next = (self._next + 1) % capacity
+            self._count += 1
+
+
+class WindowSummary:
+    """
+    Mínimo, máximo, media y último valor por métrica en una ventana,
+    calculados al agregar cada muestra (no se guardan las muestras).
+    """
+
+    def __init__(self, metrics=SUMMARY_METRICS):
+        self.metrics = metrics
+        width = len(metrics)
+        self._min = [None] * width
+        self._max = [None] * width
+        self._sum = [0.0] * width
+        self._count = [0] * width
+        self._last = [None] * width
+        self.start = None
+        self.samples = 0
+
+    def reset(self, start=None):
+        for i in range(len(self.metrics)):
+            self._min[i] = None
+            self._max[i] = None
+            self._sum[i] = 0.0
+            self._count[i] = 0
+            self._last[i] = None
+        self.start = start
+        self.samples = 0
+
+    def add(self, index, value):
+        """Agrega un valor de la métrica en la posición index (None se ignora)."""
+        if value is None:
+            return
+        if self._count[index] == 0:
+            self._min[index] = value
+            self._max[index] = value
+        elif value < self._min[index]:
+            self._min[index] = value
+        elif value > self._max[index]:
+            self._max[index] = value
+        self._sum[index] += value
+        self._count[index] += 1
+        self._last[index] = value
+        self.samples += 1
+
+    def result(self, end):
+        """
+        Resumen de la ventana: {"ts", "s", métrica: [min, max, media, último, n]}.
+        Las métricas sin muestras se omiten. None si la ventana está vacía.
+        """
+        if not self.samples:
+            return None
+        start = end if self.start is None else self.start
+        summary = {"ts": int(end), "s": int(end - start)}
+        for i in range(len(self.metrics)):
+            n = self._count[i]
+            if n:
+                summary[self.metrics[i]] = [self._min[i], self._max[i],
+                                            round(self._sum[i] / n, 2), self._last[i], n]
+        return summary
+
+
 class IoTDatabase:
     """
     Base de datos en memoria para Wokwi (sin SQLite).
     Compatible con el main.py actual.
+    Cada tabla es un RingTable: la memoria usada no crece con el tiempo.
     """
 
-    def __init__(self, db_path="iot_data"):
+    def __init__(self, db_path="iot_data", capacity=None):
         print("📁 Base en memoria inicializada:", db_path)
-        self.sensor_readings = []
-        self.actuator_events = []
-        self.system_alerts = []
-        self.mqtt_logs = []
+        cap = dict(DEFAULT_CAPACITY)
+        if capacity:
+            cap.update(capacity)
+        self.sensor_readings = RingTable(
+            ("id", "timestamp", "temperature", "humidity", "distance"),
+            cap["sensor_readings"])
+        self.actuator_events = RingTable(
+            ("id", "timestamp", "actuator", "action", "source"),
+            cap["actuator_events"])
+        self.system_alerts = RingTable(
+            ("id", "timestamp", "alert_type", "message", "severity", "resolved"),
+            cap["system_alerts"])
+        self.mqtt_logs = RingTable(
+            ("id", "timestamp", "event_type", "details"),
+            cap["mqtt_logs"])
+        self.sensor_summaries = RingTable(
+            ("id", "timestamp", "summary"),
+            cap["sensor_summaries"])
+        self._tables = (self.sensor_readings, self.actuator_events,
+                        self.system_alerts, self.mqtt_logs, self.sensor_summaries)
+        # Ventana actual de resúmenes (min/max/media/último por métrica)
+        self.summary = WindowSummary()
+        self.summary.reset(self._ts())
         self._id_counter = 1
+        # Con poca memoria se dejan de guardar los logs de depuración
+        self.debug_logging = True
 
     def _ts(self):
         return time.time()
 
+    def _new_id(self):
+        record_id = self._id_counter
+        self._id_counter += 1
+        return record_id
+
     # --- SENSOR DATA ---
     def insert_sensor_reading(self, temperature=None, humidity=None, distance=None):
-        record = {
-            "id": self._id_counter,
-            "timestamp": self._ts(),
-            "temperature": temperature,
-            "humidity": humidity,
-            "distance": distance,
-        }
-        self.sensor_readings.append(record)
-        self._id_counter += 1
-        return record["id"]
+        record_id = self._new_id()
+        row = self.sensor_readings.next_row()
+        row[0] = record_id
+        row[1] = self._ts()
+        row[2] = temperature
+        row[3] = humidity
+        row[4] = distance
+        return record_id
+
+    def get_average_readings(self, hours=1):
+        """Promedio por métrica de las lecturas guardadas en las últimas horas."""
+        since = self._ts() - hours * 3600
+        sums = [0.0, 0.0, 0.0]
+        counts = [0, 0, 0]
+        for row in self.sensor_readings.rows():
+            if row[1] < since:
+                continue
+            for i in range(3):
+                value = row[i + 2]
+                if value is not None:
+                    sums[i] += value
+                    counts[i] += 1
+        averages = {}
+        for i in range(3):
+            if counts[i]:
+                averages["avg_" + SUMMARY_METRICS[i]] = round(sums[i] / counts[i], 2)
+        return averages
+
+    # --- RESÚMENES POR VENTANA ---
+    def add_sample(self, temperature=None, humidity=None, distance=None):
+        """Agrega una muestra a la ventana actual (no guarda la muestra)."""
+        summary = self.summary
+        summary.add(0, temperature)
+        summary.add(1, humidity)
+        summary.add(2, distance)
+
+    def close_summary(self):
+        """
+        Cierra la ventana actual: guarda su resumen en sensor_summaries y
+        empieza una nueva.
+
+        Returns:
+            dict: Resumen (ver WindowSummary.result) o None si no hubo muestras
+        """
+        now = self._ts()
+        result = self.summary.result(now)
+        self.summary.reset(now)
+        if result is not None:
+            row = self.sensor_summaries.next_row()
+            row[0] = self._new_id()
+            row[1] = now
+            row[2] = result
+        return result
 
     # --- ACTUATOR EVENTS ---
     def log_actuator_event(self, name, action, source="local"):
-        record = {
-            "id": self._id_counter,
-            "timestamp": self._ts(),
-            "actuator": name,
-            "action": action,
-            "source": source
-        }
-        self.actuator_events.append(record)
-        self._id_counter += 1
-        return record["id"]
+        record_id = self._new_id()
+        row = self.actuator_events.next_row()
+        row[0] = record_id
+        row[1] = self._ts()
+        row[2] = name
+        row[3] = action
+        row[4] = source
+        return record_id
 
     # --- ALERTS ---
     def create_alert(self, alert_type, message, severity="info"):
-        record = {
-            "id": self._id_counter,
-            "timestamp": self._ts(),
-            "alert_type": alert_type,
-            "message": message,
-            "severity": severity,
-            "resolved": False
-        }
-        self.system_alerts.append(record)
-        self._id_counter += 1
-        return record["id"]
+        record_id = self._new_id()
+        row = self.system_alerts.next_row()
+        row[0] = record_id
+        row[1] = self._ts()
+        row[2] = alert_type
+        row[3] = message
+        row[4] = severity
+        row[5] = False
+        return record_id
 
     # --- MQTT LOGS ---
-    def log_mqtt_event(self, event_type, details=""):
-        record = {
-            "id": self._id_counter,
-            "timestamp": self._ts(),
-            "event_type": event_type,
-            "details": details
-        }
-        self.mqtt_logs.append(record)
-        self._id_counter += 1
-        return record["id"]
+    def log_mqtt_event(self, event_type, details="", debug=False):
+        """debug=True: evento de depuración, se omite si debug_logging es False."""
+        if debug and not self.debug_logging:
+            return None
+        record_id = self._new_id()
+        row = self.mqtt_logs.next_row()
+        row[0] = record_id
+        row[1] = self._ts()
+        row[2] = event_type
+        row[3] = details
+        return record_id
+
+    # --- MEMORIA ---
+    def shrink(self, factor=0.5):
+        """Reduce la capacidad de todas las tablas (presión de memoria)."""
+        for table in self._tables:
+            table.resize(int(table.capacity * factor))
 
     # --- STATS ---
     def get_database_stats(self):
         return {
-            "sensor_readings_count": len(self.sensor_readings),
-            "actuator_events_count": len(self.actuator_events),
-            "system_alerts_count": len(self.system_alerts),
-            "mqtt_logs_count": len(self.mqtt_logs),
+            "sensor_readings_count": self.sensor_readings.total,
+            "actuator_events_count": self.actuator_events.total,
+            "system_alerts_count": self.system_alerts.total,
+            "mqtt_logs_count": self.mqtt_logs.total,
+            "sensor_readings_stored": len(self.sensor_readings),
+            "sensor_readings_capacity": self.sensor_readings.capacity,
+            "sensor_summaries_count": self.sensor_summaries.total,
         }
 
     def close(self):
@@ -0,0 +1,98 @@
+"""
+Gestión de memoria para operación prolongada.
+Fija gc.threshold, recolecta en momentos ociosos del bucle y registra el
+mínimo de gc.mem_free() para reaccionar ante presión de memoria.
+"""
+
+import gc
+import time
+
+MEM_OK = 0
+MEM_LOW = 1
+MEM_CRITICAL = 2
+LEVEL_NAMES = ("ok", "low", "critical")
+
+
+class MemoryManager:
+    """Recolección controlada y niveles de presión de memoria."""
+
+    def __init__(self, low_bytes=32 * 1024, critical_bytes=16 * 1024,
+                 threshold_fraction=4, idle_alloc_bytes=8 * 1024, on_pressure=None):
+        """
+        Args:
+            low_bytes (int): Memoria libre por debajo de la cual el nivel es "low"
+            critical_bytes (int): Memoria libre para nivel "critical"
+            threshold_fraction (int): gc.threshold = heap / threshold_fraction
+                (red de seguridad: normalmente recolecta idle_collect antes)
+            idle_alloc_bytes (int): Bytes asignados desde la última recolección
+                a partir de los cuales idle_collect recolecta
+            on_pressure: Función on_pressure(level, previous) llamada al cambiar de nivel
+        """
+        self.low_bytes = low_bytes
+        self.critical_bytes = critical_bytes
+        self.idle_alloc_bytes = idle_alloc_bytes
+        self.on_pressure = on_pressure
+
+        gc.collect()
+        self.heap_bytes = gc.mem_free() + gc.mem_alloc()
+        self.threshold = self.heap_bytes // threshold_fraction
+        gc.threshold(self.threshold)
+
+        self.low_water = gc.mem_free()
+        self.level = MEM_OK
+        self.collections = 0
+        self.collect_ms_max = 0
+        self._alloc_after_collect = gc.mem_alloc()
+
+    def idle_collect(self, force=False):
+        """
+        Recolecta si se asignó suficiente memoria desde la última vez.
+        Llamar en puntos ociosos del bucle (antes de dormir).
+
+        Returns:
+            bool: True si recolectó
+        """
+        if not force and gc.mem_alloc() - self._alloc_after_collect < self.idle_alloc_bytes:
+            return False
+        start = time.ticks_ms()
+        gc.collect()
+        elapsed = time.ticks_diff(time.ticks_ms(), start)
+        self.collections += 1
+        if elapsed > self.collect_ms_max:
+            self.collect_ms_max = elapsed
+        self._alloc_after_collect = gc.mem_alloc()
+        self.check()
+        return True
+
+    def check(self):
+        """Actualiza el mínimo de memoria libre y el nivel de presión."""
+        free = gc.mem_free()
+        if free < self.low_water:
+            self.low_water = free
+
+        if free < self.critical_bytes:
+            level = MEM_CRITICAL
+        elif free < self.low_bytes:
+            level = MEM_LOW
+        elif self.level != MEM_OK and free < self.low_bytes + self.low_bytes // 4:
+            # Histéresis: no volver a "ok" apenas se supera low_bytes
+            level = MEM_LOW
+        else:
+            level = MEM_OK
+
+        if level != self.level:
+            previous = self.level
+            self.level = level
+            if self.on_pressure:
+                self.on_pressure(level, previous)
+        return level
+
+    def stats(self):
+        return {
+            "mem_free": gc.mem_free(),
+            "low_water": self.low_water,
+            "heap": self.heap_bytes,
+            "level": LEVEL_NAMES[self.level],
+            "collections": self.collections,
+            "collect_ms_max": self.collect_ms_max,
+        }
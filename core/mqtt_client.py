@@ -5,6 +5,61 @@ Implementación integrada compatible con Wokwi (sin dependencias externas).
 
 import usocket as socket
 import ustruct as struct
+import ujson
+
+# Trama binaria de telemetría (big-endian, 16 bytes):
+#   magic u8 | máscara u8 | device_id u16 | seq u16 | timestamp u32 |
+#   temperatura i16 (x100) | humedad i16 (x100) | distancia i16 (x10)
+# Bit i de la máscara = métrica i presente.
+TELEMETRY_FMT = "!BBHHIhhh"
+TELEMETRY_SIZE = 16
+TELEMETRY_MAGIC = 0x54
+TELEMETRY_SCALES = (100, 100, 10)
+
+
+class TelemetryEncoder:
+    """Codifica lecturas en tramas binarias sobre un buffer preasignado."""
+
+    def __init__(self, device_id):
+        self.device_id = device_id & 0xFFFF
+        self.seq = 0
+        self._buf = bytearray(TELEMETRY_SIZE)
+
+    def encode(self, timestamp, temperature=None, humidity=None, distance=None):
+        """
+        Escribe la trama en el buffer interno y lo retorna.
+        El buffer se reutiliza: publicarlo antes de la siguiente llamada.
+        """
+        mask = 0
+        t = h = d = 0
+        if temperature is not None:
+            mask |= 1
+            t = int(round(temperature * TELEMETRY_SCALES[0]))
+        if humidity is not None:
+            mask |= 2
+            h = int(round(humidity * TELEMETRY_SCALES[1]))
+        if distance is not None:
+            mask |= 4
+            d = int(round(distance * TELEMETRY_SCALES[2]))
+        struct.pack_into(TELEMETRY_FMT, self._buf, 0, TELEMETRY_MAGIC, mask,
+                         self.device_id, self.seq, int(timestamp) & 0xFFFFFFFF, t, h, d)
+        self.seq = (self.seq + 1) & 0xFFFF
+        return self._buf
+
+
+def parse_onoff(msg):
+    """b"ON" / b"1" / b"TRUE" (sin importar mayúsculas) → True; otro → False."""
+    return msg.strip().upper() in (b"ON", b"1", b"TRUE")
+
+
+def parse_number(msg):
+    """Payload numérico → float (ValueError si no es un número)."""
+    return float(msg.decode())
+
+
+def parse_json(msg):
+    """Payload JSON → dict/list (ValueError si es inválido)."""
+    return ujson.loads(msg)
 
 
 class SimpleMQTT:
@@ -19,10 +74,14 @@ class SimpleMQTT:
         self.pswd = password
         self.pid = 0
         self.cb = None
+        # Buffers reutilizados en cada publish (evita asignaciones)
+        self._pub_hdr = bytearray(4)
+        self._len_buf = bytearray(2)
 
     def _send_str(self, s):
         """Envía una cadena con su longitud."""
-        self.sock.write(struct.pack("!H", len(s)))
+        struct.pack_into("!H", self._len_buf, 0, len(s))
+        self.sock.write(self._len_buf)
         self.sock.write(s)
 
     def _recv_len(self):
@@ -86,8 +145,8 @@ class SimpleMQTT:
 
     def publish(self, topic, msg, retain=False, qos=0):
         """Publica mensaje en un topic."""
-        pkt = bytearray(b"\x30\0\0\0")
-        pkt[0] |= qos << 1 | retain
+        pkt = self._pub_hdr
+        pkt[0] = 0x30 | qos << 1 | retain
         sz = 2 + len(topic) + len(msg)
         if qos > 0:
             sz += 2
@@ -166,20 +225,32 @@ class MQTTClientWrapper:
     Implementación integrada sin dependencias externas.
     """
 
-    def __init__(self, client_id, username, aio_key, on_message_cb=None):
+    def __init__(self, client_id, username, aio_key, on_message_cb=None,
+                 server="io.adafruit.com", port=1883, topics=None):
         self.client_id = client_id
         self.username = username
         self.aio_key = aio_key
         self.on_message_cb = on_message_cb
+        self.server = server
+        self.port = port
         self.connected = False
+        self._telemetry = None
+        self._telemetry_topic = None
+        self._topic_prefix = f"{username}/feeds/".encode()
+        # nombre de feed → topic en bytes (precalculados en DeviceConfig)
+        self._topics = dict(topics) if topics else {}
+        # False con poca memoria: sin mensajes por publicación
+        self.verbose = True
+        # topic (bytes) → (handler, parser)
+        self._handlers = {}
         
         print("📡 Inicializando cliente MQTT integrado...")
         
         # Crear cliente MQTT (usar bytes directamente)
         self.client = SimpleMQTT(
             client_id=client_id.encode() if isinstance(client_id, str) else client_id,
-            server="io.adafruit.com",
-            port=1883,
+            server=server,
+            port=port,
             user=username.encode() if isinstance(username, str) else username,
             password=aio_key.encode() if isinstance(aio_key, str) else aio_key
         )
@@ -192,7 +263,7 @@ class MQTTClientWrapper:
         print(f"👤 Usuario: {self.username}")
         print(f"🔑 AIO Key: {self.aio_key[:10]}...")
         print(f"🆔 Client ID: {self.client_id}")
-        print(f"🖥️  Servidor: io.adafruit.com:1883")
+        print(f"🖥️  Servidor: {self.server}:{self.port}")
         print("─"*60)
         
         try:
@@ -224,11 +295,46 @@ class MQTTClientWrapper:
             except:
                 pass
 
+    def feed_topic(self, feed_name):
+        """Topic completo de un feed, en bytes (se calcula una sola vez)."""
+        topic = self._topics.get(feed_name)
+        if topic is None:
+            topic = self._topic_prefix + feed_name.encode()
+            self._topics[feed_name] = topic
+        return topic
+
+    def add_handler(self, feed_name, handler, parser=None):
+        """
+        Registra un handler para un feed, comparando el topic exacto en bytes.
+
+        Args:
+            feed_name (str): Nombre del feed
+            handler: Función handler(value)
+            parser: Convierte el payload en bytes (parse_onoff, parse_number,
+                    parse_json). None entrega los bytes sin convertir.
+        """
+        self._handlers[self.feed_topic(feed_name)] = (handler, parser)
+
     def _internal_callback(self, topic, msg):
         """
         Callback interno que procesa mensajes MQTT.
-        Convierte bytes a strings y llama al callback del usuario.
+        Busca el topic en los handlers registrados sin decodificarlo; si no
+        hay handler, convierte bytes a strings y llama al callback del usuario.
         """
+        route = self._handlers.get(topic)
+        if route is not None:
+            handler, parser = route
+            try:
+                value = parser(msg) if parser else msg
+            except ValueError:
+                print(f"⚠️ Payload inválido en {topic}: {msg}")
+                return
+            try:
+                handler(value)
+            except Exception as e:
+                print(f"⚠️ Error en handler: {e}")
+            return
+
         if self.on_message_cb:
             try:
                 # Decodificar topic y mensaje
@@ -241,26 +347,30 @@ class MQTTClientWrapper:
             except Exception as e:
                 print(f"⚠️ Error en callback: {e}")
 
-    def subscribe_feed(self, feed_name):
+    def subscribe_feed(self, feed_name, handler=None, parser=None):
         """
         Suscribe a un feed de Adafruit IO.
         
         Args:
             feed_name (str): Nombre del feed (sin el prefijo username/feeds/)
+            handler: Handler opcional para los mensajes del feed (ver add_handler)
+            parser: Parser del payload para el handler
         """
         if not self.connected:
             print("⚠️  No conectado a MQTT")
             return
         
         # Construir topic completo
-        topic = f"{self.username}/feeds/{feed_name}"
+        topic_bytes = self.feed_topic(feed_name)
+        # Registrar antes de suscribirse: el broker puede enviar el valor
+        # retenido mientras se espera el SUBACK
+        if handler is not None:
+            self.add_handler(feed_name, handler, parser)
         
         try:
-            # Suscribirse al topic (convertir a bytes)
-            topic_bytes = topic.encode() if isinstance(topic, str) else topic
             self.client.subscribe(topic_bytes)
             print(f"📥 SUSCRITO a feed: {feed_name}")
-            print(f"   Topic: {topic}")
+            print(f"   Topic: {topic_bytes.decode()}")
             
         except Exception as e:
             print(f"❌ Error al suscribirse a {feed_name}: {e}")
@@ -277,33 +387,70 @@ class MQTTClientWrapper:
             print("⚠️  No conectado a MQTT")
             return
         
-        # Construir topic completo
-        topic = f"{self.username}/feeds/{feed_name}"
-        
         try:
-            # Convertir payload y topic a bytes
-            payload_str = str(payload)
-            topic_bytes = topic.encode() if isinstance(topic, str) else topic
-            payload_bytes = payload_str.encode() if isinstance(payload_str, str) else payload_str
+            # Convertir payload a bytes (el topic ya está precalculado)
+            payload_bytes = payload if isinstance(payload, bytes) else str(payload).encode()
             
             # Publicar
-            self.client.publish(topic_bytes, payload_bytes)
-            print(f"📤 PUBLICADO → {feed_name}: {payload}")
+            self.client.publish(self.feed_topic(feed_name), payload_bytes)
+            if self.verbose:
+                print(f"📤 PUBLICADO → {feed_name}: {payload}")
             
         except Exception as e:
             print(f"❌ Error al publicar en {feed_name}: {e}")
 
-    def check_messages(self):
+    def enable_telemetry(self, device_id, feed_name):
+        """
+        Activa la publicación en formato binario compacto.
+        Pensado para un broker propio: Adafruit IO espera texto.
+
+        Args:
+            device_id (int): Identificador del dispositivo (16 bits)
+            feed_name (str): Feed donde se publican las tramas
+        """
+        self._telemetry = TelemetryEncoder(device_id)
+        self._telemetry_topic = self.feed_topic(feed_name)
+
+    def publish_telemetry(self, timestamp, temperature=None, humidity=None, distance=None):
+        """
+        Publica una lectura completa como una sola trama binaria.
+
+        Returns:
+            bool: True si se publicó
+        """
+        if not self.connected or self._telemetry is None:
+            return False
+
+        try:
+            seq = self._telemetry.seq
+            frame = self._telemetry.encode(timestamp, temperature, humidity, distance)
+            self.client.publish(self._telemetry_topic, frame)
+            if self.verbose:
+                print(f"📤 TELEMETRÍA #{seq} ({TELEMETRY_SIZE} bytes)")
+            return True
+        except Exception as e:
+            print(f"❌ Error al publicar telemetría: {e}")
+            return False
+
+    def check_messages(self, max_msgs=1):
         """
         Verifica si hay mensajes MQTT pendientes.
         Modo no bloqueante - retorna inmediatamente.
+
+        Args:
+            max_msgs (int): Paquetes a leer como máximo (vacía ráfagas)
+
+        Returns:
+            int: Paquetes procesados
         """
         if not self.connected:
-            return
+            return 0
         
+        count = 0
         try:
-            # check_msg() es no bloqueante
-            self.client.check_msg()
+            # check_msg() es no bloqueante: None si no hay datos
+            while count < max_msgs and self.client.check_msg() is not None:
+                count += 1
             
         except OSError as e:
             # OSError es común en modo no bloqueante (sin mensajes)
@@ -311,6 +458,7 @@ class MQTTClientWrapper:
             
         except Exception as e:
             print(f"⚠️ Error en check_messages: {e}")
+        return count
 
     def ping(self):
         """Envía un ping al broker para mantener la conexión activa."""
@@ -0,0 +1,105 @@
+"""
+Muestreo adaptativo por sensor.
+Acelera cuando las lecturas cambian rápido o están cerca de un umbral
+de alerta y se relaja cuando son estables.
+"""
+
+import time
+
+
+class AdaptiveSampler:
+    """Intervalo de muestreo entre min_ms y max_ms según la tasa de cambio."""
+
+    def __init__(self, name, min_ms, max_ms, change_per_s, deadband=0,
+                 speedup=0.5, backoff=1.5):
+        """
+        Args:
+            name (str): Nombre del sensor (para estadísticas)
+            min_ms (int): Intervalo mínimo (límite del sensor)
+            max_ms (int): Intervalo máximo con lecturas estables
+            change_per_s (float): Cambio por segundo considerado "rápido"
+            deadband (float): Cambios menores se ignoran (ruido del sensor)
+            speedup (float): Factor aplicado al intervalo al acelerar
+            backoff (float): Factor aplicado al intervalo al relajar
+        """
+        self.name = name
+        self.min_ms = int(min_ms)
+        self.max_ms = int(max_ms)
+        self.change_per_s = change_per_s
+        self.deadband = deadband
+        self.speedup = speedup
+        self.backoff = backoff
+        self.interval_ms = self.min_ms
+        self.samples = 0
+        self._start = time.ticks_ms()
+        self._next = self._start
+        self._last_ms = None
+        self._last_values = None
+
+    @classmethod
+    def from_config(cls, name, cfg):
+        """Crea el sampler desde una sección de config["sampling"]."""
+        sampler = cls(name, cfg["min_s"] * 1000, cfg["max_s"] * 1000, cfg["change_per_s"])
+        sampler.configure(cfg)
+        return sampler
+
+    def configure(self, cfg):
+        """Aplica una sección de config["sampling"] sin perder las estadísticas."""
+        self.min_ms = int(cfg["min_s"] * 1000)
+        self.max_ms = int(cfg["max_s"] * 1000)
+        self.change_per_s = cfg["change_per_s"]
+        self.deadband = cfg.get("deadband", 0)
+        self.speedup = cfg.get("speedup", 0.5)
+        self.backoff = cfg.get("backoff", 1.5)
+        self.interval_ms = max(self.min_ms, min(self.max_ms, self.interval_ms))
+        if self._last_ms is not None:
+            self._next = time.ticks_add(self._last_ms, self.interval_ms)
+
+    def due(self, now_ms):
+        return time.ticks_diff(now_ms, self._next) >= 0
+
+    def ms_until_due(self, now_ms):
+        return max(0, time.ticks_diff(self._next, now_ms))
+
+    def update(self, now_ms, values, near_threshold=False):
+        """
+        Registra una muestra y recalcula el intervalo.
+
+        Args:
+            now_ms (int): time.ticks_ms() de la muestra
+            values (tuple): Valores leídos (None = lectura fallida)
+            near_threshold (bool): Algún valor está cerca de un umbral de alerta
+        """
+        self.samples += 1
+        fast = near_threshold
+
+        if not fast and self._last_values is not None:
+            dt = time.ticks_diff(now_ms, self._last_ms) / 1000
+            if dt > 0:
+                for new, old in zip(values, self._last_values):
+                    if new is None or old is None:
+                        continue
+                    change = abs(new - old)
+                    if change > self.deadband and change / dt > self.change_per_s:
+                        fast = True
+                        break
+
+        if fast:
+            self.interval_ms = max(self.min_ms, int(self.interval_ms * self.speedup))
+        else:
+            self.interval_ms = min(self.max_ms, int(self.interval_ms * self.backoff))
+
+        self._last_ms = now_ms
+        self._last_values = values
+        self._next = time.ticks_add(now_ms, self.interval_ms)
+
+    def stats(self, baseline_ms):
+        """Muestras tomadas vs. las que tomaría un muestreo fijo cada baseline_ms."""
+        elapsed = time.ticks_diff(time.ticks_ms(), self._start)
+        baseline = elapsed // baseline_ms + 1
+        return {
+            "sensor": self.name,
+            "samples": self.samples,
+            "fixed_rate_samples": baseline,
+            "interval_ms": self.interval_ms,
+        }
@@ -12,9 +12,14 @@ class DHT22Sensor:
         # Valores base para simulación realista
         self._base_temp = 24.0
         self._base_hum = 40.0
+        # Dict reutilizado en cada lectura (evita una asignación por ciclo)
+        self._values = {"temperature": None, "humidity": None}
 
     def read(self):
-        """Retorna un dict con temperatura (°C) y humedad (%)."""
+        """
+        Retorna un dict con temperatura (°C) y humedad (%).
+        El dict se reutiliza: copiar los valores si se necesitan después.
+        """
         self._sensor.measure()
         temp_raw = self._sensor.temperature()
         hum_raw = self._sensor.humidity()
@@ -31,36 +36,45 @@ class DHT22Sensor:
         temp = max(15.0, min(35.0, temp))  # 15-35°C
         hum = max(20.0, min(80.0, hum))    # 20-80%
         
-        return {
-            "temperature": temp,
-            "humidity": hum
-        }
+        self._values["temperature"] = temp
+        self._values["humidity"] = hum
+        return self._values
 
 
 class HCSR04Sensor:
-    """Maneja sensor de distancia HC-SR04."""
+    """
+    Maneja sensor de distancia HC-SR04.
 
-    def __init__(self, trig_pin, echo_pin):
+    read_cm() mide bloqueando en time_pulse_us. Para no bloquear la CPU:
+    start() dispara la medición, la IRQ del pin de eco marca los flancos con
+    ticks_us y poll() entrega el resultado (o None si expiró el timeout).
+    """
+
+    def __init__(self, trig_pin, echo_pin, timeout_us=30000):
         self._trig = Pin(trig_pin, Pin.OUT)
         self._echo = Pin(echo_pin, Pin.IN)
         self._base_distance = 50.0
+        self.timeout_us = timeout_us
+        # Estado de la medición no bloqueante (escrito por la IRQ)
+        self._irq_ready = False
+        self._trig_at = 0
+        self._rise_at = 0
+        self._fall_at = 0
+        self._edges = 0
+        self._callback = None
+        self.busy = False
+        self.last_cm = None
+        self.timeouts = 0
 
-    def read_cm(self, timeout_us=30000):
-        """Mide la distancia en centímetros."""
-        # pulso de disparo
+    def _pulse(self):
+        """Pulso de disparo de 10 us."""
         self._trig.value(0)
         utime.sleep_us(2)
         self._trig.value(1)
         utime.sleep_us(10)
         self._trig.value(0)
 
-        # medir pulso de eco (alto)
-        try:
-            duration = time_pulse_us(self._echo, 1, timeout_us)
-        except OSError:
-            # timeout
-            return None
-
+    def _to_cm(self, duration):
         # conversión a cm (velocidad del sonido ~340 m/s)
         distance_cm = (duration / 2) / 29.1
         
@@ -72,4 +86,78 @@ class HCSR04Sensor:
         # Limitar a rango válido del sensor (2-400cm)
         distance_cm = max(2.0, min(400.0, distance_cm))
         
-        return round(distance_cm, 2)
\ No newline at end of file
+        return round(distance_cm, 2)
+
+    def read_cm(self, timeout_us=None):
+        """Mide la distancia en centímetros (bloqueante)."""
+        if timeout_us is None:
+            timeout_us = self.timeout_us
+        self._pulse()
+
+        # medir pulso de eco (alto)
+        try:
+            duration = time_pulse_us(self._echo, 1, timeout_us)
+        except OSError:
+            # timeout
+            duration = -1
+
+        self.last_cm = self._to_cm(duration) if duration >= 0 else None
+        return self.last_cm
+
+    def _on_echo(self, pin):
+        # IRQ: solo guardar marcas de tiempo, sin reservar memoria
+        now = utime.ticks_us()
+        if pin.value():
+            self._rise_at = now
+            self._edges = 1
+        elif self._edges == 1:
+            self._fall_at = now
+            self._edges = 2
+
+    def start(self, callback=None):
+        """
+        Inicia una medición no bloqueante.
+
+        Args:
+            callback: Función opcional callback(distance_cm) llamada desde poll()
+
+        Returns:
+            bool: False si ya hay una medición en curso
+        """
+        if self.busy:
+            return False
+        if not self._irq_ready:
+            # IRQ dura: el handler corre al llegar el flanco y no cuando el
+            # planificador lo atiende, que desplazaría las marcas de tiempo
+            self._echo.irq(handler=self._on_echo,
+                           trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING, hard=True)
+            self._irq_ready = True
+        self._callback = callback
+        self._edges = 0
+        self.busy = True
+        self._trig_at = utime.ticks_us()
+        self._pulse()
+        return True
+
+    def poll(self):
+        """
+        Revisa la medición en curso.
+
+        Returns:
+            bool: True si terminó; el resultado queda en last_cm
+                  (None si no hubo eco dentro de timeout_us)
+        """
+        if not self.busy:
+            return False
+        if self._edges == 2:
+            self.last_cm = self._to_cm(utime.ticks_diff(self._fall_at, self._rise_at))
+        elif utime.ticks_diff(utime.ticks_us(), self._trig_at) > self.timeout_us:
+            self.last_cm = None
+            self.timeouts += 1
+        else:
+            return False
+
+        self.busy = False
+        if self._callback:
+            self._callback(self.last_cm)
+        return True
@@ -4,9 +4,206 @@ Compatible con MicroPython 1.24+
 """
 
 import network
+import os
 import time
+import ubinascii
+import ujson
+import usocket as socket
 
-def connect_wifi(ssid, password, max_wait=20):
+# Último punto de acceso y configuración IP que funcionaron
+WIFI_CACHE_PATH = "wifi_cache.json"
+
+# Códigos de wlan.status() que indican fallo definitivo
+_FAIL_STATUS = {
+    -1: "fallo de conexión",
+    -2: "red no encontrada",
+    -3: "contraseña incorrecta",
+}
+
+
+def load_wifi_cache(ssid, path=WIFI_CACHE_PATH):
+    """Retorna la caché de conexión si corresponde al SSID, o None."""
+    try:
+        with open(path, "r") as f:
+            cache = ujson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if cache.get("ssid") != ssid:
+        return None
+    return cache
+
+
+def clear_wifi_cache(path=WIFI_CACHE_PATH):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def save_wifi_cache(wlan, ssid, path=WIFI_CACHE_PATH):
+    """
+    Guarda BSSID, canal e IP de la conexión actual. Hace un escaneo
+    (lento), así que conviene llamarla después de la primera publicación.
+    """
+    cache = {"ssid": ssid, "ifconfig": list(wlan.ifconfig())}
+    try:
+        best = None
+        for net in wlan.scan():
+            # (ssid, bssid, canal, RSSI, seguridad, oculto)
+            if net[0].decode() == ssid and (best is None or net[3] > best[3]):
+                best = net
+        if best is not None:
+            cache["bssid"] = ubinascii.hexlify(best[1]).decode()
+            cache["channel"] = best[2]
+    except Exception as e:
+        print(f"⚠️ Escaneo WiFi falló: {e}")
+
+    try:
+        with open(path, "w") as f:
+            f.write(ujson.dumps(cache))
+        print(f"💾 Caché WiFi guardada (canal {cache.get('channel', '?')})")
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar caché WiFi: {e}")
+
+
+def _connect_cached(wlan, ssid, password, bssid, channel):
+    """connect() al BSSID guardado, fijando el canal si el port lo acepta."""
+    if channel:
+        try:
+            wlan.connect(ssid, password, bssid=bssid, channel=channel)
+            return
+        except TypeError:
+            # Ports sin argumento channel en connect()
+            pass
+    wlan.connect(ssid, password, bssid=bssid)
+
+
+def _use_dhcp(wlan):
+    """Descarta la IP estática de la caché y vuelve a DHCP."""
+    try:
+        wlan.ipconfig(dhcp4=True)
+    except AttributeError:
+        # MicroPython anterior a ipconfig()
+        wlan.ifconfig("dhcp")
+
+
+def link_ok(probe):
+    """
+    Verifica el enlace resolviendo probe = (host, puerto), p. ej. el broker
+    MQTT. Una IP estática vieja de la caché asocia igual con el AP pero no
+    llega al DNS ni al gateway. Sin probe no hay nada que verificar.
+    """
+    if not probe:
+        return True
+    try:
+        socket.getaddrinfo(probe[0], probe[1])
+        return True
+    except OSError as e:
+        print(f"⚠️ Sin enlace con la IP de la caché ({probe[0]}: {e})")
+        return False
+
+
+def begin_connect(ssid, password, cache_path=WIFI_CACHE_PATH):
+    """
+    Inicia la asociación WiFi sin esperar el resultado.
+
+    Si hay caché para el SSID se fija la IP estática (evita DHCP) y se
+    conecta directamente al BSSID y canal guardados (evita el escaneo).
+
+    Returns:
+        tuple: (wlan, usa_cache)
+    """
+    wlan = network.WLAN(network.STA_IF)
+    wlan.active(True)
+
+    if wlan.isconnected():
+        return wlan, False
+
+    cache = load_wifi_cache(ssid, cache_path)
+    if cache and cache.get("bssid"):
+        try:
+            wlan.ifconfig(tuple(cache["ifconfig"]))
+            _connect_cached(wlan, ssid, password, ubinascii.unhexlify(cache["bssid"]),
+                            cache.get("channel"))
+            print(f"⚡ Reasociando con BSSID {cache['bssid']} canal {cache.get('channel', '?')} "
+                  f"(IP {cache['ifconfig'][0]})")
+            return wlan, True
+        except Exception as e:
+            print(f"⚠️ Caché WiFi no utilizable: {e}")
+            clear_wifi_cache(cache_path)
+
+    wlan.connect(ssid, password)
+    return wlan, False
+
+
+def wait_connected(wlan, timeout_ms=20000, poll_ms=50):
+    """
+    Espera la asociación consultando isconnected() cada poll_ms.
+
+    Returns:
+        int: Milisegundos esperados
+
+    Raises:
+        RuntimeError: Si no conecta en timeout_ms o el driver reporta fallo
+    """
+    start = time.ticks_ms()
+    while not wlan.isconnected():
+        waited = time.ticks_diff(time.ticks_ms(), start)
+        status = wlan.status()
+        if status in _FAIL_STATUS:
+            raise RuntimeError(f"WiFi: {_FAIL_STATUS[status]}")
+        if waited >= timeout_ms:
+            raise RuntimeError(f"WiFi: sin conexión después de {timeout_ms} ms")
+        time.sleep_ms(poll_ms)
+    return time.ticks_diff(time.ticks_ms(), start)
+
+
+def print_connection(wlan):
+    ip, subnet, gateway, dns = wlan.ifconfig()
+
+    print("✅ CONECTADO A WIFI")
+    print("─"*60)
+    print(f"📍 IP: {ip}")
+    print(f"🌐 Subnet: {subnet}")
+    print(f"🚪 Gateway: {gateway}")
+    print(f"🔍 DNS: {dns}")
+    print(f"📶 RSSI: {wlan.status('rssi')} dBm")
+    print("="*60 + "\n")
+
+
+def finish_connect(wlan, ssid, password, used_cache, max_wait=20, poll_ms=50, probe=None):
+    """
+    Completa una conexión iniciada con begin_connect. Si la reasociación
+    con caché falla, o asocia pero link_ok(probe) no pasa, la descarta y
+    reintenta una conexión normal (DHCP).
+
+    Returns:
+        int: Milisegundos esperados
+    """
+    try:
+        waited = wait_connected(wlan, max_wait * 1000, poll_ms)
+    except RuntimeError as e:
+        if not used_cache:
+            wlan.active(False)
+            raise
+        print(f"⚠️ Reasociación rápida falló ({e}); reintentando con DHCP")
+    else:
+        if not used_cache or link_ok(probe):
+            return waited
+        print("⚠️ Reasociación rápida sin enlace; reintentando con DHCP")
+
+    clear_wifi_cache()
+    wlan.disconnect()
+    _use_dhcp(wlan)
+    wlan.connect(ssid, password)
+    try:
+        return wait_connected(wlan, max_wait * 1000, poll_ms)
+    except RuntimeError:
+        wlan.active(False)
+        raise
+
+
+def connect_wifi(ssid, password, max_wait=20, poll_ms=50, probe=None):
     """Conecta la Raspberry Pi Pico W a una red WiFi."""
     print("\n" + "="*60)
     print("📡 CONECTANDO A WIFI")
@@ -14,8 +211,7 @@ def connect_wifi(ssid, password, max_wait=20):
     print(f"🌐 SSID: {ssid}")
     print("─"*60)
     
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
+    wlan, used_cache = begin_connect(ssid, password)
     
     if wlan.isconnected():
         print("✅ Ya conectado a WiFi")
@@ -25,30 +221,15 @@ def connect_wifi(ssid, password, max_wait=20):
         return wlan
     
     print("⏳ Conectando a la red...")
-    wlan.connect(ssid, password)
-    
-    wait = 0
-    while not wlan.isconnected() and wait < max_wait:
-        print(f"   Intentando... {wait}s / {max_wait}s")
-        time.sleep(1)
-        wait += 1
-    
-    if not wlan.isconnected():
-        wlan.active(False)
+    try:
+        waited = finish_connect(wlan, ssid, password, used_cache, max_wait, poll_ms, probe)
+    except RuntimeError:
         print("❌ No se pudo conectar a la red WiFi")
         print("="*60 + "\n")
         raise RuntimeError(f"No se pudo conectar a '{ssid}' después de {max_wait}s")
     
-    ip, subnet, gateway, dns = wlan.ifconfig()
-    
-    print("✅ CONECTADO A WIFI")
-    print("─"*60)
-    print(f"📍 IP: {ip}")
-    print(f"🌐 Subnet: {subnet}")
-    print(f"🚪 Gateway: {gateway}")
-    print(f"🔍 DNS: {dns}")
-    print(f"📶 RSSI: {wlan.status('rssi')} dBm")
-    print("="*60 + "\n")
+    print(f"⏱️  Asociación en {waited} ms")
+    print_connection(wlan)
     
     return wlan
 
@@ -1,10 +1,15 @@
+import gc
 import time
-from config_loader import load_config
-from wifi_manager import connect_wifi
+import ujson
+from config_loader import ConfigError, DeviceConfig
+from wifi_manager import begin_connect, finish_connect, print_connection, save_wifi_cache
 from sensors import DHT22Sensor, HCSR04Sensor
-from actuators import Led, Buzzer
-from mqtt_client import MQTTClientWrapper
+from actuators import Led, Buzzer, CommandCoalescer
+from mqtt_client import MQTTClientWrapper, parse_json, parse_onoff
 from database import IoTDatabase
+from boot import BootTimeline
+from scheduler import AdaptiveSampler
+from memory import MemoryManager, MEM_OK, MEM_CRITICAL, LEVEL_NAMES
 
 # Pines usados (según diagram.json)
 PIN_DHT = 15
@@ -13,54 +18,132 @@ PIN_ECHO = 4
 PIN_LED = 2
 PIN_BUZZER = 3
 
+# Umbrales de alerta (se actualizan desde config["thresholds"])
+TEMP_HIGH = 30    # °C
+HUM_LOW = 30      # %
+DIST_CLOSE = 10   # cm
+
 # Estado global de actuadores controlados por la nube
 led = None
 buzzer = None
 db = None
 mqtt = None
+boot = None
+cfg = None
+mem = None
+# False con poca memoria: se omiten los mensajes por lectura
+verbose = True
+# nombre → (actuador, feed de estado) y comandos pendientes del ciclo
+actuators = {}
+commands = CommandCoalescer()
 
 def on_mqtt_message(topic, msg):
     """
-    Callback para mensajes MQTT desde Adafruit IO.
-    Recibe comandos desde la nube y controla actuadores.
+    Callback para mensajes MQTT sin handler registrado.
     """
-    global led, buzzer, db
-    
     print("\n" + "="*60)
     print("MENSAJE MQTT RECIBIDO DESDE LA NUBE")
     print("="*60)
     print("Topic:", topic)
     print("Mensaje:", msg)
-    print("-"*60)
-
-    # Identificar feed a partir del topic
-    if topic.endswith("/led-cmd"):
-        if msg.upper() == "ON":
-            led.on()
-            db.log_actuator_event("LED", "ON", "mqtt")
-            print("=> LED ENCENDIDO")
-            print("=> Evento guardado en BD")
-        else:
-            led.off()
-            db.log_actuator_event("LED", "OFF", "mqtt")
-            print("=> LED APAGADO")
-            print("=> Evento guardado en BD")
-
-    elif topic.endswith("/buzzer-cmd"):
-        if msg.upper() == "ON":
-            buzzer.on()
-            db.log_actuator_event("Buzzer", "ON", "mqtt")
-            print("=> BUZZER ENCENDIDO")
-            print("=> Evento guardado en BD")
-        else:
-            buzzer.off()
-            db.log_actuator_event("Buzzer", "OFF", "mqtt")
-            print("=> BUZZER APAGADO")
-            print("=> Evento guardado en BD")
-    
+    print("(sin handler registrado)")
+    print("="*60 + "\n")
+
+
+def set_actuator(name, on, source="mqtt"):
+    """
+    Aplica un estado ON/OFF. Si no cambia no toca el pin ni la BD; si cambia
+    lo registra y lo publica en el feed de estado.
+
+    Returns:
+        bool: True si el estado cambió
+    """
+    global db, mqtt
+
+    actuator, status_feed = actuators[name]
+    if not actuator.set(on):
+        return False
+
+    action = "ON" if on else "OFF"
+    db.log_actuator_event(name, action, source)
+    print("=> " + name.upper() + (" ENCENDIDO" if on else " APAGADO") + " (" + source + ")")
+    if status_feed and mqtt and mqtt.connected:
+        mqtt.publish_feed(status_feed, action)
+    return True
+
+
+def pulse_actuator(name, duration_s, source="auto"):
+    """
+    Pulso ON -> OFF. Se registra como un solo evento PULSE y no se publica:
+    el estado antes y después es OFF, así que el feed de estado no cambia.
+
+    Returns:
+        bool: True si hubo pulso (False si ya estaba encendido)
+    """
+    actuator, _ = actuators[name]
+    if not actuator.pulse(duration_s):
+        return False
+
+    db.log_actuator_event(name, "PULSE", source)
+    print("=> " + name.upper() + " PULSO " + str(duration_s) + "s (" + source + ")")
+    return True
+
+
+def apply_commands():
+    """Aplica el último comando recibido por actuador en este ciclo."""
+    pending = commands.drain()
+    if not pending:
+        return
+
+    print("\n" + "="*60)
+    print("COMANDOS MQTT RECIBIDOS DESDE LA NUBE")
+    print("="*60)
+    for name, on in pending.items():
+        if not set_actuator(name, on):
+            print("=> " + name + " ya estaba en " + ("ON" if on else "OFF") + " (sin cambios)")
+    print("Recibidos:", commands.received, "- agrupados:", commands.coalesced)
     print("="*60 + "\n")
 
 
+def on_config_cmd(data):
+    """Cambios de umbrales/intervalos recibidos por el feed config_cmd."""
+    try:
+        changed = cfg.update(data)
+    except ConfigError as e:
+        print("Configuracion rechazada:", e)
+        return
+    print("Configuracion recibida por MQTT:", ", ".join(changed) if changed else "sin cambios")
+
+
+def on_memory_pressure(level, previous):
+    """Degrada el sistema con poca memoria: menos buffers y sin logs de depuración."""
+    global verbose
+    print("MEMORIA:", LEVEL_NAMES[level], "- libre:", mem.stats()["mem_free"], "bytes")
+    ok = level == MEM_OK
+    verbose = ok
+    db.debug_logging = ok
+    if mqtt:
+        mqtt.verbose = ok
+    if level > previous:
+        db.shrink(0.25 if level == MEM_CRITICAL else 0.5)
+        gc.collect()
+
+
+def apply_thresholds(thresholds):
+    global TEMP_HIGH, HUM_LOW, DIST_CLOSE
+    TEMP_HIGH = thresholds["temp_high"]
+    HUM_LOW = thresholds["hum_low"]
+    DIST_CLOSE = thresholds["dist_close"]
+
+
+def on_led_cmd(on):
+    commands.push("LED", on)
+
+
+def on_buzzer_cmd(on):
+    commands.push("Buzzer", on)
+
+
 def check_alerts(temp, hum, dist):
     """
     Verifica condiciones y genera alertas si es necesario.
@@ -78,7 +161,7 @@ def check_alerts(temp, hum, dist):
     alerts_triggered = False
     
     # Alerta: Temperatura alta
-    if temp and temp > 30:
+    if temp and temp > TEMP_HIGH:
         db.create_alert(
             "temperature_high",
             f"Temperatura elevada: {temp}°C",
@@ -88,7 +171,7 @@ def check_alerts(temp, hum, dist):
         alerts_triggered = True
     
     # Alerta: Humedad baja
-    if hum and hum < 30:
+    if hum and hum < HUM_LOW:
         db.create_alert(
             "humidity_low",
             f"Humedad baja: {hum}%",
@@ -98,7 +181,7 @@ def check_alerts(temp, hum, dist):
         alerts_triggered = True
     
     # Alerta: Objeto cercano detectado
-    if dist and dist < 10:
+    if dist and dist < DIST_CLOSE:
         db.create_alert(
             "distance_close",
             f"Objeto detectado a {dist}cm",
@@ -107,62 +190,132 @@ def check_alerts(temp, hum, dist):
         print("ALERTA: Objeto cercano detectado")
         print("Activando buzzer automaticamente...")
         
-        # Activar buzzer automáticamente
-        buzzer.on()
-        db.log_actuator_event("Buzzer", "ON", "auto")
-        time.sleep(0.5)
-        buzzer.off()
-        db.log_actuator_event("Buzzer", "OFF", "auto")
+        # Pulso automático del buzzer (si ya estaba encendido se deja así)
+        pulse_actuator("Buzzer", 0.5, "auto")
         alerts_triggered = True
     
     return alerts_triggered
 
 
+def dht_alert_edges(temp, hum, latched):
+    """
+    Alertas de temperatura/humedad solo al entrar en rango: el muestreo
+    adaptativo lee cada min_s mientras el valor sigue cerca o pasado del
+    umbral, y cada lectura generaría otra alerta.
+
+    Args:
+        temp, hum: Lectura actual (None si falló)
+        latched (tuple): (temperatura_alta, humedad_baja) de la lectura anterior
+
+    Returns:
+        tuple: (temp o None, hum o None, nuevo latched); solo se devuelven
+        los valores que acaban de cruzar el umbral. Una lectura fallida
+        conserva el estado anterior.
+    """
+    was_high, was_low = latched
+    high = was_high if temp is None else temp > TEMP_HIGH
+    low = was_low if hum is None else hum < HUM_LOW
+    return (temp if high and not was_high else None,
+            hum if low and not was_low else None,
+            (high, low))
+
+
+def near_alert(margins, temp=None, hum=None, dist=None):
+    """True si algún valor está a menos de su margen de un umbral de alerta."""
+    if temp is not None and temp > TEMP_HIGH - margins.get("temperature", 0):
+        return True
+    if hum is not None and hum < HUM_LOW + margins.get("humidity", 0):
+        return True
+    if dist is not None and dist < DIST_CLOSE + margins.get("distance", 0):
+        return True
+    return False
+
+
+def mark_first_publish(wlan, ssid, wifi_cached):
+    """Línea de tiempo del arranque y caché WiFi tras la primera publicación."""
+    if boot.elapsed("first_publish") is not None:
+        return
+    first_ms = boot.mark("first_publish")
+    boot.report()
+    db.log_mqtt_event("boot", f"Primera publicacion en {first_ms} ms")
+    # Escaneo lento: después de publicar, solo si no había caché
+    if not wifi_cached:
+        save_wifi_cache(wlan, ssid)
+
+
+def publish_summary(feed):
+    """Cierra la ventana de resúmenes y la publica como un único mensaje JSON."""
+    summary = db.close_summary()
+    if summary is None:
+        return None
+    if mqtt and mqtt.connected:
+        mqtt.publish_feed(feed, ujson.dumps(summary))
+    return summary
+
+
+def print_sampling_stats(samplers, baseline_s):
+    """Muestras tomadas por cada sensor vs. muestreo fijo cada baseline_s."""
+    print("MUESTREO ADAPTATIVO (vs. fijo cada", baseline_s, "s):")
+    for sampler in samplers:
+        st = sampler.stats(baseline_s * 1000)
+        print("  " + st["sensor"] + ":", st["samples"], "muestras vs",
+              st["fixed_rate_samples"], "- intervalo actual", st["interval_ms"], "ms")
+
+
 def main():
-    global led, buzzer, db, mqtt
+    global led, buzzer, db, mqtt, boot, cfg, mem
+
+    boot = BootTimeline()
 
     print("\n" + "="*60)
     print("SISTEMA IoT SMART HOME - PICO W")
     print("="*60 + "\n")
 
-    # 1) Inicializar base de datos
-    print("PASO 1/7 - Inicializando base de datos...")
-    db = IoTDatabase("iot_smart_home.db")
-    db.log_mqtt_event("system_start", "Sistema iniciado")
-    print("=> Base de datos lista\n")
-
-    # 2) Cargar configuración
-    print("PASO 2/7 - Cargando configuracion...")
-    config = load_config()
-    ssid = config["wifi_ssid"]
-    pwd = config["wifi_password"]
-    username = config["adafruit_username"]
-    aio_key = config["adafruit_key"]
-    client_id = config["mqtt_client_id"]
-    feeds = config["feeds"]
+    # 1) Cargar configuración (necesaria para iniciar WiFi)
+    print("PASO 1/8 - Cargando configuracion...")
+    try:
+        cfg = DeviceConfig.load()
+    except (OSError, ValueError) as e:
+        print("ERROR de configuracion:", e)
+        return
+    ssid = cfg.wifi_ssid
+    pwd = cfg.wifi_password
+    username = cfg.username
+    feeds = cfg.feeds
+    # "binary" solo para broker propio (Adafruit IO espera texto)
+    binary_telemetry = cfg.telemetry_format == "binary"
+    apply_thresholds(cfg.thresholds)
     print("=> Configuracion cargada")
     print("   WiFi:", ssid)
     print("   Usuario Adafruit:", username)
     print()
+    boot.mark("config")
 
-    # 3) Conectar a WiFi
-    print("PASO 3/7 - Conectando a WiFi...")
-    try:
-        wlan = connect_wifi(ssid, pwd)
-        db.log_mqtt_event("wifi_connect", f"Conectado a {ssid}")
-        print("=> WiFi conectado exitosamente\n")
-    except Exception as e:
-        print("ERROR WiFi:", e)
-        db.log_mqtt_event("wifi_error", str(e))
-        return
+    # 2) Iniciar asociación WiFi (no bloqueante)
+    print("PASO 2/8 - Iniciando asociacion WiFi...")
+    wlan, wifi_cached = begin_connect(ssid, pwd)
+    print("=> Asociacion en curso", "(con cache)" if wifi_cached else "")
+    print()
+    boot.mark("wifi_start")
+
+    # 3) Inicializar base de datos mientras asocia
+    print("PASO 3/8 - Inicializando base de datos...")
+    db = IoTDatabase("iot_smart_home.db")
+    db.log_mqtt_event("system_start", "Sistema iniciado")
+    mem = MemoryManager(on_pressure=on_memory_pressure)
+    print("=> Base de datos lista")
+    print("   Memoria libre:", mem.low_water, "bytes, gc.threshold:", mem.threshold, "\n")
+    boot.mark("database")
 
-    # 4) Inicializar sensores y actuadores
-    print("PASO 4/7 - Inicializando hardware...")
+    # 4) Inicializar sensores y actuadores mientras asocia
+    print("PASO 4/8 - Inicializando hardware...")
     try:
         dht = DHT22Sensor(PIN_DHT)
         dist = HCSR04Sensor(PIN_TRIG, PIN_ECHO)
         led = Led(PIN_LED)
         buzzer = Buzzer(PIN_BUZZER)
+        actuators["LED"] = (led, feeds.get("led_status"))
+        actuators["Buzzer"] = (buzzer, feeds.get("buzzer_status"))
         print("=> Hardware inicializado")
         print("   - DHT22 (Temp/Hum) en GP15")
         print("   - HC-SR04 (Dist) en GP5/GP4")
@@ -172,15 +325,35 @@ def main():
     except Exception as e:
         print("ERROR inicializando hardware:", e)
         return
+    boot.mark("hardware")
 
-    # 5) Configurar cliente MQTT
-    print("PASO 5/7 - Configurando MQTT...")
+    # 5) Esperar la asociación WiFi
+    print("PASO 5/8 - Esperando WiFi...")
+    try:
+        waited = finish_connect(wlan, ssid, pwd, wifi_cached,
+                                probe=(cfg.mqtt_server, cfg.mqtt_port))
+        print_connection(wlan)
+        db.log_mqtt_event("wifi_connect", f"Conectado a {ssid} (espera {waited} ms)")
+        print("=> WiFi conectado exitosamente\n")
+    except Exception as e:
+        print("ERROR WiFi:", e)
+        db.log_mqtt_event("wifi_error", str(e))
+        return
+    boot.mark("wifi_connected")
+
+    # 6) Configurar cliente MQTT
+    print("PASO 6/8 - Configurando MQTT...")
     mqtt = MQTTClientWrapper(
-        client_id=client_id,
+        client_id=cfg.client_id,
         username=username,
-        aio_key=aio_key,
-        on_message_cb=on_mqtt_message
+        aio_key=cfg.aio_key,
+        on_message_cb=on_mqtt_message,
+        server=cfg.mqtt_server,
+        port=cfg.mqtt_port,
+        topics=cfg.topics
     )
+    if binary_telemetry:
+        mqtt.enable_telemetry(cfg.device_id, feeds["telemetry"])
     
     try:
         mqtt.connect()
@@ -192,21 +365,31 @@ def main():
         db.log_mqtt_event("mqtt_error", str(e))
         print("\nContinuando sin MQTT...\n")
         mqtt = None
+    boot.mark("mqtt_connected")
 
-    # 6) Suscribirse a feeds de comando
+    # 7) Suscribirse a feeds de comando
     if mqtt and mqtt.connected:
-        print("PASO 6/7 - Suscribiendose a feeds de control...")
+        print("PASO 7/8 - Suscribiendose a feeds de control...")
         try:
-            mqtt.subscribe_feed(feeds["led_cmd"])
-            mqtt.subscribe_feed(feeds["buzzer_cmd"])
+            mqtt.subscribe_feed(feeds["led_cmd"], on_led_cmd, parse_onoff)
+            mqtt.subscribe_feed(feeds["buzzer_cmd"], on_buzzer_cmd, parse_onoff)
+            if "config_cmd" in feeds:
+                mqtt.subscribe_feed(feeds["config_cmd"], on_config_cmd, parse_json)
             db.log_mqtt_event("mqtt_subscribe", f"Feeds: {feeds['led_cmd']}, {feeds['buzzer_cmd']}")
             print("=> Suscripciones completadas\n")
         except Exception as e:
             print("ERROR en suscripciones:", e)
+    boot.mark("subscribed")
 
-    # 7) Información del sistema
-    print("PASO 7/7 - Informacion del sistema:")
-    print("   - Lecturas cada 5 segundos")
+    # 8) Información del sistema
+    sampling = cfg.sampling
+    INTERVALO_PUB = sampling["publish_s"]  # segundos
+    # > 0: se publica un resumen por ventana en lugar de cada lectura
+    INTERVALO_RESUMEN = sampling["summary_s"]
+    print("PASO 8/8 - Informacion del sistema:")
+    print("   - Muestreo adaptativo por sensor, publicacion cada", INTERVALO_PUB, "s")
+    if INTERVALO_RESUMEN:
+        print("   - Resumen (min/max/media/ultimo) cada", INTERVALO_RESUMEN, "s en lugar de cada lectura")
     print("   - Publicacion automatica a Adafruit IO")
     print("   - Escucha de comandos desde la nube")
     print("   - Almacenamiento en base de datos local")
@@ -216,27 +399,71 @@ def main():
     print("   - Envia 'ON' o 'OFF' al feed 'buzzer-cmd'")
     print()
 
-    # 8) Bucle principal
+    # Bucle principal
     print("="*60)
     print("SISTEMA EN FUNCIONAMIENTO")
     print("="*60 + "\n")
     
     last_pub = 0
+    last_summary = time.time()
     last_ping = 0
-    INTERVALO_PUB = 5  # segundos
+    last_cfg_check = time.time()
     INTERVALO_PING = 60  # segundos (mantener conexión MQTT)
     reading_count = 0
+    cfg_version = cfg.version
+
+    # Muestreo adaptativo independiente por sensor
+    dht_cfg = sampling["dht"]
+    dist_cfg = sampling["distance"]
+    dht_sampler = AdaptiveSampler.from_config("DHT22", dht_cfg)
+    dist_sampler = AdaptiveSampler.from_config("HC-SR04", dist_cfg)
+    dht_margins = dht_cfg.get("near_margin", {})
+    dist_margins = dist_cfg.get("near_margin", {})
+    dist_irq = dist_cfg.get("mode", "irq") == "irq"
+    temp = None
+    hum = None
+    dist_cm = None
+    dist_close = False
+    dht_latched = (False, False)
 
     try:
         while True:
             now = time.time()
+            now_ms = time.ticks_ms()
             
             # Procesar mensajes MQTT entrantes
             if mqtt and mqtt.connected:
                 try:
-                    mqtt.check_messages()
+                    mqtt.check_messages(max_msgs=10)
                 except Exception as e:
                     print("Error en check_messages:", e)
+            apply_commands()
+
+            # Recargar umbrales e intervalos si cambió config_device.json
+            if now - last_cfg_check >= cfg.config_check_s:
+                last_cfg_check = now
+                try:
+                    changed = cfg.reload_if_changed()
+                    if changed:
+                        print("Configuracion recargada:", ", ".join(changed))
+                except (OSError, ValueError) as e:
+                    print("Configuracion no recargada:", e)
+
+            # Aplicar configuración nueva (archivo o feed config_cmd)
+            if cfg.version != cfg_version:
+                cfg_version = cfg.version
+                apply_thresholds(cfg.thresholds)
+                sampling = cfg.sampling
+                INTERVALO_PUB = sampling["publish_s"]
+                INTERVALO_RESUMEN = sampling["summary_s"]
+                dht_cfg = sampling["dht"]
+                dist_cfg = sampling["distance"]
+                dht_sampler.configure(dht_cfg)
+                dist_sampler.configure(dist_cfg)
+                dht_margins = dht_cfg.get("near_margin", {})
+                dist_margins = dist_cfg.get("near_margin", {})
+                dist_irq = dist_cfg.get("mode", "irq") == "irq"
+                db.log_mqtt_event("config_reload", f"Version {cfg_version}")
             
             # Enviar ping MQTT periódicamente
             if mqtt and mqtt.connected and (now - last_ping >= INTERVALO_PING):
@@ -246,12 +473,9 @@ def main():
                 except:
                     pass
 
-            # Leer sensores y publicar
-            if now - last_pub >= INTERVALO_PUB:
-                last_pub = now
-                reading_count += 1
-
-                # Leer sensores
+            # Muestrear DHT22 cuando corresponde. No durante una medición de
+            # distancia: la lectura del DHT22 bloquea y retrasaría el eco
+            if dht_sampler.due(now_ms) and not dist.busy:
                 try:
                     dht_values = dht.read()
                     temp = dht_values["temperature"]
@@ -260,49 +484,108 @@ def main():
                     print("Error leyendo DHT22:", e)
                     temp = None
                     hum = None
+                db.add_sample(temperature=temp, humidity=hum)
+
+                alert_temp, alert_hum, dht_latched = dht_alert_edges(temp, hum, dht_latched)
+                if alert_temp is not None or alert_hum is not None:
+                    try:
+                        if check_alerts(alert_temp, alert_hum, None):
+                            print("Alertas generadas")
+                    except Exception as e:
+                        print("Error en alertas:", e)
+
+                try:
+                    dht_sampler.update(now_ms, (temp, hum),
+                                       near_alert(dht_margins, temp=temp, hum=hum))
+                except Exception as e:
+                    print("Error en muestreo DHT22:", e)
 
+            # Muestrear HC-SR04 cuando corresponde. En modo "irq" solo se
+            # dispara la medición; el eco se captura por interrupción
+            dist_done = False
+            if dist_sampler.due(now_ms) and not dist.busy:
                 try:
-                    dist_cm = dist.read_cm()
+                    if dist_irq:
+                        dist.start()
+                    else:
+                        dist.read_cm()
+                        dist_done = True
                 except Exception as e:
                     print("Error leyendo HC-SR04:", e)
-                    dist_cm = None
+                    dist.last_cm = None
+                    dist_done = True
+            if dist.poll():
+                dist_done = True
+
+            if dist_done:
+                dist_cm = dist.last_cm
+                db.add_sample(distance=dist_cm)
+
+                # Alerta solo al entrar en rango: el muestreo rápido
+                # repetiría el buzzer mientras el objeto siga cerca
+                close = dist_cm is not None and dist_cm < DIST_CLOSE
+                if close and not dist_close:
+                    try:
+                        if check_alerts(None, None, dist_cm):
+                            print("Alertas generadas")
+                    except Exception as e:
+                        print("Error en alertas:", e)
+                dist_close = close
+
+                try:
+                    dist_sampler.update(time.ticks_ms(), (dist_cm,),
+                                        near_alert(dist_margins, dist=dist_cm))
+                except Exception as e:
+                    print("Error en muestreo HC-SR04:", e)
+
+            # Guardar y publicar las últimas lecturas
+            if now - last_pub >= INTERVALO_PUB:
+                last_pub = now
+                reading_count += 1
 
                 # Mostrar lecturas
-                print("\n--- LECTURA #" + str(reading_count) + " ---")
-                print("Temperatura:", temp, "C")
-                print("Humedad:", hum, "%")
-                print("Distancia:", dist_cm, "cm")
+                if verbose:
+                    print("\n--- LECTURA #" + str(reading_count) + " ---")
+                    print("Temperatura:", temp, "C")
+                    print("Humedad:", hum, "%")
+                    print("Distancia:", dist_cm, "cm")
 
                 # Guardar en base de datos
                 try:
                     record_id = db.insert_sensor_reading(temp, hum, dist_cm)
-                    if record_id:
+                    if record_id and verbose:
                         print("Guardado en BD (ID:", str(record_id) + ")")
                 except Exception as e:
                     print("Error guardando en BD:", e)
 
-                # Verificar alertas
-                try:
-                    if check_alerts(temp, hum, dist_cm):
-                        print("Alertas generadas")
-                except Exception as e:
-                    print("Error en alertas:", e)
-
-                # Publicar en Adafruit IO
-                if mqtt and mqtt.connected:
+                # Publicar en Adafruit IO (en modo resumen solo cada INTERVALO_RESUMEN)
+                if not INTERVALO_RESUMEN and mqtt and mqtt.connected:
                     try:
-                        mqtt.publish_feed(feeds["temperature"], temp)
-                        mqtt.publish_feed(feeds["humidity"], hum)
-                        if dist_cm is not None:
-                            mqtt.publish_feed(feeds["distance"], dist_cm)
-                        db.log_mqtt_event("mqtt_publish", f"Temp:{temp}, Hum:{hum}, Dist:{dist_cm}")
-                        print("Publicado en Adafruit IO")
+                        if binary_telemetry:
+                            mqtt.publish_telemetry(now, temp, hum, dist_cm)
+                        else:
+                            mqtt.publish_feed(feeds["temperature"], temp)
+                            mqtt.publish_feed(feeds["humidity"], hum)
+                            if dist_cm is not None:
+                                mqtt.publish_feed(feeds["distance"], dist_cm)
+                        if db.debug_logging:
+                            db.log_mqtt_event("mqtt_publish", f"Temp:{temp}, Hum:{hum}, Dist:{dist_cm}", debug=True)
+                        if verbose:
+                            print("Publicado en Adafruit IO")
+                        mark_first_publish(wlan, ssid, wifi_cached)
                     except Exception as e:
                         print("Error publicando:", e)
-                else:
+                elif not INTERVALO_RESUMEN:
                     print("MQTT no conectado (datos no enviados)")
+
+                if not INTERVALO_RESUMEN:
+                    # Sin modo resumen la ventana es el intervalo de publicación:
+                    # queda en la BD local el pico entre dos lecturas publicadas
+                    db.close_summary()
                 
-                print("-"*40)
+                if verbose:
+                    print("-"*40)
+                mem.check()
                 
                 # Mostrar estadísticas cada 10 lecturas
                 if reading_count % 10 == 0:
@@ -327,7 +610,33 @@ def main():
                         print("Error obteniendo estadisticas:", e)
                         print("="*60 + "\n")
 
-            time.sleep(0.2)
+                    print_sampling_stats((dht_sampler, dist_sampler), INTERVALO_PUB)
+                    print("MEMORIA:", mem.stats())
+
+            # Publicar el resumen de la ventana (un solo mensaje)
+            if INTERVALO_RESUMEN and now - last_summary >= INTERVALO_RESUMEN:
+                last_summary = now
+                try:
+                    summary = publish_summary(feeds["summary"])
+                    if summary and mqtt and mqtt.connected:
+                        if verbose:
+                            print("Resumen publicado:", summary)
+                        mark_first_publish(wlan, ssid, wifi_cached)
+                    elif summary:
+                        print("MQTT no conectado (resumen no enviado)")
+                except Exception as e:
+                    print("Error publicando resumen:", e)
+
+            # Dormir hasta la próxima muestra (máx. 200 ms para atender MQTT)
+            now_ms = time.ticks_ms()
+            wait = min(200, dht_sampler.ms_until_due(now_ms),
+                       dist_sampler.ms_until_due(now_ms))
+            if dist.busy:
+                wait = min(wait, 2)
+            elif wait >= 20:
+                # Momento ocioso: recolectar aquí y no durante una medición
+                mem.idle_collect()
+            time.sleep_ms(wait)
 
     except KeyboardInterrupt:
         print("\n\n" + "="*60)
@@ -361,6 +670,9 @@ def main():
         except Exception as e:
             print("Error obteniendo resumen:", e)
         
+        print_sampling_stats((dht_sampler, dist_sampler), INTERVALO_PUB)
+        print("MEMORIA:", mem.stats())
+        
         print("="*60)
         
         try:
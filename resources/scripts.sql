@@ -32,4 +32,26 @@ CREATE TABLE IF NOT EXISTS mqtt_logs (
 
 CREATE INDEX IF NOT EXISTS idx_sensor_timestamp ON sensor_readings(timestamp);
 CREATE INDEX IF NOT EXISTS idx_actuator_timestamp ON actuator_events(timestamp);
-CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON system_alerts(timestamp);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON system_alerts(timestamp);
+
+-- Agregados horarios de sensor_readings (se conservan indefinidamente)
+CREATE TABLE IF NOT EXISTS sensor_rollups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    temperature_min REAL,
+    temperature_max REAL,
+    temperature_sum REAL,
+    temperature_count INTEGER,
+    humidity_min REAL,
+    humidity_max REAL,
+    humidity_sum REAL,
+    humidity_count INTEGER,
+    distance_min REAL,
+    distance_max REAL,
+    distance_sum REAL,
+    distance_count INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON mqtt_logs(timestamp);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rollup_timestamp ON sensor_rollups(timestamp);
@@ -0,0 +1,55 @@
+"""
+Configuración compartida de los tests (pytest, CPython).
+
+El backend usa imports planos desde backend/; el código del dispositivo
+(main.py y core/) corre sobre los módulos simulados de
+benchmarks/host_sim.py, igual que los benchmarks.
+"""
+
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "benchmarks"), os.path.join(ROOT, "backend")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import host_sim  # noqa: E402
+
+host_sim.install()
+
+
+# Feeds de config_device.json usados por los tests del backend
+FEEDS = {
+    "temperature": "temperatura",
+    "humidity": "humedad",
+    "distance": "distancia",
+    "led_cmd": "led",
+    "buzzer_cmd": "buzzer",
+    "summary": "resumen",
+    "telemetry": "telemetria",
+}
+
+
+@pytest.fixture
+def feeds():
+    return dict(FEEDS)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "iot.db")
+
+
+@pytest.fixture
+def conn(db_path):
+    """Base SQLite nueva con todas las migraciones aplicadas."""
+    from schema import open_database
+    with redirect_stdout(io.StringIO()):
+        conn = open_database(db_path)
+    yield conn
+    conn.close()
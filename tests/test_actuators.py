@@ -0,0 +1,80 @@
+"""Tests de actuadores y publicación de estado (core/actuators.py, main.py)."""
+
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+import actuators as actuators_mod
+import main as device_main
+from actuators import Buzzer, CommandCoalescer
+from database import IoTDatabase
+
+
+class FakeMQTT:
+    connected = True
+
+    def __init__(self):
+        self.published = []
+
+    def publish_feed(self, feed, value):
+        self.published.append((feed, value))
+
+
+@pytest.fixture
+def device(monkeypatch):
+    monkeypatch.setattr(actuators_mod.time, "sleep", lambda s: None)
+    with redirect_stdout(io.StringIO()):
+        monkeypatch.setattr(device_main, "db", IoTDatabase())
+    mqtt = FakeMQTT()
+    monkeypatch.setattr(device_main, "mqtt", mqtt)
+    buzzer = Buzzer(3)
+    monkeypatch.setattr(device_main, "actuators", {"Buzzer": (buzzer, "buzzer-status")})
+    device_main.apply_thresholds({"temp_high": 30, "hum_low": 30, "dist_close": 10})
+    return buzzer, mqtt
+
+
+def test_set_skips_noop():
+    buzzer = Buzzer(3)
+    assert not buzzer.off()
+    assert buzzer.on()
+    assert not buzzer.on()
+
+
+def test_pulse_restores_state():
+    buzzer = Buzzer(3)
+    assert buzzer.pulse(0)
+    assert not buzzer.is_on
+    buzzer.on()
+    assert not buzzer.pulse(0)
+    assert buzzer.is_on
+
+
+def test_auto_pulse_is_not_published(device):
+    buzzer, mqtt = device
+    with redirect_stdout(io.StringIO()):
+        assert device_main.check_alerts(None, None, 5.0)
+    # OFF -> OFF: nada que publicar en buzzer-status
+    assert mqtt.published == []
+    assert not buzzer.is_on
+    events = device_main.db.actuator_events.latest(10)
+    assert [event["action"] for event in events] == ["PULSE"]
+
+
+def test_pulse_skipped_when_already_on(device):
+    buzzer, mqtt = device
+    with redirect_stdout(io.StringIO()):
+        device_main.set_actuator("Buzzer", True)
+        device_main.check_alerts(None, None, 5.0)
+    assert mqtt.published == [("buzzer-status", "ON")]
+    assert buzzer.is_on
+
+
+def test_coalescer_keeps_last():
+    commands = CommandCoalescer()
+    for value in (True, False, True):
+        commands.push("LED", value)
+    commands.push("Buzzer", False)
+    assert commands.drain() == {"LED": True, "Buzzer": False}
+    assert commands.received == 4 and commands.coalesced == 2
+    assert len(commands) == 0
@@ -0,0 +1,67 @@
+"""Tests de detección de anomalías (backend/analytics.py)."""
+
+import numpy as np
+
+from analytics import DetectorParams, detect_device, run_analytics
+
+DAY = 86400
+STEP = 60.0
+SINCE = 1_700_000_000.0 - 1_700_000_000.0 % DAY
+
+
+def _insert(conn, start, end, device_id=1, spike_at=None, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = np.arange(start, end, STEP)
+    values = 22 + rng.normal(0, 0.1, len(ts))
+    if spike_at is not None:
+        values[np.searchsorted(ts, spike_at)] += 5
+    conn.executemany("""
+        INSERT INTO sensor_readings (timestamp, temperature, device_id, feed)
+        VALUES (?, ?, ?, 'temperature')
+    """, zip(ts.tolist(), values.tolist(), [device_id] * len(ts)))
+    conn.commit()
+
+
+def _kinds(alerts):
+    return sorted({alert[1] for alert in alerts})
+
+
+def test_seasonal_uses_prior_window(conn):
+    params = DetectorParams(baseline_days=3, seasonal_k=6.0, max_rate={})
+    _insert(conn, SINCE - 3 * DAY, SINCE, seed=1)
+    _insert(conn, SINCE, SINCE + DAY, spike_at=SINCE + 12 * 3600, seed=2)
+
+    alerts = detect_device(conn, 1, SINCE, SINCE + DAY, params)
+    assert "anomaly_seasonal_temperature" in _kinds(alerts)
+    seasonal = [a for a in alerts if a[1] == "anomaly_seasonal_temperature"]
+    assert [a[0] for a in seasonal] == [SINCE + 12 * 3600]
+
+
+def test_no_history_disables_seasonal(conn):
+    params = DetectorParams(baseline_days=3, seasonal_k=6.0, max_rate={})
+    # Solo la ventana analizada: sin línea base previa no hay seasonal,
+    # aunque la propia ventana tenga muestras suficientes por hora
+    _insert(conn, SINCE, SINCE + DAY, spike_at=SINCE + 12 * 3600, seed=2)
+
+    alerts = detect_device(conn, 1, SINCE, SINCE + DAY, params)
+    assert _kinds(alerts) == ["anomaly_zscore_temperature"]
+
+
+def test_chunking_does_not_change_alerts(conn):
+    params = DetectorParams(baseline_days=1)
+    _insert(conn, SINCE - DAY, SINCE + DAY, spike_at=SINCE + 3600, seed=3)
+
+    whole = detect_device(conn, 1, SINCE, SINCE + DAY, params, chunk_size=10**6)
+    chunked = detect_device(conn, 1, SINCE, SINCE + DAY, params, chunk_size=97)
+    assert sorted(whole) == sorted(chunked) and whole
+
+
+def test_rerun_replaces_alerts(conn):
+    _insert(conn, SINCE - DAY, SINCE + DAY, spike_at=SINCE + 3600, seed=4)
+    params = DetectorParams(baseline_days=1)
+    first = run_analytics(conn, SINCE, SINCE + DAY, params)
+    second = run_analytics(conn, SINCE, SINCE + DAY, params)
+    stored = conn.execute("""
+        SELECT COUNT(*) FROM system_alerts WHERE alert_type LIKE 'anomaly_%'
+    """).fetchone()[0]
+    assert first["alerts"] == second["alerts"] == stored > 0
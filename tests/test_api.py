@@ -0,0 +1,76 @@
+"""Tests de la API HTTP de últimos valores (backend/api.py)."""
+
+import http.client
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from api import etag_matches, start_api
+from cache import LatestValueCache
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('"t-1"', True),
+    ('"t-2"', False),
+    ('"x", "t-1"', True),
+    ('"x","t-1" ', True),
+    ('W/"t-1"', True),
+    ("*", True),
+    ('"t-10"', False),
+    ('t-1', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"t-1"') is expected
+
+
+def test_etag_substring_does_not_match():
+    # El ETag actual es parte del valor pero no un token completo
+    assert not etag_matches('"t-1"', '"t-"')
+    assert not etag_matches('"a"-"t-1"', '"t-1"')
+
+
+@pytest.fixture
+def server():
+    cache = LatestValueCache()
+    cache.update("temperatura", 21.5, 100.0)
+    with redirect_stdout(io.StringIO()):
+        srv = start_api(cache, port=0)
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(server, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, resp.getheader("ETag"), resp.read()
+    finally:
+        conn.close()
+
+
+def test_conditional_get(server):
+    status, etag, body = _get(server, "/latest/temperatura")
+    assert status == 200 and etag and b"21.5" in body
+
+    assert _get(server, "/latest/temperatura", {"If-None-Match": etag})[0] == 304
+    assert _get(server, "/latest/temperatura", {"If-None-Match": f'"otro", W/{etag}'})[0] == 304
+    assert _get(server, "/latest/temperatura", {"If-None-Match": "*"})[0] == 304
+    assert _get(server, "/latest/temperatura", {"If-None-Match": '"otro"'})[0] == 200
+
+
+def test_unknown_feed(server):
+    assert _get(server, "/latest/nada", {"If-None-Match": "*"})[0] == 404
+    assert _get(server, "/otra")[0] == 404
+
+
+def test_etag_differs_after_restart():
+    # Mismo feed y misma versión en dos procesos no deben compartir ETag
+    first, second = LatestValueCache(), LatestValueCache()
+    first.update("temperatura", 21.5, 100.0)
+    second.update("temperatura", 22.0, 200.0)
+    assert first.snapshot("temperatura")[0] != second.snapshot("temperatura")[0]
@@ -0,0 +1,47 @@
+"""Tests de la comparación de benchmarks (benchmarks/run.py)."""
+
+from run import compare, direction, median_of, spread_of
+
+
+def test_direction():
+    assert direction("cached_per_s") == 1
+    assert direction("latest_queries_per_s") == 1
+    assert direction("decode_us") == -1
+    assert direction("seconds") == -1
+    # Informativas: relaciones, peores casos y conteos
+    assert direction("speedup") == 0
+    assert direction("max_lag_ms") == 0
+    assert direction("rows") == 0
+
+
+def test_median_of_runs():
+    runs = [
+        {"a_per_s": 10, "nested": {"x_us": 3.0}, "label": "uno", "rows": 5},
+        {"a_per_s": 30, "nested": {"x_us": 1.0}, "label": "dos", "rows": 5},
+        {"a_per_s": 20, "nested": {"x_us": 2.0}, "label": "tres", "rows": 5},
+    ]
+    assert median_of(runs) == {"a_per_s": 20, "nested": {"x_us": 2.0}, "label": "uno",
+                               "rows": 5}
+
+
+def test_spread_only_for_compared_metrics():
+    runs = [{"a_per_s": 90, "rows": 1}, {"a_per_s": 100, "rows": 2},
+            {"a_per_s": 400, "rows": 3}]
+    # Desviación absoluta mediana: la corrida atípica no cuenta
+    assert spread_of(runs, "suite") == {"suite.a_per_s": 0.1}
+    assert spread_of(runs[:1], "suite") == {}
+
+
+def test_compare_scales_and_skips_unstable():
+    baseline = {"s": {"fast_per_s": 100, "noisy_per_s": 100, "step_us": 10.0}}
+    current = {"s": {"fast_per_s": 40, "noisy_per_s": 10, "step_us": 10.0}}
+    # Máquina a la mitad de velocidad: 40/s contra 50/s esperado
+    result = compare(current, baseline, 0.4, speed=0.5,
+                     stable={"s.fast_per_s", "s.step_us"})
+    assert result["compared"] == 2
+    assert result["unstable"] == ["s.noisy_per_s"]
+    assert result["regressions"] == []
+    assert [e["metric"] for e in result["improvements"]] == ["s.step_us"]
+
+    result = compare(current, baseline, 0.4)
+    assert [e["metric"] for e in result["regressions"]] == ["s.fast_per_s", "s.noisy_per_s"]
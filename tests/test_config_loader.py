@@ -0,0 +1,130 @@
+"""Tests de validación y recarga de configuración (core/config_loader.py)."""
+
+import copy
+import json
+import os
+
+import pytest
+
+from config_loader import ConfigError, DeviceConfig
+from scheduler import AdaptiveSampler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(ROOT, "config_device.json")) as f:
+    BASE = json.load(f)
+
+
+@pytest.fixture
+def cfg():
+    return DeviceConfig(copy.deepcopy(BASE))
+
+
+def test_repo_config_is_valid(cfg):
+    assert cfg.topic("led_cmd") == (BASE["adafruit_username"] + "/feeds/"
+                                    + BASE["feeds"]["led_cmd"]).encode()
+
+
+@pytest.mark.parametrize("data", [
+    [1],
+    "sampling",
+    None,
+    {"sampling": 5},
+    {"thresholds": [30]},
+    {"thresholds": {"temp_high": "alta"}},
+    {"sampling": {"publish_s": 0}},
+    {"sampling": {"summary_s": -1}},
+    {"sampling": {"dht": 5}},
+    {"sampling": {"dht": None}},
+    {"sampling": {"dht": {"min_s": 10, "max_s": 5}}},
+    {"sampling": {"dht": {"min_s": True}}},
+    {"sampling": {"dht": {"deadband": "x", "speedup": "y"}}},
+    {"sampling": {"dht": {"deadband": -1}}},
+    {"sampling": {"dht": {"speedup": 0}}},
+    {"sampling": {"dht": {"speedup": 1.5}}},
+    {"sampling": {"dht": {"backoff": 0.5}}},
+    {"sampling": {"dht": {"change_per_s": -0.1}}},
+    {"sampling": {"dht": {"near_margin": 3}}},
+    {"sampling": {"dht": {"near_margin": {"temperature": "x"}}}},
+    {"sampling": {"distance": {"near_margin": {"distance": -5}}}},
+    {"sampling": {"distance": {"mode": "poll"}}},
+])
+def test_update_rejects_invalid(cfg, data):
+    before = (copy.deepcopy(cfg.thresholds), copy.deepcopy(cfg.sampling), cfg.version)
+    with pytest.raises(ConfigError):
+        cfg.update(data)
+    assert (cfg.thresholds, cfg.sampling, cfg.version) == before
+
+
+def test_update_partial_merge(cfg):
+    changed = cfg.update({"sampling": {"dht": {"speedup": 0.25, "backoff": 2}}})
+    assert changed == ["sampling"]
+    assert cfg.sampling["dht"]["speedup"] == 0.25
+    assert cfg.sampling["dht"]["min_s"] == BASE["sampling"]["dht"]["min_s"]
+    assert cfg.version == 2
+    assert cfg.update({"sampling": {"dht": {"speedup": 0.25}}}) == []
+
+
+def test_valid_update_runs_in_sampler(cfg):
+    cfg.update({"sampling": {"dht": {"deadband": 0.5, "speedup": 1, "backoff": 1}}})
+    sampler = AdaptiveSampler.from_config("DHT22", cfg.sampling["dht"])
+    sampler.update(0, (20.0, 40.0))
+    sampler.update(2000, (25.0, 40.0), near_threshold=True)
+    assert sampler.min_ms <= sampler.interval_ms <= sampler.max_ms
+
+
+def test_summary_requires_feed():
+    data = copy.deepcopy(BASE)
+    data["feeds"].pop("summary", None)
+    data.setdefault("sampling", {})["summary_s"] = 60
+    with pytest.raises(ConfigError):
+        DeviceConfig(data)
+
+
+def test_missing_keys():
+    data = copy.deepcopy(BASE)
+    del data["wifi_ssid"]
+    data["feeds"].pop("led_cmd")
+    with pytest.raises(ConfigError) as e:
+        DeviceConfig(data)
+    assert "wifi_ssid" in str(e.value) and "feeds.led_cmd" in str(e.value)
+
+
+@pytest.mark.parametrize("key, value", [
+    ("feeds", ["temperatura"]),
+    ("feeds", "temperatura"),
+    ("device_id", -1),
+    ("device_id", 65536),
+    ("device_id", "7"),
+    ("device_id", True),
+    ("config_check_s", "5"),
+    ("config_check_s", -1),
+    ("config_check_s", None),
+])
+def test_invalid_top_level_values(key, value):
+    data = copy.deepcopy(BASE)
+    data[key] = value
+    with pytest.raises(ConfigError) as e:
+        DeviceConfig(data)
+    assert key in str(e.value)
+
+
+def test_device_id_limits():
+    for device_id in (0, 65535):
+        data = copy.deepcopy(BASE)
+        data["device_id"] = device_id
+        assert DeviceConfig(data).device_id == device_id
+
+
+def test_reload_if_changed(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(BASE))
+    cfg = DeviceConfig.load(str(path))
+    assert cfg.reload_if_changed() == []
+
+    data = copy.deepcopy(BASE)
+    data["thresholds"] = {"temp_high": 35}
+    path.write_text(json.dumps(data))
+    os.utime(path, (1, 1))
+    assert cfg.reload_if_changed() == ["thresholds"]
+    assert cfg.thresholds["temp_high"] == 35
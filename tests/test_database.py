@@ -0,0 +1,85 @@
+"""Tests de la base en memoria del dispositivo (core/database.py)."""
+
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from database import MIN_CAPACITY, IoTDatabase, RingTable
+
+
+@pytest.fixture
+def db():
+    with redirect_stdout(io.StringIO()):
+        db = IoTDatabase(capacity={"sensor_readings": 20})
+    clock = [1000.0]
+    db._ts = lambda: clock[0]
+    db.clock = clock
+    return db
+
+
+def test_ring_reuses_rows():
+    table = RingTable(("a", "b"), 3)
+    rows = {id(row) for row in table._rows}
+    for i in range(7):
+        row = table.next_row()
+        row[0] = i
+        row[1] = i * 10
+    assert len(table) == 3 and table.total == 7
+    assert [list(row) for row in table.rows()] == [[4, 40], [5, 50], [6, 60]]
+    assert {id(row) for row in table.rows()} == rows
+    assert table.latest(1) == [{"a": 6, "b": 60}]
+
+
+def test_resize_keeps_latest():
+    table = RingTable(("a",), 40)
+    for i in range(30):
+        table.next_row()[0] = i
+    table.resize(5)
+    assert table.capacity == MIN_CAPACITY
+    assert [row[0] for row in table.rows()] == list(range(30 - MIN_CAPACITY, 30))
+    table.next_row()[0] = 30
+    assert [row[0] for row in table.rows()][-1] == 30
+
+
+def test_insert_and_stats(db):
+    for i in range(25):
+        db.insert_sensor_reading(20.0 + i, None, 100.0)
+    db.create_alert("temperature_high", "alta", "warning")
+    db.log_mqtt_event("publish", "x")
+    stats = db.get_database_stats()
+    assert stats["sensor_readings_count"] == 25
+    assert stats["sensor_readings_stored"] == 20
+    assert stats["system_alerts_count"] == 1
+    assert db.sensor_readings.latest(1)[0]["temperature"] == 44.0
+    assert db.system_alerts.latest(1)[0]["resolved"] is False
+
+
+def test_debug_logs_skipped(db):
+    db.debug_logging = False
+    assert db.log_mqtt_event("mqtt_publish", "x", debug=True) is None
+    assert db.mqtt_logs.total == 0
+
+
+def test_average_readings_window(db):
+    db.insert_sensor_reading(10.0, 40.0, None)
+    db.clock[0] += 7200
+    db.insert_sensor_reading(20.0, None, None)
+    db.insert_sensor_reading(30.0, 50.0, None)
+    assert db.get_average_readings(1) == {"avg_temperature": 25.0, "avg_humidity": 50.0}
+
+
+def test_window_summary(db):
+    db.summary.reset(1000.0)
+    for temp, dist in ((21.0, 200.0), (25.5, 40.0), (22.0, None)):
+        db.add_sample(temperature=temp, distance=dist)
+    db.clock[0] = 1060.0
+    summary = db.close_summary()
+    assert summary == {
+        "ts": 1060, "s": 60,
+        "temperature": [21.0, 25.5, 22.83, 22.0, 3],
+        "distance": [40.0, 200.0, 120.0, 40.0, 2],
+    }
+    assert db.sensor_summaries.latest(1)[0]["summary"] == summary
+    # Ventana nueva vacía
+    assert db.close_summary() is None
@@ -0,0 +1,102 @@
+"""Tests de exportación incremental (backend/export.py)."""
+
+import csv
+import glob
+import gzip
+import io
+import os
+from contextlib import redirect_stdout
+
+from export import CsvGzWriter, export_table, load_state, run_export
+
+DAY = 86400
+T0 = 1_700_006_400.0  # 2023-11-15 00:00 UTC
+
+
+def _insert(conn, timestamps):
+    conn.executemany("INSERT INTO sensor_readings (timestamp, temperature) VALUES (?, 20.0)",
+                     [(ts,) for ts in timestamps])
+    conn.commit()
+
+
+def _exported(out_dir):
+    """{fecha: [timestamps]} de todos los archivos exportados."""
+    days = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, "sensor_readings", "*", "*.csv.gz"))):
+        day = os.path.basename(os.path.dirname(path))[len("date="):]
+        with gzip.open(path, "rt", newline="") as f:
+            rows = list(csv.DictReader(f))
+        days.setdefault(day, []).extend(float(row["timestamp"]) for row in rows)
+    return days
+
+
+def test_partitions_by_day(conn, tmp_path):
+    _insert(conn, [T0 + 10, T0 + DAY - 1, T0 + DAY, T0 + DAY + 5])
+    out = str(tmp_path / "out")
+    count, mark = export_table(conn, "sensor_readings", out, chunk_size=3,
+                               writer_cls=CsvGzWriter)
+    assert (count, mark) == (4, 4)
+    assert _exported(out) == {"2023-11-15": [T0 + 10, T0 + DAY - 1],
+                              "2023-11-16": [T0 + DAY, T0 + DAY + 5]}
+
+
+def test_backfilled_rows_exported_on_next_run(conn, db_path, tmp_path):
+    out = str(tmp_path / "out")
+    state = str(tmp_path / "state.json")
+    _insert(conn, [T0 + DAY, T0 + DAY + 1])
+    with redirect_stdout(io.StringIO()):
+        run_export(db_path, out, ("sensor_readings",), state, fmt="csv")
+    assert load_state(state) == {"sensor_readings": 2}
+
+    # Backfill de un día anterior a la marca de agua por timestamp
+    _insert(conn, [T0 + 1, T0 + 2])
+    with redirect_stdout(io.StringIO()):
+        report = run_export(db_path, out, ("sensor_readings",), state, fmt="csv")
+    assert report["sensor_readings"]["rows"] == 2
+    assert _exported(out) == {"2023-11-15": [T0 + 1, T0 + 2],
+                              "2023-11-16": [T0 + DAY, T0 + DAY + 1]}
+
+
+def test_until_stops_at_first_recent_row(conn, tmp_path):
+    _insert(conn, [T0, T0 + 100, T0 + 1])
+    count, mark = export_table(conn, "sensor_readings", str(tmp_path / "out"),
+                               until=T0 + 50, writer_cls=CsvGzWriter)
+    # La fila 2 (en vuelo) corta la exportación; la 3 sale con ella después
+    assert (count, mark) == (1, 1)
+    count, mark = export_table(conn, "sensor_readings", str(tmp_path / "out"), since=mark,
+                               writer_cls=CsvGzWriter)
+    assert (count, mark) == (2, 3)
+
+
+def test_open_writers_are_bounded(conn, tmp_path):
+    opened = []
+
+    class Tracked(CsvGzWriter):
+        def __init__(self, path, columns, types):
+            super().__init__(path, columns, types)
+            self.closed = False
+            opened.append(self)
+
+        def write(self, rows):
+            assert sum(not w.closed for w in opened) <= 2
+            super().write(rows)
+
+        def close(self):
+            super().close()
+            self.closed = True
+
+    # Cada bloque de 4 filas trae 4 días distintos (backfill intercalado)
+    days = 6
+    timestamps = [T0 + (i % days) * DAY + i for i in range(4 * days)]
+    _insert(conn, timestamps)
+    out = str(tmp_path / "out")
+    count, _ = export_table(conn, "sensor_readings", out, chunk_size=4,
+                            writer_cls=Tracked, max_open=2)
+
+    assert count == len(timestamps)
+    assert all(w.closed for w in opened)
+    # Los días cerrados y vueltos a abrir tienen más de un archivo
+    assert len(opened) > days
+    exported = _exported(out)
+    assert len(exported) == days
+    assert sorted(ts for day in exported.values() for ts in day) == sorted(timestamps)
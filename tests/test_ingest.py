@@ -0,0 +1,179 @@
+"""Tests de ingesta y deduplicación (backend/ingest.py, backend/backfill.py)."""
+
+import json
+
+import pytest
+
+import backfill
+from ingest import IngestWriter
+from retention import apply_retention
+from mqtt_client import TelemetryEncoder
+
+TS = 1_700_000_000
+
+
+def _count(conn, table="sensor_readings"):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_same_second_frames_are_kept(conn, feeds):
+    enc = TelemetryEncoder(3)
+    frames = [bytes(enc.encode(TS, 20.0 + i, None, None)) for i in range(3)]
+    writer = IngestWriter(conn, feeds)
+    for frame in frames:
+        writer.add_message("telemetria", frame, TS + 0.1)
+    assert writer.flush() == 3
+    assert conn.execute("""
+        SELECT seq, temperature FROM sensor_readings ORDER BY seq
+    """).fetchall() == [(0, 20.0), (1, 21.0), (2, 22.0)]
+
+    # La misma trama recibida otra vez (p. ej. replay) se ignora
+    writer.add_message("telemetria", frames[1], TS + 5)
+    assert writer.flush() == 0
+    assert writer.rows_ignored == 1
+
+
+def test_text_messages_use_full_precision_time(conn, feeds):
+    writer = IngestWriter(conn, feeds)
+    writer.add_message("temperatura", "21.5", TS + 0.25)
+    writer.add_message("temperatura", "21.6", TS + 0.75)
+    writer.add_message("led", "ON", TS + 0.25)
+    writer.add_message("led", "OFF", TS + 0.75)
+    assert writer.flush() == 4
+    assert _count(conn) == 2
+    assert _count(conn, "actuator_events") == 2
+
+
+SUMMARY = {"ts": TS, "s": 60, "temperature": [22.4, 28.7, 22.9, 22.5, 30],
+           "distance": [38.0, 201.0, 196.3, 199.5, 1200]}
+
+
+def _rollups(conn):
+    return conn.execute("""
+        SELECT device_id, timestamp, samples, temperature_min, temperature_max,
+               ROUND(temperature_sum, 1), temperature_count, humidity_count,
+               distance_min, distance_max, distance_count
+        FROM sensor_rollups
+    """).fetchall()
+
+
+def test_summary_keeps_last_values_and_rollup(conn, feeds):
+    writer = IngestWriter(conn, feeds)
+    assert writer.add_message("resumen", json.dumps(SUMMARY), TS + 2, device_id=1) is None
+    assert writer.flush() == 1
+    assert conn.execute("""
+        SELECT timestamp, temperature, humidity, distance, device_id, feed FROM sensor_readings
+    """).fetchall() == [(TS, 22.5, None, 199.5, 1, "summary")]
+    rollup = [(1, TS - TS % 3600, 1230, 22.4, 28.7, 687.0, 30, 0, 38.0, 201.0, 1200)]
+    assert _rollups(conn) == rollup
+
+    # El mismo resumen recibido otra vez no suma la ventana dos veces
+    writer.add_message("resumen", json.dumps(SUMMARY).encode(), TS + 9, device_id=1)
+    assert writer.flush() == 0
+    assert _rollups(conn) == rollup
+
+    # La retención borra los últimos valores sin volver a agregarlos
+    apply_retention(conn, {"sensor_readings": 0}, now=TS + 86400, pause=0)
+    assert _count(conn) == 0
+    assert _rollups(conn) == rollup
+
+
+def test_summary_with_unsynced_clock_uses_received_time(conn, feeds):
+    writer = IngestWriter(conn, feeds)
+    writer.add_message("resumen", json.dumps(dict(SUMMARY, ts=60)), TS + 2)
+    writer.flush()
+    assert conn.execute("SELECT timestamp FROM sensor_readings").fetchall() == [(TS + 2,)]
+
+
+@pytest.mark.parametrize("payload", [
+    "{", "[1, 2]", '{"ts": 1}', '{"temperature": [1, 2]}', '{"temperature": "x"}',
+])
+def test_invalid_summary_is_rejected(conn, feeds, payload):
+    writer = IngestWriter(conn, feeds)
+    with pytest.raises(ValueError):
+        writer.add_message("resumen", payload, TS)
+    assert writer.add_batch([("resumen", payload, TS, 0)]) == 1
+    assert writer.flush() == 0
+
+
+def _csv(path, rows):
+    with open(path, "w") as f:
+        f.write("id,value,feed_id,created_at\n")
+        for i, (created, value) in enumerate(rows):
+            f.write(f"0F{i:010d},{value},1,{created}\n")
+
+
+def test_backfill_keeps_same_second_rows_and_reruns_cleanly(conn, feeds, tmp_path):
+    path = str(tmp_path / "temperatura.csv")
+    _csv(path, [("2024-05-01 12:00:00 UTC", 20.0),
+                ("2024-05-01 12:00:00 UTC", 20.5),
+                ("2024-05-01 12:00:01 UTC", 21.0),
+                ("2024-05-01 12:00:02 UTC", "x")])
+
+    writer = IngestWriter(conn, feeds, match_window=backfill.MATCH_WINDOW)
+    records = backfill.read_records(path, "temperatura")
+    assert backfill.ingest_records(writer, records) == (4, 1)
+    assert writer.rows_written == 3
+    assert conn.execute("""
+        SELECT timestamp - 1714564800, seq, temperature FROM sensor_readings
+        ORDER BY timestamp, seq
+    """).fetchall() == [(0, 0, 20.0), (0, 1, 20.5), (1, 0, 21.0)]
+
+    # Repetir el mismo archivo no agrega filas
+    backfill.ingest_records(writer, backfill.read_records(path, "temperatura"))
+    assert writer.rows_written == 3
+    assert writer.rows_ignored == 3
+    assert _count(conn) == 3
+
+
+def test_backfill_since_until(conn, feeds, tmp_path):
+    path = str(tmp_path / "temperatura.csv")
+    _csv(path, [(f"2024-05-01 12:00:0{i} UTC", 20 + i) for i in range(5)])
+    writer = IngestWriter(conn, feeds)
+    since = backfill.parse_time("2024-05-01T12:00:01")
+    until = backfill.parse_time("2024-05-01 12:00:03 UTC")
+    backfill.ingest_records(writer, backfill.read_records(path, "temperatura"), since, until)
+    assert [row[0] for row in conn.execute(
+        "SELECT temperature FROM sensor_readings ORDER BY timestamp")] == [21.0, 22.0]
+
+
+def test_backfill_skips_rows_received_live(conn, feeds):
+    live = IngestWriter(conn, feeds)
+    live.add_message("temperatura", "20.0", TS + 0.4)
+    live.add_message("temperatura", "20.0", TS + 0.9)
+    live.add_message("temperatura", "22.0", TS + 10.7)
+    live.add_message("led", "ON", TS + 1.3)
+    live.flush()
+
+    # Export de Adafruit IO: created_at en segundos, seq por segundo
+    batch = [
+        ("temperatura", "20.0", TS, 0),
+        ("temperatura", "20.0", TS, 1),
+        ("temperatura", "21.0", TS + 1, 0),
+        ("temperatura", "22.0", TS + 10, 0),
+        ("temperatura", "22.0", TS + 10, 1),
+        ("temperatura", "20.0", TS + 5, 0),
+        ("led", "ON", TS + 1, 0),
+    ]
+    writer = IngestWriter(conn, feeds, match_window=backfill.MATCH_WINDOW)
+    for _ in range(2):
+        writer.add_batch(batch)
+        writer.flush()
+
+    # 21.0, 20.0 en TS + 5 y el segundo 22.0 (una sola fila en vivo para dos)
+    assert writer.rows_written == 3
+    assert conn.execute("""
+        SELECT ROUND(timestamp - ?, 1), temperature FROM sensor_readings ORDER BY timestamp, seq
+    """, (TS,)).fetchall() == [(0.4, 20.0), (0.9, 20.0), (1, 21.0), (5, 20.0),
+                               (10, 22.0), (10.7, 22.0)]
+    assert _count(conn, "actuator_events") == 1
+
+
+def test_backfill_rows_split_across_batches_are_kept(conn, feeds):
+    writer = IngestWriter(conn, feeds, match_window=backfill.MATCH_WINDOW)
+    # Mismo segundo y valor, en dos lotes: no son la misma lectura
+    writer.add_batch([("temperatura", "20.0", TS, 0)])
+    writer.flush()
+    writer.add_batch([("temperatura", "20.0", TS, 1), ("temperatura", "20.0", TS + 1, 0)])
+    writer.flush()
+    assert writer.rows_written == 3
@@ -0,0 +1,42 @@
+"""Tests de alertas por flanco en main.py (temperatura y humedad)."""
+
+import pytest
+
+import main as device_main
+
+
+@pytest.fixture(autouse=True)
+def thresholds():
+    device_main.apply_thresholds({"temp_high": 30, "hum_low": 30, "dist_close": 10})
+
+
+def _run(readings):
+    """Lecturas (temp, hum) -> lista de (temp, hum) que generan alerta."""
+    latched = (False, False)
+    fired = []
+    for temp, hum in readings:
+        alert_temp, alert_hum, latched = device_main.dht_alert_edges(temp, hum, latched)
+        if alert_temp is not None or alert_hum is not None:
+            fired.append((alert_temp, alert_hum))
+    return fired
+
+
+def test_alert_once_while_over_threshold():
+    # Muestreo cada min_s con la temperatura sobre el umbral
+    readings = [(29.0, 50.0)] + [(31.0 + i / 10, 50.0) for i in range(20)]
+    assert _run(readings) == [(31.0, None)]
+
+
+def test_alert_again_after_leaving_range():
+    readings = [(31.0, 50.0), (32.0, 50.0), (29.5, 50.0), (30.5, 50.0)]
+    assert _run(readings) == [(31.0, None), (30.5, None)]
+
+
+def test_temperature_and_humidity_independent():
+    readings = [(31.0, 50.0), (31.0, 25.0), (31.0, 24.0), (29.0, 24.0), (29.0, 35.0)]
+    assert _run(readings) == [(31.0, None), (None, 25.0)]
+
+
+def test_failed_read_keeps_state():
+    readings = [(31.0, 25.0), (None, None), (31.0, 25.0)]
+    assert _run(readings) == [(31.0, 25.0)]
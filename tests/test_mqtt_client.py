@@ -0,0 +1,84 @@
+"""Tests del despacho por topic y los parsers (core/mqtt_client.py)."""
+
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from mqtt_client import MQTTClientWrapper, parse_json, parse_number, parse_onoff
+
+
+@pytest.fixture
+def client():
+    received = []
+    with redirect_stdout(io.StringIO()):
+        wrapper = MQTTClientWrapper("pico", "user", "key",
+                                    on_message_cb=lambda t, m: received.append((t, m)))
+    wrapper.received = received
+    return wrapper
+
+
+def _deliver(client, topic, msg):
+    with redirect_stdout(io.StringIO()) as out:
+        client._internal_callback(topic, msg)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("payload, expected", [
+    (b"ON", True), (b" on\n", True), (b"1", True), (b"true", True),
+    (b"OFF", False), (b"0", False), (b"", False),
+])
+def test_parse_onoff(payload, expected):
+    assert parse_onoff(payload) is expected
+
+
+def test_parse_number_and_json():
+    assert parse_number(b"21.5") == 21.5
+    assert parse_json(b'{"summary_s": 60}') == {"summary_s": 60}
+    with pytest.raises(ValueError):
+        parse_number(b"abc")
+    with pytest.raises(ValueError):
+        parse_json(b"{no json")
+
+
+def test_handler_matches_exact_topic(client):
+    values = []
+    client.add_handler("led-cmd", values.append, parse_onoff)
+    _deliver(client, b"user/feeds/led-cmd", b"ON")
+    # Mismo prefijo pero otro feed: no es el handler
+    _deliver(client, b"user/feeds/led-cmd-2", b"ON")
+
+    assert values == [True]
+    assert client.received == [("user/feeds/led-cmd-2", "ON")]
+
+
+def test_unregistered_topic_uses_callback(client):
+    client.add_handler("led-cmd", lambda v: None, parse_onoff)
+    _deliver(client, b"user/feeds/temperatura", b"21.5")
+    assert client.received == [("user/feeds/temperatura", "21.5")]
+
+
+def test_invalid_payload_skips_handler(client):
+    values = []
+    client.add_handler("umbral", values.append, parse_number)
+    out = _deliver(client, b"user/feeds/umbral", b"abc")
+    assert values == [] and client.received == []
+    assert "Payload inválido" in out
+
+    _deliver(client, b"user/feeds/umbral", b"7")
+    assert values == [7.0]
+
+
+def test_handler_without_parser_gets_bytes(client):
+    values = []
+    client.add_handler("config", values.append)
+    _deliver(client, b"user/feeds/config", b'{"a": 1}')
+    assert values == [b'{"a": 1}']
+
+
+def test_handler_error_does_not_propagate(client):
+    def boom(value):
+        raise RuntimeError("falla")
+
+    client.add_handler("led-cmd", boom, parse_onoff)
+    assert "Error en handler" in _deliver(client, b"user/feeds/led-cmd", b"ON")
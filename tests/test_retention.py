@@ -0,0 +1,102 @@
+"""Tests de retención y downsampling (backend/retention.py)."""
+
+import io
+import sqlite3
+from contextlib import redirect_stdout
+
+from export import save_state
+from retention import (RetentionWorker, apply_retention, enable_incremental_vacuum,
+                       export_hold, incremental_vacuum_enabled)
+
+NOW = 1_700_000_000.0
+
+
+def _insert(conn, rows):
+    conn.executemany("""
+        INSERT INTO sensor_readings (timestamp, temperature, humidity, distance, device_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+
+
+def test_rollup_keeps_aggregates(conn):
+    old = NOW - 8 * 86400
+    bucket = old - old % 3600
+    _insert(conn, [(bucket + i, 20.0 + i, None, None, 1) for i in range(10)])
+    _insert(conn, [(NOW - 60, 25.0, None, None, 1)])
+
+    report = apply_retention(conn, {"sensor_readings": 7 * 86400}, now=NOW,
+                             batch_size=3, pause=0)
+
+    assert report["deleted"] == {"sensor_readings": 10}
+    assert conn.execute("SELECT COUNT(*) FROM sensor_readings").fetchone()[0] == 1
+    row = conn.execute("""
+        SELECT timestamp, samples, temperature_min, temperature_max, temperature_sum,
+               temperature_count, humidity_count
+        FROM sensor_rollups
+    """).fetchall()
+    assert row == [(bucket, 10, 20.0, 29.0, 245.0, 10, 0)]
+
+
+def test_hold_keeps_rows_not_yet_exported(conn, tmp_path):
+    old = NOW - 8 * 86400
+    _insert(conn, [(old + i, 20.0, None, None, 1) for i in range(4)])
+    exported = conn.execute("SELECT MAX(id) FROM sensor_readings").fetchone()[0]
+    # Backfill posterior a la exportación: filas viejas con ids nuevos
+    _insert(conn, [(old - 10 + i, 30.0, None, None, 1) for i in range(3)])
+
+    state = str(tmp_path / "state.json")
+    save_state(state, {"sensor_readings": exported})
+    hold = export_hold(state)
+    assert hold["sensor_readings"] == exported
+    assert hold["actuator_events"] == 0
+
+    report = apply_retention(conn, {"sensor_readings": 7 * 86400}, now=NOW,
+                             batch_size=2, pause=0, hold=hold)
+    assert report["deleted"] == {"sensor_readings": 4}
+    assert [row[0] for row in conn.execute(
+        "SELECT temperature FROM sensor_readings")] == [30.0] * 3
+
+    # Una vez exportadas, la siguiente pasada las agrega al mismo bucket
+    apply_retention(conn, {"sensor_readings": 7 * 86400}, now=NOW, pause=0,
+                    hold={"sensor_readings": exported + 3})
+    assert conn.execute("SELECT COUNT(*) FROM sensor_readings").fetchone()[0] == 0
+    assert conn.execute("SELECT SUM(samples) FROM sensor_rollups").fetchone()[0] == 7
+
+
+def test_hold_without_export_keeps_everything(conn, tmp_path):
+    _insert(conn, [(NOW - 8 * 86400, 20.0, None, None, 1)])
+    hold = export_hold(str(tmp_path / "missing.json"))
+    report = apply_retention(conn, {"sensor_readings": 7 * 86400}, now=NOW,
+                             pause=0, hold=hold)
+    assert report["deleted"] == {"sensor_readings": 0}
+
+
+def test_purge_logs(conn):
+    conn.executemany("INSERT INTO mqtt_logs (timestamp, event_type, details) VALUES (?, ?, ?)",
+                     [(NOW - 2 * 86400, "recv", "a"), (NOW, "recv", "b")])
+    conn.commit()
+    report = apply_retention(conn, {"mqtt_logs": 86400}, now=NOW, pause=0)
+    assert report["deleted"] == {"mqtt_logs": 1}
+
+
+def test_worker_does_not_vacuum(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE t (x)")
+    legacy.commit()
+    legacy.close()
+
+    worker = RetentionWorker(path, {}, interval=0)
+    worker.stop()
+    out = io.StringIO()
+    with redirect_stdout(out):
+        worker.run()
+    assert "--vacuum" in out.getvalue()
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    assert not incremental_vacuum_enabled(conn)
+    assert enable_incremental_vacuum(conn)
+    assert incremental_vacuum_enabled(conn)
+    assert not enable_incremental_vacuum(conn)
+    conn.close()
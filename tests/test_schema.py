@@ -0,0 +1,109 @@
+"""Tests de migraciones de esquema (backend/schema.py)."""
+
+import io
+import os
+import sqlite3
+from contextlib import redirect_stdout
+
+import pytest
+
+import schema
+from schema import MIGRATIONS, RESOURCES_DIR, migrate, open_database, schema_version
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def _quiet(fn, *args):
+    with redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def _legacy_db(path):
+    """Base creada con scripts.sql antes de las migraciones (user_version 0)."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    with open(os.path.join(RESOURCES_DIR, "scripts.sql")) as f:
+        conn.executescript(f.read())
+    return conn
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _indexes(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA index_list({table})")}
+
+
+def test_new_database(conn):
+    assert schema_version(conn) == LATEST
+    assert {"device_id", "feed", "seq"} <= set(_columns(conn, "sensor_readings"))
+    assert "seq" in _columns(conn, "actuator_events")
+    assert "device_id" in _columns(conn, "sensor_rollups")
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_migrate_is_idempotent(conn, db_path):
+    # La base del fixture ya está migrada: reabrirla no aplica nada
+    out = io.StringIO()
+    with redirect_stdout(out):
+        again = open_database(db_path)
+    assert out.getvalue() == ""
+    assert migrate(again) == LATEST
+    again.close()
+
+
+def test_legacy_rows_survive(tmp_path):
+    conn = _legacy_db(str(tmp_path / "old.db"))
+    conn.execute("INSERT INTO sensor_readings (timestamp, temperature) VALUES (100, 21.5)")
+    conn.execute("INSERT INTO sensor_rollups (timestamp, samples) VALUES (0, 3)")
+
+    assert _quiet(migrate, conn) == LATEST
+    assert conn.execute("""
+        SELECT timestamp, temperature, device_id FROM sensor_readings
+    """).fetchall() == [(100, 21.5, 0)]
+    assert conn.execute("SELECT device_id, samples FROM sensor_rollups").fetchall() == [(0, 3)]
+    assert "idx_rollup_device_timestamp" in _indexes(conn, "sensor_rollups")
+    assert "idx_rollup_timestamp" not in _indexes(conn, "sensor_rollups")
+    conn.close()
+
+
+def test_legacy_same_second_rows_are_numbered_not_deleted(tmp_path):
+    conn = _legacy_db(str(tmp_path / "old.db"))
+    conn.executemany("INSERT INTO sensor_readings (timestamp, temperature) VALUES (?, ?)",
+                     [(100, 21.0), (100, 21.5), (100, 22.0), (101, 22.5)])
+    conn.executemany("""
+        INSERT INTO actuator_events (timestamp, actuator_name, action) VALUES (?, ?, ?)
+    """, [(100, "led", "ON"), (100, "led", "OFF")])
+
+    out = io.StringIO()
+    with redirect_stdout(out):
+        migrate(conn)
+    assert conn.execute("""
+        SELECT timestamp, temperature, feed, seq FROM sensor_readings ORDER BY id
+    """).fetchall() == [(100, 21.0, "temperature", 0), (100, 21.5, "temperature", 1),
+                        (100, 22.0, "temperature", 2), (101, 22.5, "temperature", 0)]
+    assert conn.execute("SELECT action, seq FROM actuator_events ORDER BY id").fetchall() == [
+        ("ON", 0), ("OFF", 1)]
+    assert "sensor_readings: 2 filas" in out.getvalue()
+    assert "actuator_events: 1 filas" in out.getvalue()
+    assert {"idx_sensor_dedupe"} <= _indexes(conn, "sensor_readings")
+    assert "idx_sensor_device_timestamp" not in _indexes(conn, "sensor_readings")
+    conn.close()
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE tmp_migration (x)")
+        raise RuntimeError("falla")
+
+    monkeypatch.setattr(schema, "MIGRATIONS", MIGRATIONS + [(LATEST + 1, "rota", broken)])
+    conn = _legacy_db(str(tmp_path / "iot.db"))
+    with pytest.raises(RuntimeError):
+        _quiet(migrate, conn)
+    # Las migraciones anteriores quedan aplicadas; la rota no deja rastro
+    assert schema_version(conn) == LATEST
+    assert conn.execute("""
+        SELECT COUNT(*) FROM sqlite_master WHERE name = 'tmp_migration'
+    """).fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,66 @@
+"""Tests de la medición de distancia no bloqueante (core/sensors.py)."""
+
+import pytest
+
+import host_sim
+import sensors
+from sensors import HCSR04Sensor
+
+# Pines distintos de los de HCSR04Echo: los flancos se generan a mano
+TRIG, ECHO = 20, 21
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000]
+    monkeypatch.setattr(sensors.utime, "ticks_us", lambda: now[0])
+    # Sin variación aleatoria en _to_cm
+    monkeypatch.setattr(sensors.random, "random", lambda: 0.5)
+    return now
+
+
+@pytest.fixture
+def dist(clock):
+    return HCSR04Sensor(TRIG, ECHO, timeout_us=30000)
+
+
+def _echo_pin():
+    return host_sim.Pin._by_num[ECHO]
+
+
+def test_start_registers_hard_irq(dist):
+    assert dist.start()
+    pin = _echo_pin()
+    assert pin._handler == dist._on_echo
+    assert pin._hard
+    assert pin._trigger == host_sim.Pin.IRQ_RISING | host_sim.Pin.IRQ_FALLING
+    # Una medición a la vez
+    assert dist.busy and not dist.start()
+
+
+def test_poll_returns_distance(dist, clock):
+    results = []
+    dist.start(results.append)
+    assert not dist.poll()
+
+    clock[0] += 500
+    _echo_pin()._edge(1)
+    assert not dist.poll()
+    clock[0] += 2910  # 50 cm ida y vuelta
+    _echo_pin()._edge(0)
+
+    assert dist.poll()
+    assert dist.last_cm == results[0] == 50.0
+    assert not dist.busy and not dist.poll()
+
+
+def test_poll_times_out(dist, clock):
+    dist.start()
+    clock[0] += dist.timeout_us
+    assert not dist.poll()
+    clock[0] += 1
+    assert dist.poll()
+    assert dist.last_cm is None
+    assert dist.timeouts == 1 and not dist.busy
+    # El siguiente start() vuelve a medir
+    assert dist.start()
@@ -0,0 +1,72 @@
+"""Tests de la ingesta particionada (backend/sharding.py)."""
+
+import io
+import zlib
+from contextlib import redirect_stdout
+
+import pytest
+
+from sharding import ShardedQuery, ShardWorker, shard_for, shard_paths
+
+FLEET = {f"pico-{i}": i for i in range(1, 9)}
+SHARDS = 3
+TS = 1_700_000_000
+
+
+def test_shard_for_is_stable():
+    assert shard_for(7, 4) == zlib.crc32(b"7") % 4
+    assert {shard_for(i, 1) for i in range(100)} == {0}
+
+
+def test_shard_paths():
+    assert shard_paths("data/iot.db", 2) == ["data/iot.shard0.db", "data/iot.shard1.db"]
+
+
+@pytest.fixture
+def shards(tmp_path, feeds):
+    """Shards con lecturas de todos los dispositivos de FLEET."""
+    paths = shard_paths(str(tmp_path / "iot.db"), SHARDS)
+    for k, path in enumerate(paths):
+        with redirect_stdout(io.StringIO()):
+            worker = ShardWorker(k, SHARDS, path, FLEET, feeds)
+        for user, device_id in FLEET.items():
+            # Solo los dispositivos del shard se aceptan
+            worker.handle(f"{user}/feeds/temperatura", str(20 + device_id), TS + device_id)
+            worker.handle(f"{user}/feeds/humedad", "50", TS + 100 + device_id)
+        assert worker.unknown == 2 * (len(FLEET) - len(worker.devices))
+        worker.writer.flush()
+        worker.conn.close()
+    query = ShardedQuery(paths)
+    yield query
+    query.close()
+
+
+def test_handle_routes_by_device(shards):
+    assert shards.devices() == {i: shard_for(i, SHARDS) for i in FLEET.values()}
+    assert sum(shards.count()) == 2 * len(FLEET)
+
+
+def test_readings_merged_in_order(shards):
+    rows = shards.readings(TS, TS + 1000)
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+    assert len(rows) == 2 * len(FLEET)
+    assert [row[0] for row in shards.readings(TS, TS + 1000, limit=3)] == \
+           [TS + 1, TS + 2, TS + 3]
+    one = shards.readings(TS, TS + 1000, device_id=5)
+    assert [(row[0], row[4]) for row in one] == [(TS + 5, 5), (TS + 105, 5)]
+
+
+def test_latest_per_device(shards, feeds):
+    latest = shards.latest(feeds)
+    assert set(latest) == set(FLEET.values())
+    assert latest[3] == {
+        "temperatura": {"value": 23.0, "timestamp": TS + 3},
+        "humedad": {"value": 50.0, "timestamp": TS + 103},
+    }
+    assert shards.latest(feeds, device_id=8) == {8: latest[8]}
+    assert shards.latest(feeds, device_id=99) == {}
+
+
+def test_missing_shard(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ShardedQuery([str(tmp_path / "nope.db")])
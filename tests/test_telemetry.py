@@ -0,0 +1,80 @@
+"""Round trip de tramas binarias: TelemetryEncoder (core) -> decode_frames (backend)."""
+
+import pytest
+
+import telemetry
+from mqtt_client import TELEMETRY_SIZE, TelemetryEncoder
+from telemetry import FRAME_SIZE, decode_frames
+
+TS = 1_700_000_000
+
+
+def _frames(readings, device_id=7):
+    enc = TelemetryEncoder(device_id)
+    # encode() reutiliza el buffer: copiar cada trama
+    return [bytes(enc.encode(ts, *values)) for ts, values in readings]
+
+
+READINGS = [
+    (TS, (21.37, 45.5, 123.4)),
+    (TS + 1, (-5.25, None, None)),
+    (TS + 2, (None, 99.99, None)),
+    (TS + 3, (None, None, 0.0)),
+    (TS + 4, (None, None, None)),
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def decoder(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(telemetry, "np", None)
+    elif telemetry.np is None:
+        pytest.skip("NumPy no instalado")
+    return decode_frames
+
+
+def test_frame_size():
+    assert FRAME_SIZE == TELEMETRY_SIZE == 16
+
+
+def test_round_trip(decoder):
+    rows = decoder(_frames(READINGS), [TS + 10.0] * len(READINGS))
+    assert rows == [
+        (float(ts), *values, 7, seq) for seq, (ts, values) in enumerate(READINGS)
+    ]
+
+
+@pytest.mark.parametrize("device_ts", [
+    12,                     # RTC en el epoch
+    1_609_459_200,          # RTC sin sincronizar en 2021-01-01
+    TS - 86400 - 1,         # justo fuera de la ventana
+    TS + 86400 + 1,
+])
+def test_unsynced_clock_uses_received_time(decoder, device_ts):
+    rows = decoder(_frames([(device_ts, (20.0, None, None))]), [TS + 0.5])
+    assert rows == [(TS + 0.5, 20.0, None, None, 7, 0)]
+
+
+def test_clock_within_a_day_is_kept(decoder):
+    rows = decoder(_frames([(TS - 3600, (20.0, None, None))]), [TS + 0.5])
+    assert rows[0][0] == float(TS - 3600)
+
+
+def test_invalid_frames_dropped(decoder):
+    good = _frames([(TS, (20.0, 40.0, 10.0))], device_id=0xFFFF)[0]
+    bad_magic = b"\x00" + good[1:]
+    rows = decoder([good[:-1], bad_magic, good], [TS + 1.0, TS + 2.0, TS + 3.0])
+    assert rows == [(float(TS), 20.0, 40.0, 10.0, 0xFFFF, 0)]
+    assert decoder([], []) == []
+
+
+def test_same_second_frames_keep_distinct_seq(decoder):
+    rows = decoder(_frames([(TS, (20.0, None, None)), (TS, (20.5, None, None))]), [TS, TS])
+    assert [(row[0], row[5]) for row in rows] == [(float(TS), 0), (float(TS), 1)]
+
+
+def test_sequence_wraps():
+    enc = TelemetryEncoder(1)
+    enc.seq = 0xFFFF
+    enc.encode(TS)
+    assert enc.seq == 0
@@ -0,0 +1,147 @@
+"""Tests de la caché WiFi y la reasociación rápida (core/wifi_manager.py)."""
+
+import pytest
+
+import wifi_manager
+from wifi_manager import begin_connect, finish_connect, load_wifi_cache, save_wifi_cache
+
+SSID = "casa"
+BSSID = b"\x02\x11\x22\x33\x44\x55"
+STATIC = ("10.0.0.9", "255.255.255.0", "10.0.0.1", "10.0.0.1")
+
+
+class FakeWLAN:
+    """WLAN que registra las llamadas; fail_fast hace fallar la vía con caché."""
+
+    fail_fast = False
+    channel_kwarg = True
+
+    def __init__(self, interface=0):
+        self.calls = []
+        self.connected = False
+        self.static = None
+        self.fast = False
+
+    def active(self, flag=None):
+        if flag is not None:
+            self.calls.append(("active", flag))
+        return True
+
+    def connect(self, ssid, password, bssid=None, **kwargs):
+        if kwargs and not self.channel_kwarg:
+            raise TypeError("unexpected keyword argument 'channel'")
+        self.calls.append(("connect", bssid, kwargs.get("channel")))
+        self.fast = bssid is not None
+        self.connected = not (self.fast and self.fail_fast)
+
+    def isconnected(self):
+        return self.connected
+
+    def status(self, param=None):
+        return 3 if self.connected else -2
+
+    def disconnect(self):
+        self.calls.append(("disconnect",))
+        self.connected = False
+
+    def ifconfig(self, config=None):
+        if config is not None:
+            self.calls.append(("ifconfig", config))
+            self.static = None if config == "dhcp" else tuple(config)
+            return None
+        return self.static or STATIC
+
+    def ipconfig(self, dhcp4=None):
+        self.calls.append(("ipconfig", dhcp4))
+        if dhcp4:
+            self.static = None
+
+    def scan(self):
+        return [(SSID.encode(), BSSID, 11, -40, 3, False),
+                (b"otra", b"\x00" * 6, 1, -30, 3, False)]
+
+
+@pytest.fixture
+def wlan_cls(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FakeWLAN, "fail_fast", False)
+    monkeypatch.setattr(FakeWLAN, "channel_kwarg", True)
+    monkeypatch.setattr(wifi_manager.network, "WLAN", FakeWLAN)
+    return FakeWLAN
+
+
+def _save_cache():
+    save_wifi_cache(FakeWLAN(), SSID)
+    return load_wifi_cache(SSID)
+
+
+def test_cache_keeps_bssid_and_channel(wlan_cls):
+    cache = _save_cache()
+    assert cache["bssid"] == "021122334455"
+    assert cache["channel"] == 11
+    assert load_wifi_cache("otra") is None
+
+
+def test_cached_connect_uses_channel(wlan_cls):
+    _save_cache()
+    wlan, used_cache = begin_connect(SSID, "clave")
+    assert used_cache
+    assert ("ifconfig", STATIC) in wlan.calls
+    assert ("connect", BSSID, 11) in wlan.calls
+
+
+def test_port_without_channel_kwarg(wlan_cls):
+    _save_cache()
+    wlan_cls.channel_kwarg = False
+    wlan, used_cache = begin_connect(SSID, "clave")
+    assert used_cache
+    assert ("connect", BSSID, None) in wlan.calls
+
+
+def test_failed_fast_path_falls_back_to_dhcp(wlan_cls):
+    _save_cache()
+    wlan_cls.fail_fast = True
+    wlan, used_cache = begin_connect(SSID, "clave")
+    finish_connect(wlan, SSID, "clave", used_cache, max_wait=1, poll_ms=1)
+
+    assert wlan.isconnected()
+    assert wlan.static is None
+    # DHCP explícito, sin reiniciar la interfaz
+    fallback = wlan.calls[wlan.calls.index(("disconnect",)):]
+    assert fallback == [("disconnect",), ("ipconfig", True), ("connect", None, None)]
+    assert load_wifi_cache(SSID) is None
+
+
+def test_no_cache_plain_connect(wlan_cls):
+    wlan, used_cache = begin_connect(SSID, "clave")
+    assert not used_cache
+    assert wlan.calls == [("active", True), ("connect", None, None)]
+
+
+def _fail_dns(host, port):
+    raise OSError(-2)
+
+
+def test_cached_connect_without_link_falls_back_to_dhcp(wlan_cls, monkeypatch):
+    _save_cache()
+    monkeypatch.setattr(wifi_manager.socket, "getaddrinfo", _fail_dns)
+    wlan, used_cache = begin_connect(SSID, "clave")
+    finish_connect(wlan, SSID, "clave", used_cache, max_wait=1, poll_ms=1,
+                   probe=("io.adafruit.com", 1883))
+
+    assert wlan.isconnected()
+    assert wlan.static is None
+    fallback = wlan.calls[wlan.calls.index(("disconnect",)):]
+    assert fallback == [("disconnect",), ("ipconfig", True), ("connect", None, None)]
+    assert load_wifi_cache(SSID) is None
+
+
+def test_cached_connect_with_link_keeps_static_ip(wlan_cls):
+    _save_cache()
+    wlan, used_cache = begin_connect(SSID, "clave")
+    finish_connect(wlan, SSID, "clave", used_cache, max_wait=1, poll_ms=1,
+                   probe=("io.adafruit.com", 1883))
+
+    assert wlan.static == STATIC
+    assert ("disconnect",) not in wlan.calls
+    assert load_wifi_cache(SSID) is not None